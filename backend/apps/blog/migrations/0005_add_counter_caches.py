@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(rows, group_by):
+    counts = rows.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def populate_counts(apps, schema_editor):
+    Category = apps.get_model('blog', 'Category')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    published = Post.objects.filter(category=OuterRef('pk'), is_published=True)
+    Category.objects.update(post_count=count_subquery(published, 'category'))
+    approved = Comment.objects.filter(post=OuterRef('pk'), is_approved=True, parent__isnull=True)
+    Post.objects.update(comment_count=count_subquery(approved, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_add_translation_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved top-level comments (maintained by apps.core.counters)'),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
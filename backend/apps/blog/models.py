@@ -18,6 +18,9 @@ class Category(TimeStampedModel, SluggedModel):
     image = models.ImageField(upload_to='blog/categories/', null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
+    # Counter cache (maintained by apps.core.counters)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
@@ -29,10 +32,6 @@ class Category(TimeStampedModel, SluggedModel):
     def get_slug_source(self):
         return self.name
 
-    @property
-    def post_count(self):
-        return self.posts.filter(is_published=True).count()
-
 
 class Tag(TimeStampedModel, SluggedModel):
     """Blog tag."""
@@ -96,6 +95,10 @@ class Post(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
 
     # Stats
     view_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text='Approved top-level comments (maintained by apps.core.counters)'
+    )
     reading_time = models.PositiveIntegerField(
         default=5, help_text='Estimated reading time in minutes'
     )
@@ -108,6 +111,10 @@ class Post(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Keyset pagination of the post list
+            models.Index(fields=['is_published', '-published_at', '-id']),
+        ]
 
     def __str__(self):
         return self.title
@@ -115,10 +122,6 @@ class Post(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
     def get_slug_source(self):
         return self.title
 
-    def increment_views(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
-
 
 class Comment(TimeStampedModel):
     """Blog post comment."""
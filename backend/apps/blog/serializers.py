@@ -2,7 +2,7 @@
 Blog serializers for API.
 """
 from rest_framework import serializers
-from apps.core.serializers import MultiLanguageSerializerMixin
+from apps.core.serializers import MultiLanguageSerializerMixin, SparseFieldsetMixin
 from .models import Category, Tag, Post, Comment
 
 
@@ -60,11 +60,26 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class PostListSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
+def compiled_author_display(row):
+    """get_author_display() over a values() row, for apps.core.compiled."""
+    if row['author_name']:
+        return row['author_name']
+    if row['author_id'] is not None:
+        return f"{row['author__first_name']} {row['author__last_name']}".strip()
+    return 'Girasol Tours'
+
+
+class PostListSerializer(SparseFieldsetMixin, MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['title', 'excerpt']
+    COMPILED_FIELDS = {
+        'author_display': (
+            ['author_name', 'author_id', 'author__first_name', 'author__last_name'],
+            compiled_author_display,
+        ),
+    }
     category = CategorySerializer(read_only=True)
     author_display = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
@@ -82,11 +97,8 @@ class PostListSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializ
             return obj.author.full_name
         return 'Girasol Tours'
 
-    def get_comment_count(self, obj):
-        return obj.comments.filter(is_approved=True, parent=None).count()
-
 
-class PostDetailSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
+class PostDetailSerializer(SparseFieldsetMixin, MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['title', 'excerpt', 'content']
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -0,0 +1,24 @@
+"""
+Signal wiring for the blog app.
+"""
+from apps.core.conditional import track_versions
+from apps.core.counters import CounterCache, register_counter
+from apps.core.text_index import IndexSource, register_source
+from .models import Category, Comment, Post, Tag
+
+# Published posts per category
+register_counter(CounterCache(Post, 'category', 'post_count', {'is_published': True}))
+
+# Approved top-level comments per post
+register_counter(CounterCache(Comment, 'post', 'comment_count', {'is_approved': True, 'parent_id': None}))
+
+# ETag / response cache versions; view counts are not content changes
+track_versions(Category, Tag)
+track_versions(Post, ignore_fields=['view_count'])
+track_versions(Comment, parent='post')
+
+# Text index search (when TEXT_INDEX_PATH is set)
+register_source(IndexSource(
+    'post', Post, {'is_published': True},
+    fields=[('title', 10), ('excerpt', 3), ('content', 1)],
+))
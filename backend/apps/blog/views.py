@@ -3,6 +3,12 @@ Blog views for API.
 """
 from rest_framework import generics, filters, permissions
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.compiled import CompiledListMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.text_index import TextIndexSearchFilter
+from apps.core.view_counters import ViewCountMixin
+from apps.core.views import SparseFieldsetViewMixin
 from .models import Category, Tag, Post, Comment
 from .serializers import (
     CategorySerializer, TagSerializer,
@@ -11,29 +17,47 @@ from .serializers import (
 )
 
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(ConditionalGetMixin, generics.ListAPIView):
     """List all blog categories."""
     serializer_class = CategorySerializer
+    version_models = [Category]
     queryset = Category.objects.filter(is_active=True)
 
 
-class TagListView(generics.ListAPIView):
+class TagListView(ConditionalGetMixin, generics.ListAPIView):
     """List all tags."""
     serializer_class = TagSerializer
+    version_models = [Tag]
     queryset = Tag.objects.all()
 
 
-class PostListView(generics.ListAPIView):
+class PostPagination(KeysetPagination):
+    """Newest posts first; ?cursor= switches to keyset pages."""
+    keyset = ('-published_at', '-id')
+
+
+class PostListFieldsMixin(SparseFieldsetViewMixin):
+    """Relations used by PostListSerializer."""
+    field_select_related = {
+        'category': ['category'],
+        'author_display': ['author'],
+    }
+
+
+class PostListView(ConditionalGetMixin, CompiledListMixin, PostListFieldsMixin, generics.ListAPIView):
     """List published blog posts."""
     serializer_class = PostListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    version_models = [Post, Category]
+    pagination_class = PostPagination
+    filter_backends = [DjangoFilterBackend, TextIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category__slug', 'is_featured']
+    search_index_kind = 'post'
     search_fields = ['title', 'excerpt', 'content']
     ordering_fields = ['published_at', 'view_count']
     ordering = ['-published_at']
 
     def get_queryset(self):
-        queryset = Post.objects.filter(is_published=True).select_related('category')
+        queryset = self.apply_field_relations(Post.objects.filter(is_published=True))
 
         # Filter by tag
         tag_slug = self.request.query_params.get('tag')
@@ -43,42 +67,43 @@ class PostListView(generics.ListAPIView):
         return queryset
 
 
-class PostDetailView(generics.RetrieveAPIView):
-    """Get blog post details."""
+class PostDetailView(ViewCountMixin, ConditionalGetMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
+    """Get blog post details (supports ?fields=); views are counted in Post.view_count."""
     serializer_class = PostDetailSerializer
+    version_models = [Post, Category, Tag, Comment]
     lookup_field = 'slug'
+    field_select_related = {
+        'category': ['category'],
+        'author_display': ['author'],
+    }
+    field_prefetch_related = {
+        'tags': ['tags'],
+        'comments': ['comments'],
+    }
 
     def get_queryset(self):
-        return Post.objects.filter(is_published=True).select_related(
-            'category', 'author'
-        ).prefetch_related('tags', 'comments')
+        return self.apply_field_relations(Post.objects.filter(is_published=True))
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-        # Increment view count
-        post = self.get_object()
-        post.increment_views()
-        return response
 
 
-class FeaturedPostsView(generics.ListAPIView):
+class FeaturedPostsView(ConditionalGetMixin, CompiledListMixin, PostListFieldsMixin, generics.ListAPIView):
     """List featured blog posts."""
     serializer_class = PostListSerializer
+    version_models = [Post, Category]
 
     def get_queryset(self):
-        return Post.objects.filter(
+        return self.apply_field_relations(Post.objects.filter(
             is_published=True, is_featured=True
-        ).select_related('category')[:5]
+        ))[:5]
 
 
-class LatestPostsView(generics.ListAPIView):
+class LatestPostsView(ConditionalGetMixin, CompiledListMixin, PostListFieldsMixin, generics.ListAPIView):
     """List latest blog posts for homepage."""
     serializer_class = PostListSerializer
+    version_models = [Post, Category]
 
     def get_queryset(self):
-        return Post.objects.filter(
-            is_published=True
-        ).select_related('category')[:3]
+        return self.apply_field_relations(Post.objects.filter(is_published=True))[:3]
 
 
 class CommentCreateView(generics.CreateAPIView):
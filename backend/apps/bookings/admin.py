@@ -0,0 +1,123 @@
+from django.contrib import admin, messages
+
+from .models import Booking, PromoCode, PromoCodeUsage
+from .reservations import BookingError, cancel_booking, confirm_booking
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = [
+        'booking_reference', 'lead_traveler_name', 'tour', 'travel_date',
+        'seats', 'total_price', 'status', 'hold_expires_at', 'created_at'
+    ]
+    list_filter = ['status', 'travel_date', 'created_at']
+    search_fields = ['booking_reference', 'lead_traveler_name', 'lead_traveler_email', 'tour__name']
+    list_select_related = ['tour']
+    raw_id_fields = ['user', 'tour', 'departure', 'promo_code']
+    date_hierarchy = 'created_at'
+    actions = ['confirm_bookings', 'cancel_bookings']
+
+    # Seats follow the status, which only changes through the actions
+    readonly_fields = [
+        'booking_reference', 'tour', 'departure', 'seats', 'status', 'hold_expires_at', 'promo_code',
+        'confirmed_at', 'cancelled_at', 'cancellation_reason', 'created_at', 'updated_at'
+    ]
+
+    fieldsets = (
+        ('Booking', {
+            'fields': ('booking_reference', 'user', 'status', 'hold_expires_at', 'confirmed_at')
+        }),
+        ('Trip', {
+            'fields': ('tour', 'departure', 'travel_date', 'return_date')
+        }),
+        ('Travelers', {
+            'fields': ('adults', 'children', 'infants', 'singles', 'seats', 'special_requests')
+        }),
+        ('Lead Traveler', {
+            'fields': (
+                'lead_traveler_name', 'lead_traveler_email',
+                'lead_traveler_phone', 'lead_traveler_country'
+            )
+        }),
+        ('Pricing', {
+            'fields': ('base_price', 'discount_amount', 'total_price', 'currency', 'promo_code')
+        }),
+        ('Cancellation', {
+            'fields': ('cancelled_at', 'cancellation_reason'),
+            'classes': ('collapse',)
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+
+    def has_add_permission(self, request):
+        # Bookings hold seats, so they are created through the API
+        return False
+
+    def _apply(self, request, queryset, action, verb):
+        done = 0
+        for booking in queryset.select_related('departure'):
+            try:
+                action(booking)
+                done += 1
+            except BookingError as e:
+                self.message_user(request, f'{booking.booking_reference}: {e}', messages.WARNING)
+        self.message_user(request, f'{done} booking(s) {verb}.', messages.SUCCESS)
+
+    @admin.action(description='Confirm selected bookings')
+    def confirm_bookings(self, request, queryset):
+        self._apply(request, queryset, confirm_booking, 'confirmed')
+
+    @admin.action(description='Cancel selected bookings (releases seats)')
+    def cancel_bookings(self, request, queryset):
+        self._apply(
+            request, queryset, lambda booking: cancel_booking(booking, 'Cancelled by staff'), 'cancelled'
+        )
+
+
+class PromoCodeUsageInline(admin.TabularInline):
+    model = PromoCodeUsage
+    extra = 0
+    readonly_fields = ['email', 'uses']
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PromoCode)
+class PromoCodeAdmin(admin.ModelAdmin):
+    list_display = [
+        'code', 'discount_type', 'discount_value', 'uses_count', 'max_uses',
+        'valid_from', 'valid_until', 'combinable', 'is_active'
+    ]
+    list_filter = ['is_active', 'discount_type', 'combinable']
+    search_fields = ['code', 'description']
+    list_editable = ['is_active']
+    filter_horizontal = ['tours', 'categories']
+    readonly_fields = ['uses_count', 'created_at', 'updated_at']
+
+    fieldsets = (
+        ('Code', {
+            'fields': ('code', 'description', 'is_active')
+        }),
+        ('Discount', {
+            'fields': (
+                'discount_type', 'discount_value', 'max_discount_amount',
+                'min_order_amount', 'combinable'
+            )
+        }),
+        ('Restrictions', {
+            'fields': (
+                'tours', 'categories', 'valid_from', 'valid_until',
+                'travel_start_date', 'travel_end_date'
+            )
+        }),
+        ('Usage', {
+            'fields': ('max_uses', 'max_uses_per_customer', 'uses_count')
+        }),
+    )
+
+    inlines = [PromoCodeUsageInline]
@@ -0,0 +1,21 @@
+"""
+Release the seats of pending bookings whose hold has expired.
+
+Usage:
+    python manage.py release_expired_holds
+
+Run it every few minutes from cron (or schedule release_expired_holds_task).
+Holds on a departure are also released when a booking finds it full, so a
+missed run only delays seats from showing up as available.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.bookings.reservations import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Cancel pending bookings past hold_expires_at and return their seats'
+
+    def handle(self, *args, **options):
+        released = release_expired_holds()
+        self.stdout.write(self.style.SUCCESS(f'Done! Released {released} expired holds.'))
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:26
+
+import apps.bookings.models
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tours', '0013_departure_availability_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking_reference', models.CharField(default=apps.bookings.models.generate_booking_reference, editable=False, max_length=16, unique=True)),
+                ('travel_date', models.DateField()),
+                ('return_date', models.DateField(blank=True, null=True)),
+                ('adults', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('children', models.PositiveIntegerField(default=0)),
+                ('infants', models.PositiveIntegerField(default=0)),
+                ('seats', models.PositiveIntegerField(default=0, editable=False, help_text='Departure spots held by this booking (adults and children)')),
+                ('lead_traveler_name', models.CharField(max_length=200)),
+                ('lead_traveler_email', models.EmailField(max_length=254)),
+                ('lead_traveler_phone', models.CharField(blank=True, max_length=20)),
+                ('lead_traveler_country', models.CharField(blank=True, max_length=100)),
+                ('base_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('completed', 'Completed'), ('refunded', 'Refunded')], default='pending', max_length=20)),
+                ('hold_expires_at', models.DateTimeField(blank=True, help_text='Pending bookings release their seats after this time', null=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('cancellation_reason', models.TextField(blank=True)),
+                ('special_requests', models.TextField(blank=True)),
+                ('departure', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='tours.tourdeparture')),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='tours.tour')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Booking',
+                'verbose_name_plural': 'Bookings',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'hold_expires_at'], name='bookings_bo_status_815b94_idx'),
+        ),
+    ]
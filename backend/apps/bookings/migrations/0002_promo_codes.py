@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:29
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0013_departure_availability_index'),
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromoCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('code', models.CharField(help_text='Matched case-insensitively', max_length=30, unique=True)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('discount_type', models.CharField(choices=[('percentage', 'Percentage'), ('fixed', 'Fixed Amount')], default='percentage', max_length=20)),
+                ('discount_value', models.DecimalField(decimal_places=2, help_text='Percentage off the total, or a fixed amount', max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('max_discount_amount', models.DecimalField(blank=True, decimal_places=2, help_text='Cap for percentage discounts', max_digits=10, null=True)),
+                ('min_order_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('combinable', models.BooleanField(default=False, help_text='Can be used on top of tour discounts and early booking offers')),
+                ('valid_from', models.DateTimeField(blank=True, null=True)),
+                ('valid_until', models.DateTimeField(blank=True, null=True)),
+                ('travel_start_date', models.DateField(blank=True, null=True)),
+                ('travel_end_date', models.DateField(blank=True, null=True)),
+                ('max_uses', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_uses_per_customer', models.PositiveIntegerField(blank=True, null=True)),
+                ('uses_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('categories', models.ManyToManyField(blank=True, related_name='promo_codes', to='tours.TourCategory')),
+                ('tours', models.ManyToManyField(blank=True, related_name='promo_codes', to='tours.Tour')),
+            ],
+            options={
+                'verbose_name': 'Promo Code',
+                'verbose_name_plural': 'Promo Codes',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='promo_code',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='bookings.promocode'),
+        ),
+        migrations.CreateModel(
+            name='PromoCodeUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('uses', models.PositiveIntegerField(default=0)),
+                ('promo_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='bookings.promocode')),
+            ],
+            options={
+                'verbose_name': 'Promo Code Usage',
+                'verbose_name_plural': 'Promo Code Usages',
+                'unique_together': {('promo_code', 'email')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_promo_codes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='singles',
+            field=models.PositiveIntegerField(default=0, help_text='Travelers in single rooms (pay the single supplement)'),
+        ),
+    ]
@@ -0,0 +1,190 @@
+"""
+Booking models for Girasol Tours.
+"""
+import secrets
+
+from django.core.validators import MinValueValidator
+from django.db import models
+
+from apps.core.models import TimeStampedModel
+
+# Booking references avoid look-alike characters (0/O, 1/I/L)
+REFERENCE_ALPHABET = 'ABCDEFGHJKMNPQRSTUVWXYZ23456789'
+REFERENCE_PREFIX = 'GT'
+REFERENCE_LENGTH = 8
+
+
+def generate_booking_reference():
+    """A random booking reference, e.g. 'GT7KQ2M9XA'."""
+    return REFERENCE_PREFIX + ''.join(secrets.choice(REFERENCE_ALPHABET) for _ in range(REFERENCE_LENGTH))
+
+
+class BookingStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    CONFIRMED = 'confirmed', 'Confirmed'
+    CANCELLED = 'cancelled', 'Cancelled'
+    COMPLETED = 'completed', 'Completed'
+    REFUNDED = 'refunded', 'Refunded'
+
+
+class DiscountType(models.TextChoices):
+    PERCENTAGE = 'percentage', 'Percentage'
+    FIXED = 'fixed', 'Fixed Amount'
+
+
+class PromoCode(TimeStampedModel):
+    """
+    A discount code entered at checkout.
+
+    Empty restrictions don't restrict: a code without tours or categories
+    is valid for every tour. Rules are evaluated by apps.bookings.promotions.
+    """
+
+    code = models.CharField(max_length=30, unique=True, help_text='Matched case-insensitively')
+    description = models.CharField(max_length=200, blank=True)
+
+    # Discount
+    discount_type = models.CharField(
+        max_length=20, choices=DiscountType.choices, default=DiscountType.PERCENTAGE
+    )
+    discount_value = models.DecimalField(
+        max_digits=10, decimal_places=2, validators=[MinValueValidator(0)],
+        help_text='Percentage off the total, or a fixed amount'
+    )
+    max_discount_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        help_text='Cap for percentage discounts'
+    )
+    min_order_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    combinable = models.BooleanField(
+        default=False,
+        help_text='Can be used on top of tour discounts and early booking offers'
+    )
+
+    # Restrictions
+    tours = models.ManyToManyField('tours.Tour', blank=True, related_name='promo_codes')
+    categories = models.ManyToManyField('tours.TourCategory', blank=True, related_name='promo_codes')
+    valid_from = models.DateTimeField(null=True, blank=True)
+    valid_until = models.DateTimeField(null=True, blank=True)
+    travel_start_date = models.DateField(null=True, blank=True)
+    travel_end_date = models.DateField(null=True, blank=True)
+
+    # Usage caps
+    max_uses = models.PositiveIntegerField(null=True, blank=True)
+    max_uses_per_customer = models.PositiveIntegerField(null=True, blank=True)
+    uses_count = models.PositiveIntegerField(default=0, editable=False)
+
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = 'Promo Code'
+        verbose_name_plural = 'Promo Codes'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.code
+
+    def save(self, *args, **kwargs):
+        self.code = self.code.strip().upper()
+        super().save(*args, **kwargs)
+
+
+class PromoCodeUsage(models.Model):
+    """Number of active bookings using a promo code per customer email."""
+
+    promo_code = models.ForeignKey(PromoCode, on_delete=models.CASCADE, related_name='usages')
+    email = models.EmailField()
+    uses = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Promo Code Usage'
+        verbose_name_plural = 'Promo Code Usages'
+        unique_together = ['promo_code', 'email']
+
+    def __str__(self):
+        return f"{self.promo_code} - {self.email} ({self.uses})"
+
+
+class Booking(TimeStampedModel):
+    """
+    A tour booking.
+
+    Bookings on a scheduled departure hold `seats` spots of it while they
+    are pending or confirmed; status changes go through
+    apps.bookings.reservations, which keeps TourDeparture.available_spots
+    in step.
+    """
+
+    booking_reference = models.CharField(
+        max_length=16, unique=True, editable=False, default=generate_booking_reference
+    )
+    user = models.ForeignKey(
+        'users.User', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='bookings'
+    )
+
+    # Trip
+    tour = models.ForeignKey('tours.Tour', on_delete=models.PROTECT, related_name='bookings')
+    departure = models.ForeignKey(
+        'tours.TourDeparture', on_delete=models.PROTECT,
+        null=True, blank=True, related_name='bookings'
+    )
+    travel_date = models.DateField()
+    return_date = models.DateField(null=True, blank=True)
+
+    # Travelers
+    adults = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    children = models.PositiveIntegerField(default=0)
+    infants = models.PositiveIntegerField(default=0)
+    singles = models.PositiveIntegerField(
+        default=0, help_text='Travelers in single rooms (pay the single supplement)'
+    )
+    seats = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text='Departure spots held by this booking (adults and children)'
+    )
+
+    # Lead traveler
+    lead_traveler_name = models.CharField(max_length=200)
+    lead_traveler_email = models.EmailField()
+    lead_traveler_phone = models.CharField(max_length=20, blank=True)
+    lead_traveler_country = models.CharField(max_length=100, blank=True)
+
+    # Pricing
+    base_price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, default='USD')
+    promo_code = models.ForeignKey(
+        PromoCode, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings'
+    )
+
+    # Status
+    status = models.CharField(
+        max_length=20, choices=BookingStatus.choices, default=BookingStatus.PENDING
+    )
+    hold_expires_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text='Pending bookings release their seats after this time'
+    )
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    cancellation_reason = models.TextField(blank=True)
+
+    special_requests = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Booking'
+        verbose_name_plural = 'Bookings'
+        ordering = ['-created_at']
+        indexes = [
+            # Expired hold sweep (apps.bookings.reservations)
+            models.Index(fields=['status', 'hold_expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_reference} - {self.lead_traveler_name}"
+
+    @property
+    def total_travelers(self):
+        return self.adults + self.children + self.infants
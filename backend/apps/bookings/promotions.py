@@ -0,0 +1,206 @@
+"""
+Promo code rules.
+
+get_promo_rule(code) compiles a PromoCode and its tour and category
+restrictions into a PromoRule: the checks that apply to the code as
+closures over plain values, plus its discount function. Rules are kept in
+process memory per code and tagged with the PromoCode content version
+(apps.core.conditional), so an edit in the admin reaches every worker on
+its next validation without the rule tables being read again. Unknown
+codes are remembered too.
+
+Stacking: a code that isn't `combinable` is refused when the tour already
+has a discount for the travel date (Tour.has_discount or an early booking
+offer, as shown by the price calendar). Combinable codes apply to the
+already discounted total.
+
+Usage caps are counters: PromoCode.uses_count and one PromoCodeUsage row
+per customer email are incremented by conditional UPDATEs in the
+transaction that books with the code (redeem_promo_code) and given back
+when the booking is cancelled (release_promo_code). Validation reads the
+two counters and never counts bookings.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.core.conditional import get_versions, version_label
+from apps.tours.models import TourPriceDay
+from apps.tours.price_calendar import ensure_price_calendar
+from apps.tours.pricing import tour_discount
+from .models import DiscountType, PromoCode, PromoCodeUsage
+
+CENT = Decimal('0.01')
+
+# Compiled rules (None for unknown codes) of the current PromoCode version
+_rules = {}
+_rules_version = None
+MAX_CACHED_RULES = 1000
+
+
+class InvalidPromoCode(Exception):
+    """The promo code can't be used for this booking (shown to the client)."""
+
+
+class PromoRule:
+    """A promo code compiled for evaluation."""
+
+    def __init__(self, promo, tour_ids, category_ids):
+        self.promo_id = promo.pk
+        self.code = promo.code
+        self.description = promo.description
+        self.discount_type = promo.discount_type
+        self.discount_value = promo.discount_value
+        self.max_uses = promo.max_uses
+        self.max_uses_per_customer = promo.max_uses_per_customer
+        self.checks = self._compile_checks(promo, frozenset(tour_ids), frozenset(category_ids))
+        self.discount = self._compile_discount(promo)
+
+    @staticmethod
+    def _compile_checks(promo, tour_ids, category_ids):
+        """Checks taking (tour, total, travel_date, now, discounted) and returning an error or None."""
+        checks = []
+        if promo.valid_from is not None:
+            valid_from = promo.valid_from
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                'This promo code is not active yet.' if now < valid_from else None
+            ))
+        if promo.valid_until is not None:
+            valid_until = promo.valid_until
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                'This promo code has expired.' if now > valid_until else None
+            ))
+        if tour_ids or category_ids:
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                None if tour is not None and (tour.pk in tour_ids or tour.category_id in category_ids)
+                else 'This promo code is not valid for this tour.'
+            ))
+        if promo.travel_start_date is not None or promo.travel_end_date is not None:
+            start, end = promo.travel_start_date, promo.travel_end_date
+            # Checked once the travel date is known
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                'This promo code is not valid for the selected travel date.'
+                if travel_date is not None and (
+                    (start is not None and travel_date < start) or (end is not None and travel_date > end)
+                ) else None
+            ))
+        if promo.min_order_amount is not None:
+            minimum = promo.min_order_amount
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                f'This promo code requires a minimum order of {minimum}.'
+                if total is not None and total < minimum else None
+            ))
+        if not promo.combinable:
+            checks.append(lambda tour, total, travel_date, now, discounted: (
+                'This promo code cannot be combined with other offers.' if discounted else None
+            ))
+        return checks
+
+    @staticmethod
+    def _compile_discount(promo):
+        """Function returning the discount on a total."""
+        value = promo.discount_value
+        if promo.discount_type == DiscountType.FIXED:
+            return lambda total: min(value, total)
+
+        cap = promo.max_discount_amount
+
+        def percentage(total):
+            discount = (total * value / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+            return min(discount, cap) if cap is not None else discount
+        return percentage
+
+    def evaluate(self, tour=None, total=None, travel_date=None, now=None, discounted=False):
+        """
+        Return the discount on `total` (None without a total), or raise
+        InvalidPromoCode. Usage caps are checked separately by check_usage().
+        """
+        now = now or timezone.now()
+        for check in self.checks:
+            error = check(tour, total, travel_date, now, discounted)
+            if error:
+                raise InvalidPromoCode(error)
+        return None if total is None else self.discount(total)
+
+    def check_usage(self, email=None):
+        """Raise InvalidPromoCode if the code (or this customer's share of it) is used up."""
+        if self.max_uses is not None:
+            uses = PromoCode.objects.filter(pk=self.promo_id).values_list('uses_count', flat=True).first()
+            if uses is None or uses >= self.max_uses:
+                raise InvalidPromoCode('This promo code has reached its usage limit.')
+        if self.max_uses_per_customer is not None and email:
+            uses = PromoCodeUsage.objects.filter(
+                promo_code_id=self.promo_id, email=email.lower()
+            ).values_list('uses', flat=True).first()
+            if (uses or 0) >= self.max_uses_per_customer:
+                raise InvalidPromoCode('You have already used this promo code.')
+
+
+def compile_promo_code(code):
+    """Build the PromoRule of an active code, or None."""
+    promo = PromoCode.objects.filter(code=code, is_active=True).first()
+    if promo is None:
+        return None
+    return PromoRule(
+        promo,
+        promo.tours.values_list('pk', flat=True),
+        promo.categories.values_list('pk', flat=True),
+    )
+
+
+def get_promo_rule(code):
+    """The compiled rule of a promo code; raises InvalidPromoCode for unknown codes."""
+    global _rules_version
+    code = (code or '').strip().upper()
+    version = get_versions([PromoCode])[version_label(PromoCode)][0]
+    if version != _rules_version or len(_rules) >= MAX_CACHED_RULES:
+        _rules.clear()
+        _rules_version = version
+
+    if code not in _rules:
+        _rules[code] = compile_promo_code(code) if code else None
+    rule = _rules[code]
+    if rule is None:
+        raise InvalidPromoCode('Invalid promo code.')
+    return rule
+
+
+def has_tour_discount(tour, travel_date=None, now=None):
+    """Whether the tour is already discounted (on the travel date, when known)."""
+    now = now or timezone.now()
+    if travel_date is not None:
+        ensure_price_calendar(tour.pk, now)
+        return TourPriceDay.objects.filter(
+            tour=tour, date=travel_date, discount_percentage__gt=0
+        ).exists()
+    return tour_discount(tour, now) > 0
+
+
+def redeem_promo_code(rule, email):
+    """
+    Count one use of the code by `email`, within the booking's transaction.
+    Raises InvalidPromoCode when a cap is reached.
+    """
+    email = email.lower()
+    PromoCodeUsage.objects.bulk_create(
+        [PromoCodeUsage(promo_code_id=rule.promo_id, email=email)], ignore_conflicts=True
+    )
+    usage = PromoCodeUsage.objects.filter(promo_code_id=rule.promo_id, email=email)
+    if rule.max_uses_per_customer is not None:
+        usage = usage.filter(uses__lt=rule.max_uses_per_customer)
+    if not usage.update(uses=F('uses') + 1):
+        raise InvalidPromoCode('You have already used this promo code.')
+
+    if not PromoCode.objects.filter(pk=rule.promo_id).filter(
+        Q(max_uses__isnull=True) | Q(uses_count__lt=F('max_uses'))
+    ).update(uses_count=F('uses_count') + 1):
+        raise InvalidPromoCode('This promo code has reached its usage limit.')
+
+
+def release_promo_code(promo_code_id, email):
+    """Give back a use of the code (the booking was cancelled)."""
+    PromoCode.objects.filter(pk=promo_code_id, uses_count__gt=0).update(uses_count=F('uses_count') - 1)
+    PromoCodeUsage.objects.filter(
+        promo_code_id=promo_code_id, email=email.lower(), uses__gt=0
+    ).update(uses=F('uses') - 1)
@@ -0,0 +1,265 @@
+"""
+Seat reservations on tour departures.
+
+A booking on a scheduled departure holds its seats (adults and children;
+infants share a seat) from the moment it is created:
+
+- create_booking() takes the seats with one conditional UPDATE
+  (available_spots >= seats), so concurrent bookers can never oversell a
+  departure and no lock is taken before the seats are known to be there.
+  The same UPDATE moves the departure's status to limited or sold_out.
+- A pending booking holds its seats for BOOKING_HOLD_MINUTES.
+  confirm_booking() turns the hold into a sale; confirming a confirmed
+  booking again is a no-op.
+- cancel_booking() and release_expired_holds() (the sweeper, run by the
+  release_expired_holds command or Celery task) give seats back exactly
+  once: the booking's status change is itself a conditional UPDATE, and
+  the seats are returned in the same transaction only if it matched.
+  Departures whose holds expired are also swept when a booking misses
+  seats, so stale holds never block a sale.
+
+Bookings on tours without scheduled departures are requests: they hold
+no seats and don't expire. A promo code's use is counted in the booking's
+transaction and given back with its seats (apps.bookings.promotions).
+
+Spot changes are queryset updates, so they bump the departure's content
+versions here, and rebuild the tour's price calendar when the departure
+sells out or reopens.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from apps.core.conditional import child_tag, object_tag, schedule_version_bump
+from apps.tours.models import Tour, TourDeparture
+from apps.tours.price_calendar import AVAILABLE_STATUSES, schedule_calendar_rebuild
+from apps.tours.pricing import PriceRules
+from .models import Booking, BookingStatus, generate_booking_reference
+from .promotions import InvalidPromoCode, get_promo_rule, redeem_promo_code, release_promo_code
+
+# Bookings whose seats are taken from their departure
+HOLDING_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+
+
+class BookingError(Exception):
+    """A booking operation that can't be carried out (shown to the client)."""
+
+
+# ============================================================================
+# Departure seats
+# ============================================================================
+
+def _seat_update(delta):
+    """UPDATE values adding `delta` seats to available_spots, with the matching status."""
+    limited = settings.DEPARTURE_LIMITED_SPOTS
+    # Conditions compare the current value: spots + delta <= n  <=>  spots <= n - delta
+    status = Case(
+        When(status='cancelled', then=F('status')),
+        When(available_spots__lte=-delta, then=Value('sold_out')),
+        When(available_spots__lte=limited - delta, then=Value('limited')),
+        default=Value('available'),
+    )
+    # status is assigned first: MySQL evaluates assignments left to right
+    return {'status': status, 'available_spots': F('available_spots') + delta}
+
+
+def _seats_changed(departure, taken):
+    """
+    Refresh the departure after `taken` of its seats were taken (negative:
+    returned) and publish the change. Runs inside the updating transaction.
+    """
+    departure.available_spots, departure.status = TourDeparture.objects.filter(
+        pk=departure.pk
+    ).values_list('available_spots', 'status').get()
+    spots_before = departure.available_spots + taken
+
+    schedule_version_bump([
+        TourDeparture,
+        object_tag(TourDeparture, departure.pk),
+        object_tag(Tour, departure.tour_id),
+        child_tag(TourDeparture, Tour, departure.tour_id),
+    ])
+    # The price calendar only shows whether a departure is sold out
+    if (spots_before == 0) != (departure.available_spots == 0):
+        schedule_calendar_rebuild([departure.tour_id])
+
+
+def take_seats(departure, seats):
+    """
+    Take `seats` spots of a bookable departure. Returns False when there
+    aren't enough. Must run inside the transaction that records the hold.
+    """
+    taken = TourDeparture.objects.filter(
+        pk=departure.pk, status__in=AVAILABLE_STATUSES, available_spots__gte=seats,
+    ).update(**_seat_update(-seats))
+    if not taken:
+        return False
+    # The UPDATE holds the row until commit, so this reads its own result
+    _seats_changed(departure, seats)
+    return True
+
+
+def return_seats(departure, seats):
+    """Give `seats` spots back to a departure (inside the releasing transaction)."""
+    TourDeparture.objects.filter(pk=departure.pk).update(**_seat_update(seats))
+    _seats_changed(departure, -seats)
+
+
+# ============================================================================
+# Booking lifecycle
+# ============================================================================
+
+def quote_booking(tour, travel_date, adults, children=0, singles=0, departure=None, now=None):
+    """
+    Return the apps.tours.pricing Quote of a party on a date (on the
+    departure when given). Raises BookingError when the tour isn't sold on
+    that date.
+    """
+    rules = PriceRules.load([tour.pk], now, travel_date, travel_date)
+    quote = rules.quote(tour.pk, travel_date, adults, children, singles, departure)
+    if quote is None:
+        raise BookingError('This tour is not available on the selected date.')
+    return quote
+
+
+def create_booking(tour, travel_date, adults, children=0, infants=0, singles=0, departure=None, user=None,
+                   promo_code=None, now=None, **details):
+    """
+    Create a pending booking, holding its seats when it is on a departure.
+
+    `details` are the remaining Booking fields (lead traveler, special
+    requests). Raises BookingError when the departure can't seat the party
+    or the promo code can't be used.
+    """
+    now = now or timezone.now()
+    quote = quote_booking(tour, travel_date, adults, children, singles, departure, now)
+    base_price, discount_amount, total_price = quote.base_price, quote.discount_amount, quote.total_price
+    rule = None
+    if promo_code:
+        try:
+            rule = get_promo_rule(promo_code)
+            promo_discount = rule.evaluate(tour, total_price, travel_date, now, discounted=discount_amount > 0)
+            rule.check_usage(details.get('lead_traveler_email'))
+        except InvalidPromoCode as e:
+            raise BookingError(str(e))
+        discount_amount += promo_discount
+        total_price -= promo_discount
+
+    booking = Booking(
+        user=user, tour=tour, departure=departure, travel_date=travel_date,
+        return_date=departure.return_date if departure is not None else None,
+        adults=adults, children=children, infants=infants, singles=singles,
+        base_price=base_price, discount_amount=discount_amount, total_price=total_price,
+        currency=tour.currency, promo_code_id=rule.promo_id if rule else None, **details
+    )
+    if departure is None:
+        with transaction.atomic():
+            booking.save()
+            _redeem(booking, rule)
+        return booking
+
+    booking.seats = adults + children
+    booking.hold_expires_at = now + timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+    for attempt in range(2):
+        if _insert_holding(booking, departure, rule):
+            return booking
+        # Seats held by abandoned bookings go back on sale first
+        if not release_expired_holds(now, departure=departure):
+            break
+    raise BookingError('Not enough seats are left on this departure.')
+
+
+def _redeem(booking, rule):
+    """Count the booking's use of its promo code (inside the booking's transaction)."""
+    if rule is None:
+        return
+    try:
+        redeem_promo_code(rule, booking.lead_traveler_email)
+    except InvalidPromoCode as e:
+        raise BookingError(str(e))
+
+
+def _insert_holding(booking, departure, rule=None):
+    """Insert the booking and take its seats in one transaction; False if they're gone."""
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                # Inserting first keeps the departure row locked only for the UPDATE and commit
+                booking.save(force_insert=True)
+                _redeem(booking, rule)
+                if not take_seats(departure, booking.seats):
+                    transaction.set_rollback(True)
+                    booking.pk = None
+                    return False
+                return True
+        except IntegrityError:
+            # Booking reference collision
+            booking.pk = None
+            booking.booking_reference = generate_booking_reference()
+    raise BookingError('Could not create the booking, please try again.')
+
+
+def confirm_booking(booking, now=None):
+    """
+    Confirm a pending booking whose hold hasn't expired. Confirming an
+    already confirmed booking returns it unchanged.
+    """
+    now = now or timezone.now()
+    Booking.objects.filter(pk=booking.pk, status=BookingStatus.PENDING).filter(
+        Q(hold_expires_at__isnull=True) | Q(hold_expires_at__gt=now)
+    ).update(status=BookingStatus.CONFIRMED, confirmed_at=now, hold_expires_at=None, updated_at=now)
+
+    booking.refresh_from_db()
+    if booking.status != BookingStatus.CONFIRMED:
+        raise BookingError(f'A {booking.get_status_display().lower()} booking cannot be confirmed.')
+    return booking
+
+
+def cancel_booking(booking, reason='', now=None):
+    """Cancel a pending or confirmed booking and release its seats."""
+    now = now or timezone.now()
+    if booking.travel_date < timezone.localdate(now):
+        raise BookingError('Past bookings cannot be cancelled.')
+    if not _release(booking, HOLDING_STATUSES, reason, now):
+        booking.refresh_from_db()
+        if booking.status != BookingStatus.CANCELLED:
+            raise BookingError(f'A {booking.get_status_display().lower()} booking cannot be cancelled.')
+    return booking
+
+
+def release_expired_holds(now=None, departure=None):
+    """Cancel pending bookings whose hold has expired; return how many were released."""
+    now = now or timezone.now()
+    expired = Booking.objects.filter(status=BookingStatus.PENDING, hold_expires_at__lte=now)
+    if departure is not None:
+        expired = expired.filter(departure=departure)
+
+    released = 0
+    for booking in expired.select_related('departure'):
+        if _release(booking, [BookingStatus.PENDING], 'Hold expired', now, expired_by=now):
+            released += 1
+    return released
+
+
+def _release(booking, statuses, reason, now, expired_by=None):
+    """Move the booking to cancelled if it is in `statuses`, returning its seats once."""
+    matching = Booking.objects.filter(pk=booking.pk, status__in=statuses)
+    if expired_by is not None:
+        matching = matching.filter(hold_expires_at__lte=expired_by)
+
+    with transaction.atomic():
+        if not matching.update(
+            status=BookingStatus.CANCELLED, cancelled_at=now, cancellation_reason=reason,
+            hold_expires_at=None, updated_at=now,
+        ):
+            return False
+        if booking.departure_id is not None and booking.seats:
+            return_seats(booking.departure, booking.seats)
+        if booking.promo_code_id is not None:
+            release_promo_code(booking.promo_code_id, booking.lead_traveler_email)
+
+    booking.status, booking.cancelled_at = BookingStatus.CANCELLED, now
+    booking.cancellation_reason, booking.hold_expires_at = reason, None
+    return True
@@ -0,0 +1,108 @@
+"""
+Booking serializers for API.
+"""
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.tours.models import Tour, TourDeparture
+from apps.tours.serializers import TourDepartureSerializer
+from .models import Booking
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    tour_name = serializers.CharField(source='tour.name', read_only=True)
+    tour_slug = serializers.CharField(source='tour.slug', read_only=True)
+    departure = TourDepartureSerializer(read_only=True)
+    total_travelers = serializers.IntegerField(read_only=True)
+    promo_code = serializers.SlugRelatedField(slug_field='code', read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'booking_reference', 'tour', 'tour_name', 'tour_slug', 'departure',
+            'travel_date', 'return_date',
+            'adults', 'children', 'infants', 'singles', 'total_travelers',
+            'lead_traveler_name', 'lead_traveler_email',
+            'lead_traveler_phone', 'lead_traveler_country',
+            'base_price', 'discount_amount', 'total_price', 'currency', 'promo_code',
+            'status', 'hold_expires_at', 'special_requests',
+            'confirmed_at', 'cancelled_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class BookingCreateSerializer(serializers.ModelSerializer):
+    """
+    Validate a booking request. A tour with scheduled departures is booked
+    on one of them, given by `departure` or by its `travel_date`.
+    """
+    tour = serializers.PrimaryKeyRelatedField(queryset=Tour.objects.filter(is_published=True))
+    departure = serializers.PrimaryKeyRelatedField(
+        queryset=TourDeparture.objects.all(), required=False, allow_null=True
+    )
+    travel_date = serializers.DateField(required=False)
+    promo_code = serializers.CharField(required=False, allow_blank=True, max_length=30)
+
+    class Meta:
+        model = Booking
+        fields = [
+            'tour', 'departure', 'travel_date',
+            'adults', 'children', 'infants', 'singles',
+            'lead_traveler_name', 'lead_traveler_email',
+            'lead_traveler_phone', 'lead_traveler_country',
+            'special_requests', 'promo_code'
+        ]
+
+    def validate_lead_traveler_email(self, value):
+        return value.lower().strip()
+
+    def validate(self, attrs):
+        tour = attrs['tour']
+        departure = attrs.get('departure')
+        travel_date = attrs.get('travel_date')
+        today = timezone.localdate()
+
+        upcoming = tour.departures.filter(departure_date__gte=today).exclude(status='cancelled')
+        if departure is None and travel_date is not None and upcoming.exists():
+            departure = upcoming.filter(departure_date=travel_date).order_by('pk').first()
+            if departure is None:
+                raise serializers.ValidationError({'travel_date': 'There is no departure on this date.'})
+        if departure is not None:
+            if departure.tour_id != tour.pk:
+                raise serializers.ValidationError({'departure': 'This departure belongs to another tour.'})
+            travel_date = departure.departure_date
+        if travel_date is None:
+            raise serializers.ValidationError({'travel_date': 'A travel date or departure is required.'})
+        if travel_date < today:
+            raise serializers.ValidationError({'travel_date': 'The travel date has already passed.'})
+
+        seats = attrs.get('adults', 1) + attrs.get('children', 0)
+        if seats > tour.max_group_size:
+            raise serializers.ValidationError(
+                f'This tour takes at most {tour.max_group_size} travelers per booking.'
+            )
+        if attrs.get('singles', 0) > seats:
+            raise serializers.ValidationError({'singles': 'More travelers are in single rooms than in the party.'})
+
+        attrs['departure'], attrs['travel_date'] = departure, travel_date
+        return attrs
+
+
+class BookingLookupSerializer(serializers.Serializer):
+    booking_reference = serializers.CharField()
+    email = serializers.EmailField()
+
+
+class PromoCodeValidateSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=30)
+    tour_id = serializers.IntegerField(required=False, allow_null=True)
+    total = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True
+    )
+    travel_date = serializers.DateField(required=False, allow_null=True)
+    email = serializers.EmailField(required=False)
+
+
+class BookingCancelSerializer(serializers.Serializer):
+    reason = serializers.CharField(required=False, allow_blank=True, allow_null=True, default='')
+    email = serializers.EmailField(required=False)
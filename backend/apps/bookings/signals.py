@@ -0,0 +1,24 @@
+"""
+Signal wiring for the bookings app.
+"""
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from apps.core.conditional import track_versions
+from .models import Booking, PromoCode
+from .promotions import release_promo_code
+from .reservations import HOLDING_STATUSES, return_seats
+
+# Versions of the compiled promo code rules
+track_versions(PromoCode)
+
+
+@receiver(pre_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    """Deleting a booking that still holds seats (e.g. in the admin) gives them back."""
+    if instance.status not in HOLDING_STATUSES:
+        return
+    if instance.departure_id is not None and instance.seats:
+        return_seats(instance.departure, instance.seats)
+    if instance.promo_code_id is not None:
+        release_promo_code(instance.promo_code_id, instance.lead_traveler_email)
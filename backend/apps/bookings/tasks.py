@@ -0,0 +1,23 @@
+"""
+Celery tasks for bookings.
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def release_expired_holds_task():
+    """
+    Release the seats of pending bookings whose hold has expired.
+
+    Returns:
+        dict: Number of released bookings
+    """
+    from .reservations import release_expired_holds
+
+    released = release_expired_holds()
+    if released:
+        logger.info(f"Released {released} expired booking holds")
+    return {'released': released}
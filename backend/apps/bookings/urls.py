@@ -0,0 +1,19 @@
+"""
+Booking URL routes.
+"""
+from django.urls import path
+from . import views
+
+app_name = 'bookings'
+
+urlpatterns = [
+    path('', views.BookingListView.as_view(), name='list'),
+    path('create/', views.BookingCreateView.as_view(), name='create'),
+    path('lookup/', views.BookingLookupView.as_view(), name='lookup'),
+    path('promo/validate/', views.PromoCodeValidateView.as_view(), name='promo-validate'),
+
+    # By reference
+    path('<str:booking_reference>/', views.BookingDetailView.as_view(), name='detail'),
+    path('<str:booking_reference>/cancel/', views.BookingCancelView.as_view(), name='cancel'),
+    path('<str:booking_reference>/confirm/', views.BookingConfirmView.as_view(), name='confirm'),
+]
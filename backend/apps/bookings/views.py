@@ -0,0 +1,189 @@
+"""
+Booking views for API.
+"""
+import logging
+
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from apps.core.throttling import AnonWindowRateThrottle
+from apps.tours.models import Tour
+from .models import Booking
+from .promotions import InvalidPromoCode, get_promo_rule, has_tour_discount
+from .reservations import BookingError, cancel_booking, confirm_booking, create_booking
+from .serializers import (
+    BookingCancelSerializer, BookingCreateSerializer, BookingLookupSerializer, BookingSerializer,
+    PromoCodeValidateSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BookingThrottle(AnonWindowRateThrottle):
+    """
+    Booking creation, lookup and promo codes for guests - 30 requests per hour.
+
+    Counted with atomic increments so concurrent workers can't lose requests,
+    under its own scope so they don't share the global anon counter.
+    """
+    scope = 'booking'
+    rate = '30/hour'
+
+
+def get_user_booking(request, booking_reference, email=None):
+    """A booking of the current user (any booking for staff), or of the given lead email."""
+    bookings = Booking.objects.select_related('tour', 'departure')
+    if request.user.is_staff:
+        return get_object_or_404(bookings, booking_reference=booking_reference)
+    if email:
+        return get_object_or_404(
+            bookings, booking_reference=booking_reference, lead_traveler_email__iexact=email
+        )
+    if request.user.is_authenticated:
+        return get_object_or_404(bookings, booking_reference=booking_reference, user=request.user)
+    return None
+
+
+class BookingListView(generics.ListAPIView):
+    """Bookings of the current user."""
+    serializer_class = BookingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Booking.objects.none()
+        return Booking.objects.filter(user=self.request.user).select_related('tour', 'departure')
+
+
+class BookingCreateView(generics.CreateAPIView):
+    """
+    Book a tour. Bookings on a departure hold their seats until confirmed
+    or until the hold expires (`hold_expires_at`).
+    """
+    serializer_class = BookingCreateSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [BookingThrottle]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user if request.user.is_authenticated else None
+
+        try:
+            booking = create_booking(user=user, **serializer.validated_data)
+        except BookingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Booking {booking.booking_reference} created for tour {booking.tour_id}")
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+class BookingDetailView(generics.RetrieveAPIView):
+    """A booking of the current user by reference (guests use the lookup)."""
+    serializer_class = BookingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        return get_user_booking(self.request, self.kwargs['booking_reference'])
+
+
+class BookingLookupView(generics.GenericAPIView):
+    """Find a booking by reference and lead traveler email."""
+    serializer_class = BookingLookupSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [BookingThrottle]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking = Booking.objects.select_related('tour', 'departure').filter(
+            booking_reference=serializer.validated_data['booking_reference'].strip().upper(),
+            lead_traveler_email__iexact=serializer.validated_data['email'],
+        ).first()
+
+        if booking is None:
+            return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(BookingSerializer(booking).data)
+
+
+class BookingCancelView(generics.GenericAPIView):
+    """Cancel a booking and release its seats (owners, or guests with the lead email)."""
+    serializer_class = BookingCancelSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [BookingThrottle]
+
+    def post(self, request, booking_reference):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking = get_user_booking(request, booking_reference, serializer.validated_data.get('email'))
+        if booking is None:
+            return Response(
+                {'error': 'Log in or provide the lead traveler email to cancel this booking'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            cancel_booking(booking, serializer.validated_data['reason'] or '')
+        except BookingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Booking {booking.booking_reference} cancelled")
+        return Response(BookingSerializer(booking).data)
+
+
+class BookingConfirmView(generics.GenericAPIView):
+    """Confirm a pending booking (staff, e.g. once it is paid). Safe to repeat."""
+    serializer_class = BookingSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, booking_reference):
+        booking = get_object_or_404(Booking, booking_reference=booking_reference)
+        try:
+            confirm_booking(booking)
+        except BookingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(BookingSerializer(booking).data)
+
+
+class PromoCodeValidateView(generics.GenericAPIView):
+    """
+    Check a promo code for a tour and return the discount on `total`.
+    Restrictions that need the travel date or email are checked when given.
+    """
+    serializer_class = PromoCodeValidateSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [BookingThrottle]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        total, travel_date = data.get('total'), data.get('travel_date')
+
+        tour = None
+        if data.get('tour_id') is not None:
+            tour = Tour.objects.filter(pk=data['tour_id'], is_published=True).first()
+            if tour is None:
+                return Response({'error': 'Tour not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            rule = get_promo_rule(data['code'])
+            discount = rule.evaluate(
+                tour, total, travel_date,
+                discounted=tour is not None and has_tour_discount(tour, travel_date),
+            )
+            rule.check_usage(data.get('email'))
+        except InvalidPromoCode as e:
+            return Response({'valid': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'valid': True,
+            'code': rule.code,
+            'description': rule.description,
+            'discount_type': rule.discount_type,
+            'discount_value': str(rule.discount_value),
+            'discount_amount': None if discount is None else str(discount),
+            'total': None if total is None else str(total),
+            'final_total': None if total is None else str(total - discount),
+        })
@@ -0,0 +1,8 @@
+"""
+Signal wiring for the contact app.
+"""
+from apps.core.conditional import track_versions
+from .models import FAQ, Office, Statistic
+
+# ETag / response cache versions
+track_versions(FAQ, Office, Statistic)
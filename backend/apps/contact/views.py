@@ -8,6 +8,8 @@ from rest_framework.views import APIView
 from rest_framework.throttling import AnonRateThrottle
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.response_cache import ResponseCacheMixin
 from .models import Inquiry, Newsletter, FAQ, Office, Statistic
 from .serializers import (
     InquirySerializer, NewsletterSerializer, FAQSerializer, OfficeSerializer, StatisticSerializer
@@ -284,9 +286,10 @@ class NewsletterStatusView(APIView):
             }, status=status.HTTP_200_OK)
 
 
-class FAQListView(generics.ListAPIView):
+class FAQListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List all FAQs."""
     serializer_class = FAQSerializer
+    version_models = [FAQ]
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
@@ -299,18 +302,20 @@ class FAQListView(generics.ListAPIView):
         return queryset
 
 
-class OfficeListView(generics.ListAPIView):
+class OfficeListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List all offices."""
     serializer_class = OfficeSerializer
+    version_models = [Office]
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
         return Office.objects.filter(is_active=True)
 
 
-class StatisticListView(generics.ListAPIView):
+class StatisticListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List all statistics for homepage."""
     serializer_class = StatisticSerializer
+    version_models = [Statistic]
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
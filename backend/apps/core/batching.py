@@ -0,0 +1,56 @@
+"""
+Deferred work batched until the current transaction commits.
+
+Signal handlers often fire many times per admin save (a tour plus all its
+inline rows). OnCommitBatch collects the keys they report and runs the
+handler once, after commit, with the de-duplicated set.
+
+Usage:
+    rebuild_batch = OnCommitBatch(rebuild_tour_cards)
+    rebuild_batch.add([tour.pk])
+"""
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class OnCommitBatch:
+    """Collect keys per thread and call `handler(keys)` once on commit."""
+
+    def __init__(self, handler, using=None):
+        self.handler = handler
+        self.using = using
+        self._local = threading.local()
+
+    def add(self, keys):
+        keys = {key for key in keys if key is not None}
+        if not keys:
+            return
+
+        pending = getattr(self._local, 'keys', None)
+        if pending is not None and self._is_queued():
+            pending.update(keys)
+            return
+
+        # First keys of this transaction (or the previous one rolled back)
+        self._local.keys = keys
+        transaction.on_commit(self.flush, using=self.using)
+
+    def _is_queued(self):
+        connection = transaction.get_connection(self.using)
+        return connection.in_atomic_block and any(
+            func == self.flush for sids, func in connection.run_on_commit
+        )
+
+    def flush(self):
+        keys = getattr(self._local, 'keys', None)
+        self._local.keys = None
+        if not keys:
+            return
+        try:
+            self.handler(keys)
+        except Exception:
+            logger.exception(f"{self.handler.__name__} failed for {sorted(keys, key=str)}")
@@ -0,0 +1,169 @@
+"""
+Stampede-safe caching on top of the Django cache backends.
+
+When a popular entry expires under load, every worker that misses would
+recompute it at the same moment. CoalescingCache.get_or_set() prevents
+that with three techniques:
+
+- Single flight: one caller per key computes the value, holding a lock
+  taken with cache.add(). Callers that find no value wait for it; callers
+  with a stale value return it straight away.
+- Probabilistic early expiry: as expiry approaches, each read may decide
+  to refresh early, with a probability weighted by how long the value
+  took to compute. Refreshes then spread out instead of piling up at the
+  expiry instant (the "XFetch" rule, beta=1 is the usual setting).
+- Stale-while-revalidate: entries are kept `stale_timeout` seconds past
+  their timeout. While one caller recomputes, the others keep serving the
+  previous value.
+
+Usage:
+    from apps.core.caching import shared_cache
+
+    count = shared_cache.get_or_set(key, queryset.count, 300)
+
+Coalescing works across processes when the backend is shared (cache.add()
+is atomic on Memcached, Redis and apps.core.sqlite_cache.SQLiteCache, the
+backend of the shared hosting setup). LocMemCache only coalesces the
+threads of one process.
+
+increment() is the counterpart for counters: an atomic cache.incr() that
+creates the key when it is missing.
+"""
+import math
+import random
+import time
+import uuid
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+LOCK_PREFIX = 'lock:'
+
+
+class CacheLock:
+    """A best-effort lock held in the cache, released by its owner or by timeout."""
+
+    def __init__(self, key, timeout=30, cache=None):
+        self.cache = cache or caches[DEFAULT_CACHE_ALIAS]
+        self.key = f'{LOCK_PREFIX}{key}'
+        self.timeout = timeout
+        self.token = None
+
+    def acquire(self):
+        token = uuid.uuid4().hex
+        if self.cache.add(self.key, token, self.timeout):
+            self.token = token
+            return True
+        return False
+
+    def release(self):
+        # Only delete our own lock, not one taken after ours timed out
+        if self.token is not None and self.cache.get(self.key) == self.token:
+            self.cache.delete(self.key)
+        self.token = None
+
+    def locked(self):
+        """Whether anyone holds the lock."""
+        return self.cache.get(self.key) is not None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def increment(key, delta=1, timeout=None, cache=None):
+    """Add `delta` to the counter at `key`, starting it at `delta` (for `timeout` seconds)."""
+    cache = cache or caches[DEFAULT_CACHE_ALIAS]
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout):
+            return delta
+        # Created by someone else in the meantime
+        return cache.incr(key, delta)
+
+
+def wait_for(key, accept=None, timeout=10, lock=None, poll_interval=0.05, cache=None):
+    """
+    Poll the cache until `key` holds a value `accept(value)` agrees with.
+
+    Returns the value, or None after `timeout` seconds or as soon as `lock`
+    (the CacheLock of whoever computes the value) is released without
+    leaving an accepted value.
+    """
+    cache = cache or caches[DEFAULT_CACHE_ALIAS]
+    deadline = time.monotonic() + timeout
+    delay = poll_interval
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        value = cache.get(key)
+        if value is not None and (accept is None or accept(value)):
+            return value
+        if lock is not None and not lock.locked():
+            return None
+        delay = min(delay * 2, 0.5)
+    return None
+
+
+class CoalescingCache:
+    """get_or_set() with single-flight locks, early expiry and stale-while-revalidate."""
+
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS, stale_timeout=300, beta=1.0,
+                 lock_timeout=30, wait_timeout=10):
+        self.alias = alias
+        self.stale_timeout = stale_timeout
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_or_set(self, key, compute, timeout):
+        """Return the cached value of `key`, computing it with `compute()` when needed."""
+        entry = self.cache.get(key)
+        if entry is not None and not self.should_refresh(entry):
+            return entry[0]
+
+        lock = CacheLock(key, self.lock_timeout, self.cache)
+        if lock.acquire():
+            try:
+                return self._compute(key, compute, timeout)
+            finally:
+                lock.release()
+
+        # Someone else is computing: serve the stale value, or wait for theirs
+        if entry is not None:
+            return entry[0]
+        entry = wait_for(key, self.is_fresh, self.wait_timeout, lock, cache=self.cache)
+        if entry is not None:
+            return entry[0]
+        # The lock holder failed or is too slow
+        return self._compute(key, compute, timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        value, delta, expires = entry
+        return (now or time.time()) < expires
+
+    def should_refresh(self, entry, now=None):
+        """True once expired, and with rising probability just before."""
+        value, delta, expires = entry
+        now = now or time.time()
+        # -log(u) for u in (0, 1] is an exponential draw with mean 1
+        return now - delta * self.beta * math.log(1.0 - random.random()) >= expires
+
+    def _compute(self, key, compute, timeout):
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        self.cache.set(key, (value, delta, time.time() + timeout), timeout + self.stale_timeout)
+        return value
+
+
+shared_cache = CoalescingCache()
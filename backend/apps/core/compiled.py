@@ -0,0 +1,263 @@
+"""
+Compiled fast-path serializers for read-only list endpoints.
+
+DRF builds every object with field introspection, attribute lookups and
+per-instance language resolution. compile_serializer() turns a read
+serializer into a flat plan over `values()` rows instead:
+
+    plan = compile_serializer(DestinationListSerializer, request)
+    rows = queryset.values(*plan.columns)
+    data = plan.serialize(rows, request)
+
+The output matches the serializer exactly (same keys, order and values),
+which `test_compiled_serializers.py` checks against the real serializers.
+The language and the ?fields= selection are resolved once per request and
+plans are cached per (serializer, language, selection). Requested names
+the serializer doesn't declare are dropped from the selection, and the
+MAX_PLANS most recently used plans are kept, so random ?fields= values
+cannot grow the cache.
+
+Supported fields: model fields (including dotted sources), file/image
+fields, translated fields (TRANSLATABLE_FIELDS) and nested serializers on
+foreign keys. SerializerMethodFields and model properties need an entry in
+the serializer's COMPILED_FIELDS:
+
+    COMPILED_FIELDS = {
+        'author_display': (['author_name', 'author__first_name'], display_author),
+    }
+
+where the function receives the row dict. Anything else raises
+NotCompilable, and CompiledListMixin falls back to the regular serializer.
+"""
+import threading
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, FieldError
+from django.db.models import ForeignKey
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .serializers import get_request_language, get_requested_fields
+
+
+class NotCompilable(Exception):
+    """The serializer uses a field the compiler cannot translate."""
+
+
+class CompiledSerializer:
+    """A serializer compiled to (output name, getter) pairs over values() rows."""
+
+    def __init__(self, serializer, language, prefix=''):
+        self.language = language
+        self.prefix = prefix
+        self.columns = []
+        self.getters = []
+        self._compile(serializer)
+
+    def _column(self, name):
+        column = f'{self.prefix}{name}'
+        if column not in self.columns:
+            self.columns.append(column)
+        return column
+
+    def _compile(self, serializer):
+        model = serializer.Meta.model
+        translatable = set(getattr(serializer, 'TRANSLATABLE_FIELDS', []))
+        compiled_fields = getattr(serializer, 'COMPILED_FIELDS', {})
+        hidden = {f'{field}_{code}' for field in translatable for code in ('es', 'pt')}
+
+        for name, field in serializer.fields.items():
+            if field.write_only or name in hidden:
+                continue
+
+            if name in compiled_fields:
+                columns, function = compiled_fields[name]
+                self.getters.append((name, self._custom_getter(columns, function)))
+            elif isinstance(field, serializers.ListSerializer) or isinstance(field, serializers.ManyRelatedField):
+                raise NotCompilable(f'{serializer.__class__.__name__}.{name} is a to-many field')
+            elif isinstance(field, serializers.SerializerMethodField):
+                raise NotCompilable(f'{serializer.__class__.__name__}.{name} needs COMPILED_FIELDS')
+            elif isinstance(field, serializers.BaseSerializer):
+                self.getters.append((name, self._nested_getter(model, field)))
+            elif isinstance(field, serializers.FileField):
+                self.getters.append((name, self._file_getter(model, field)))
+            elif name in translatable and self.language != 'en':
+                self.getters.append((name, self._translated_getter(model, field)))
+            else:
+                self.getters.append((name, self._value_getter(model, field)))
+
+    def _source_column(self, model, field):
+        if field.source == '*':
+            raise NotCompilable(f'{field.field_name} uses source="*"')
+        path = field.source.split('.')
+        current = model
+        for part in path:
+            try:
+                model_field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                raise NotCompilable(f'{field.source} is not a model field')
+            current = model_field.related_model or current
+        return self._column('__'.join(path))
+
+    def _value_getter(self, model, field):
+        column = self._source_column(model, field)
+        to_representation = field.to_representation
+
+        def get(row, request):
+            value = row[column]
+            return None if value is None else to_representation(value)
+        return get
+
+    def _translated_getter(self, model, field):
+        column = self._source_column(model, field)
+        localized = self._column(f'{field.source}_{self.language}')
+        to_representation = field.to_representation
+
+        def get(row, request):
+            # Same as MultiLanguageSerializerMixin: a non-empty translation
+            # replaces the represented base value as is
+            if row[localized]:
+                return row[localized]
+            value = row[column]
+            return None if value is None else to_representation(value)
+        return get
+
+    def _file_getter(self, model, field):
+        column = self._source_column(model, field)
+        storage = model._meta.get_field(field.source).storage
+
+        def get(row, request):
+            name = row[column]
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return get
+
+    def _nested_getter(self, model, field):
+        try:
+            relation = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise NotCompilable(f'{field.source} is not a model field')
+        if not isinstance(relation, ForeignKey):
+            raise NotCompilable(f'{field.source} is not a foreign key')
+
+        nested = CompiledSerializer(field, self.language, f'{self.prefix}{field.source}__')
+        for column in nested.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        key = self._column(relation.attname)
+        getters = nested.getters
+
+        def get(row, request):
+            if row[key] is None:
+                return None
+            return {name: getter(row, request) for name, getter in getters}
+        return get
+
+    def _custom_getter(self, columns, function):
+        names = {column: self._column(column) for column in columns}
+
+        def get(row, request):
+            return function({column: row[name] for column, name in names.items()})
+        return get
+
+    def serialize(self, rows, request=None):
+        getters = self.getters
+        return [{name: getter(row, request) for name, getter in getters} for row in rows]
+
+
+MAX_PLANS = 500
+
+# {(serializer class, language, fields, include): CompiledSerializer or None}, least recently used first
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+# {serializer class: names ?fields= and ?include= can select}
+_field_names = {}
+
+
+def _selectable_names(serializer_class):
+    names = _field_names.get(serializer_class)
+    if names is None:
+        # Without a request the serializer renders its default fields
+        names = set(serializer_class(context={}).fields) | set(getattr(serializer_class, 'OPTIONAL_FIELDS', []))
+        names |= {name[:-3] for name in names if name[-3:] in ('_es', '_pt')}
+        _field_names[serializer_class] = names
+    return names
+
+
+def _store_plan(key, plan):
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > MAX_PLANS:
+            _plans.popitem(last=False)
+
+
+def compile_serializer(serializer_class, request=None, language=None):
+    """
+    Return the CompiledSerializer of a serializer class for a request.
+
+    Raises NotCompilable when the serializer has unsupported fields.
+    """
+    language = language or get_request_language(request)
+    fields, include = get_requested_fields(request)
+    names = _selectable_names(serializer_class)
+    key = (
+        serializer_class, language,
+        None if fields is None else frozenset(fields) & names, frozenset(include) & names,
+    )
+    with _plans_lock:
+        cached = key in _plans
+        plan = _plans.get(key)
+        if cached:
+            _plans.move_to_end(key)
+    if cached:
+        if plan is None:
+            raise NotCompilable(serializer_class.__name__)
+        return plan
+
+    serializer = serializer_class(context={'request': request, 'language': language})
+    try:
+        plan = CompiledSerializer(serializer, language)
+    except NotCompilable:
+        _store_plan(key, None)
+        raise
+    _store_plan(key, plan)
+    return plan
+
+
+class CompiledListMixin:
+    """
+    Serve a ListAPIView from compiled serializers over values() rows.
+
+    Falls back to the regular serializer when the serializer cannot be
+    compiled or the queryset cannot provide its columns. The queryset's
+    select/prefetch lookups and deferred columns are ignored: values()
+    joins and reads exactly what the columns need.
+    """
+
+    def list(self, request, *args, **kwargs):
+        try:
+            plan = compile_serializer(self.get_serializer_class(), request)
+        except NotCompilable:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # Keyset pagination reads its cursor from the rows
+        columns = list(plan.columns)
+        for name in getattr(self.paginator, 'keyset', ()):
+            column = queryset.model._meta.get_field(name.lstrip('-')).attname
+            if column not in columns:
+                columns.append(column)
+
+        try:
+            rows = queryset.prefetch_related(None).values(*columns)
+        except FieldError:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page, request))
+        return Response(plan.serialize(rows, request))
@@ -0,0 +1,217 @@
+"""
+Conditional GET (ETag / Last-Modified) for read-only API views.
+
+Every tracked model has a ContentVersion row that is bumped once per
+transaction whenever its rows change (save, delete, M2M change or counter
+update). A view lists the models its response depends on:
+
+    class TourDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+        version_models = [Tour, TourImage, TourDeparture, ...]
+        version_interval = 60   # time-dependent content, see below
+
+The ETag is a hash of the path, the normalized query string, the request
+language and the versions of those models, and Last-Modified is the latest
+change among them. Both come from a single query on ContentVersion, so a
+matching If-None-Match / If-Modified-Since is answered with 304 before the
+view touches the content tables or runs a serializer.
+
+Responses that also depend on the clock list the sources of the instants
+they change at in `transition_sources` (offer windows, midnight for
+departures from today on; see apps.core.transitions): the validators
+change as each instant passes. Content that changes continuously, like a
+seconds countdown, sets `version_interval` instead: the validators then
+change at least every that many seconds.
+
+Models are tracked with track_versions() from the app's signals module.
+Changes also bump per-row object tags ('tours.tour:5'), which the response
+cache in apps.core.response_cache uses for detail responses, and per-parent
+child tags, which apps.core.fragments uses.
+"""
+import hashlib
+import time
+from datetime import datetime
+
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, urlencode
+
+from .batching import OnCommitBatch
+from .counters import counters_changed
+from .models import ContentVersion
+from .serializers import get_request_language
+
+# updated_at of labels that have no ContentVersion row yet
+NEVER_CHANGED = datetime.fromtimestamp(0, timezone.utc)
+
+
+def version_label(model):
+    """ContentVersion label of a model class (or a label passed through)."""
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def bump_versions(models):
+    """Increment the versions of the given models (classes or labels)."""
+    labels = sorted({version_label(model) for model in models})
+    if not labels:
+        return
+    now = timezone.now()
+    updated = ContentVersion.objects.filter(label__in=labels).update(
+        version=F('version') + 1, updated_at=now
+    )
+    if updated < len(labels):
+        ContentVersion.objects.bulk_create(
+            [ContentVersion(label=label, version=1, updated_at=now) for label in labels],
+            ignore_conflicts=True,
+        )
+
+
+def get_versions(models):
+    """
+    Return {label: (version, updated_at)} for the given models in one query.
+
+    Labels without a row were never changed since tracking started: they
+    read as version 0 at NEVER_CHANGED, without writing a row on the read
+    path (bump_versions() creates it with version 1).
+    """
+    labels = sorted({version_label(model) for model in models})
+    rows = ContentVersion.objects.filter(label__in=labels).values_list('label', 'version', 'updated_at')
+    versions = {label: (version, updated_at) for label, version, updated_at in rows}
+    for label in labels:
+        versions.setdefault(label, (0, NEVER_CHANGED))
+    return versions
+
+
+_bump_batch = OnCommitBatch(bump_versions)
+
+
+def schedule_version_bump(models):
+    """Bump the versions of the given models once the current transaction commits."""
+    _bump_batch.add(version_label(model) for model in models)
+
+
+def object_tag(model, pk):
+    """Version label of one row, e.g. 'tours.tour:5'."""
+    return f'{version_label(model)}:{pk}'
+
+
+def child_tag(model, parent_model, parent_pk):
+    """Version label of one parent's rows of a child model, e.g. 'tours.tourimage@tours.tour:5'."""
+    return f'{version_label(model)}@{object_tag(parent_model, parent_pk)}'
+
+
+def track_versions(*models, ignore_fields=(), parent=None):
+    """
+    Bump a model's version whenever its rows change.
+
+    Besides the model label, every change bumps the object tag of the row
+    ('tours.tour:5'). With `parent` (the name of a foreign key) it also
+    bumps the object tag of the parent row, so child rows such as tour
+    images reach their tour's tag, and the child tag of the parent
+    ('tours.tourimage@tours.tour:5'), which only changes with that model's
+    rows. Saves that only write `ignore_fields` (e.g. a view counter) are
+    not counted as changes.
+    """
+    ignore_fields = frozenset(ignore_fields)
+
+    for model in models:
+        label = version_label(model)
+        parent_field = model._meta.get_field(parent) if parent else None
+
+        def row_tags(instance, model=model, parent_field=parent_field):
+            tags = [object_tag(model, instance.pk)]
+            if parent_field is not None:
+                parent_pk = getattr(instance, parent_field.attname)
+                if parent_pk is not None:
+                    tags.append(object_tag(parent_field.related_model, parent_pk))
+                    tags.append(child_tag(model, parent_field.related_model, parent_pk))
+            return tags
+
+        def saved(sender, instance, update_fields=None, label=label, row_tags=row_tags, **kwargs):
+            if update_fields and ignore_fields and set(update_fields) <= ignore_fields:
+                return
+            schedule_version_bump([label] + row_tags(instance))
+
+        def deleted(sender, instance, label=label, row_tags=row_tags, **kwargs):
+            schedule_version_bump([label] + row_tags(instance))
+
+        def counted(sender, pks, label=label, model=model, **kwargs):
+            schedule_version_bump([label] + [object_tag(model, pk) for pk in pks])
+
+        uid = f'content_version:{label}'
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=uid)
+        counters_changed.connect(counted, sender=model, weak=False, dispatch_uid=uid)
+
+        for field in model._meta.many_to_many:
+            def linked(sender, instance, action, reverse, pk_set, label=label, model=model,
+                       field=field, **kwargs):
+                if not reverse:
+                    pks = [instance.pk] if action.startswith('post_') else []
+                elif action in ('post_add', 'post_remove'):
+                    pks = pk_set or []
+                elif action == 'pre_clear':
+                    pks = model._default_manager.filter(**{field.name: instance}).values_list('pk', flat=True)
+                else:
+                    return
+                schedule_version_bump([label] + [object_tag(model, pk) for pk in pks])
+
+            m2m_changed.connect(
+                linked, sender=field.remote_field.through, weak=False,
+                dispatch_uid=f'{uid}:{field.name}',
+            )
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified to GET responses and answer matching
+    conditional requests with 304 Not Modified.
+    """
+
+    # Models the response is built from
+    version_models = []
+    # Seconds after which time-dependent content must be revalidated
+    version_interval = None
+    # Names of the apps.core.transitions sources of the instants the content changes at
+    transition_sources = []
+
+    def get_validators(self, request):
+        """Return (etag, last_modified timestamp) for the request."""
+        versions = get_versions(self.version_models)
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        parts = [request.path, query, get_request_language(request)]
+        parts += [f'{label}:{version}' for label, (version, updated_at) in sorted(versions.items())]
+        last_modified = max(
+            (updated_at.timestamp() for version, updated_at in versions.values()), default=0
+        )
+
+        if self.transition_sources:
+            from .transitions import transition_window
+            last, upcoming = transition_window(self.transition_sources, versions=versions)
+            if last is not None:
+                parts.append(f'transition:{last}')
+                last_modified = max(last_modified, last)
+
+        if self.version_interval:
+            window = int(time.time() // self.version_interval)
+            parts.append(f'window:{window}')
+            last_modified = max(last_modified, window * self.version_interval)
+
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'W/"{digest}"', int(last_modified)
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            # A stale copy served during a rebuild must not be revalidated as current
+            if response.get('X-Cache') != 'STALE':
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ['Accept-Language'])
+            patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,277 @@
+"""
+Denormalized counter caches.
+
+Stores counts such as TourCategory.tour_count on the parent row and keeps
+them up to date incrementally from signals on the counted (child) model,
+so listings read the count from the row instead of running a COUNT per row.
+
+Usage (in an app's signals module):
+
+    from apps.core.counters import CounterCache, register_counter
+
+    register_counter(CounterCache(Tour, 'category', 'tour_count', {'is_published': True}))
+
+Drift (e.g. rows changed with queryset.update()) is repaired in bulk by the
+`reconcile_counters` management command.
+"""
+import logging
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Sent after stored counts change. Arguments: sender (parent model), pks, field.
+counters_changed = Signal()
+
+# Registered counters, grouped by the counted (child) model
+_registry = defaultdict(list)
+
+# Marks a save whose update_fields cannot affect any count
+_UNCHANGED = object()
+
+
+class CounterCache:
+    """
+    A count of child rows stored in an integer field on the parent row.
+
+    Args:
+        child: model whose rows are counted, e.g. Tour
+        relation: ForeignKey or ManyToManyField on `child` pointing at the parent
+        counter_field: integer field on the parent holding the count
+        conditions: {child attname: value} a row must match to be counted,
+            e.g. {'is_published': True} or {'parent_id': None}
+    """
+
+    def __init__(self, child, relation, counter_field, conditions=None):
+        self.child = child
+        self.relation = relation
+        self.field = child._meta.get_field(relation)
+        self.parent = self.field.related_model
+        self.counter_field = counter_field
+        self.conditions = conditions or {}
+        self.many_to_many = self.field.many_to_many
+
+    def __str__(self):
+        return f'{self.parent._meta.label}.{self.counter_field}'
+
+    @property
+    def tracked_fields(self):
+        """Child attnames whose change can move a row in or out of a count."""
+        fields = set(self.conditions)
+        if not self.many_to_many:
+            fields.add(self.field.attname)
+        return fields
+
+    def is_counted(self, values):
+        """Check whether a child row (dict of attname -> value) is counted."""
+        return all(values.get(name) == value for name, value in self.conditions.items())
+
+    def values_of(self, instance):
+        return {name: getattr(instance, name) for name in self.tracked_fields}
+
+    def adjust(self, pks, delta):
+        """Add `delta` to the stored count of the given parent rows."""
+        pks = [pk for pk in pks if pk is not None]
+        if not pks or not delta:
+            return
+        field = self.counter_field
+        if delta > 0:
+            value = F(field) + delta
+        else:
+            value = Greatest(F(field) + delta, Value(0))
+        self.parent._default_manager.filter(pk__in=pks).update(**{field: value})
+        counters_changed.send(sender=self.parent, pks=pks, field=field)
+
+    def related_pks(self, instance):
+        """Parent pks currently linked to a child through the M2M relation."""
+        return list(getattr(instance, self.relation).values_list('pk', flat=True))
+
+    def linked_pks(self, pk, pks, reverse=False):
+        """
+        Those of `pks` actually linked to row `pk` in the through table:
+        parent pks of a child, or child pks of a parent with `reverse`.
+        """
+        through = self.field.remote_field.through
+        child_fk = self.field.m2m_field_name()
+        parent_fk = self.field.m2m_reverse_field_name()
+        own, other = (parent_fk, child_fk) if reverse else (child_fk, parent_fk)
+        return list(through._default_manager.filter(
+            **{own: pk, f'{other}__in': pks}
+        ).values_list(other, flat=True))
+
+    # Reconciliation
+
+    def actual_count(self):
+        """Subquery expression computing the true count for each parent row."""
+        if self.many_to_many:
+            through = self.field.remote_field.through
+            child_fk = self.field.m2m_field_name()
+            parent_fk = self.field.m2m_reverse_field_name()
+            rows = through._default_manager.filter(**{parent_fk: OuterRef('pk')}, **{
+                f'{child_fk}__{name}': value for name, value in self.conditions.items()
+            })
+            group_by = parent_fk
+        else:
+            rows = self.child._default_manager.filter(
+                **{self.relation: OuterRef('pk')}, **self.conditions
+            )
+            group_by = self.relation
+        counts = rows.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    def find_drift(self):
+        """Return {actual count: [parent pks]} for rows whose stored count is wrong."""
+        drifted = defaultdict(list)
+        rows = self.parent._default_manager.annotate(
+            _actual_count=self.actual_count()
+        ).exclude(**{self.counter_field: F('_actual_count')}).values_list('pk', '_actual_count')
+        for pk, actual in rows:
+            drifted[actual].append(pk)
+        return drifted
+
+    def reconcile(self, dry_run=False):
+        """Repair drifted counts in bulk. Returns the number of rows repaired."""
+        drifted = self.find_drift()
+        repaired = sum(len(pks) for pks in drifted.values())
+        if dry_run:
+            return repaired
+        for actual, pks in drifted.items():
+            self.parent._default_manager.filter(pk__in=pks).update(**{self.counter_field: actual})
+            counters_changed.send(sender=self.parent, pks=pks, field=self.counter_field)
+        return repaired
+
+
+def register_counter(counter):
+    """Register a counter cache and connect the signals of its child model."""
+    child = counter.child
+    if not _registry[child]:
+        uid = f'counter_cache:{child._meta.label}'
+        pre_save.connect(_child_pre_save, sender=child, dispatch_uid=uid)
+        post_save.connect(_child_post_save, sender=child, dispatch_uid=uid)
+        pre_delete.connect(_child_pre_delete, sender=child, dispatch_uid=uid)
+        post_delete.connect(_child_post_delete, sender=child, dispatch_uid=uid)
+    _registry[child].append(counter)
+
+    if counter.many_to_many:
+        through = counter.field.remote_field.through
+        m2m_changed.connect(
+            _make_m2m_handler(counter), sender=through, weak=False,
+            dispatch_uid=f'counter_cache:{counter}'
+        )
+    return counter
+
+
+def get_counters():
+    """All registered counter caches."""
+    return [counter for counters in _registry.values() for counter in counters]
+
+
+def _child_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored values of a child row before it changes."""
+    instance._counter_cache_old = None
+    if instance._state.adding or instance.pk is None:
+        return
+
+    counters = _registry[sender]
+    tracked = set().union(*(counter.tracked_fields for counter in counters))
+    if update_fields is not None:
+        names = set(update_fields)
+        names.update(field.attname for field in sender._meta.concrete_fields if field.name in names)
+        if not tracked & names:
+            instance._counter_cache_old = _UNCHANGED
+            return
+
+    instance._counter_cache_old = sender._default_manager.filter(
+        pk=instance.pk
+    ).values(*tracked).first()
+
+
+def _child_post_save(sender, instance, created, **kwargs):
+    old = getattr(instance, '_counter_cache_old', None)
+    if old is _UNCHANGED:
+        return
+
+    for counter in _registry[sender]:
+        new_values = counter.values_of(instance)
+        was_counted = bool(old) and counter.is_counted(old)
+        is_counted = counter.is_counted(new_values)
+
+        if counter.many_to_many:
+            # New rows have no M2M links yet; m2m_changed counts them later
+            if created or was_counted == is_counted:
+                continue
+            counter.adjust(counter.related_pks(instance), 1 if is_counted else -1)
+            continue
+
+        attname = counter.field.attname
+        old_parent = old[attname] if was_counted else None
+        new_parent = new_values[attname] if is_counted else None
+        if old_parent != new_parent:
+            counter.adjust([old_parent], -1)
+            counter.adjust([new_parent], 1)
+
+
+def _child_pre_delete(sender, instance, **kwargs):
+    """M2M links are removed by the delete cascade without m2m_changed."""
+    instance._counter_cache_links = {
+        counter.relation: counter.related_pks(instance)
+        for counter in _registry[sender]
+        if counter.many_to_many and counter.is_counted(counter.values_of(instance))
+    }
+
+
+def _child_post_delete(sender, instance, **kwargs):
+    links = getattr(instance, '_counter_cache_links', {})
+    for counter in _registry[sender]:
+        if counter.many_to_many:
+            counter.adjust(links.get(counter.relation, []), -1)
+        elif counter.is_counted(counter.values_of(instance)):
+            counter.adjust([getattr(instance, counter.field.attname)], -1)
+
+
+def _make_m2m_handler(counter):
+    # pk_set of a remove holds the requested pks, linked or not: the linked
+    # ones are looked up before the removal, per counter
+    removed_attr = f'_counter_cache_removed_{counter.parent._meta.model_name}_{counter.counter_field}'
+
+    def handler(instance, action, reverse, pk_set, **kwargs):
+        if reverse:
+            # instance is the parent, pk_set holds child pks
+            if action == 'pre_clear':
+                instance._counter_cache_cleared = counter.child._default_manager.filter(
+                    **{counter.relation: instance.pk}, **counter.conditions
+                ).count()
+            elif action == 'post_clear':
+                counter.adjust([instance.pk], -getattr(instance, '_counter_cache_cleared', 0))
+            elif action == 'pre_remove' and pk_set:
+                setattr(instance, removed_attr, counter.child._default_manager.filter(
+                    pk__in=counter.linked_pks(instance.pk, pk_set, reverse=True), **counter.conditions
+                ).count())
+            elif action == 'post_remove' and pk_set:
+                counter.adjust([instance.pk], -getattr(instance, removed_attr, 0))
+            elif action == 'post_add' and pk_set:
+                counted = counter.child._default_manager.filter(
+                    pk__in=pk_set, **counter.conditions
+                ).count()
+                counter.adjust([instance.pk], counted)
+            return
+
+        # instance is the child, pk_set holds parent pks
+        if not counter.is_counted(counter.values_of(instance)):
+            return
+        if action == 'pre_clear':
+            instance._counter_cache_cleared = counter.related_pks(instance)
+        elif action == 'post_clear':
+            counter.adjust(getattr(instance, '_counter_cache_cleared', []), -1)
+        elif action == 'post_add' and pk_set:
+            counter.adjust(pk_set, 1)
+        elif action == 'pre_remove' and pk_set:
+            setattr(instance, removed_attr, counter.linked_pks(instance.pk, pk_set))
+        elif action == 'post_remove' and pk_set:
+            counter.adjust(getattr(instance, removed_attr, []), -1)
+
+    return handler
@@ -0,0 +1,114 @@
+"""
+Fragment cache for detail views.
+
+A detail response embeds lists of child rows (a tour's images, itinerary,
+departures...) that change at very different rates. FragmentCacheMixin
+renders each of those fields separately and caches it per object and
+language, keyed by the child tag of its model (see
+apps.core.conditional.child_tag), so a change to one child model only
+renders that field again:
+
+    class TourDetailView(FragmentCacheMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
+        fragment_models = {'images': TourImage, 'departures': TourDeparture, ...}
+
+The child models must be tracked with track_versions(parent=...) on the
+foreign key to the view's model, and the fields' serializers may only read
+the child rows. The view's field_prefetch_related lookups for fragment
+fields only run for the fragments that are not cached. The other fields are
+rendered as usual on every request.
+
+Fragments are keyed by version, so outdated fragments are never read and
+simply expire. The versions are read before rendering, which makes a
+fragment at worst newer than its key.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from .conditional import child_tag, get_versions
+from .serializers import get_request_language
+
+KEY_PREFIX = 'fragment'
+
+
+def fragment_cache_key(request, name, tag, version):
+    """Cache key of a fragment: host, field, child tag and version, and language."""
+    parts = [request.get_host(), name, tag, str(version), get_request_language(request)]
+    return f"{KEY_PREFIX}:{hashlib.md5('|'.join(parts).encode()).hexdigest()}"
+
+
+class FragmentCacheMixin:
+    """Render child-list fields of a detail response from per-object fragment caches."""
+
+    # Serializer field name -> child model whose rows the field renders
+    fragment_models = {}
+
+    def get_fragment_timeout(self):
+        return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600)
+
+    def get_loaded_fields(self):
+        return super().get_loaded_fields() - set(self.fragment_models)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+
+        order = list(serializer.fields)
+        fields = {name: serializer.fields.pop(name) for name in order if name in self.fragment_models}
+        data = serializer.data
+        fragments = self.get_fragments(instance, fields)
+
+        # Put the fragments back in field order (to_representation may drop fields)
+        return Response(ReturnDict(
+            [
+                (name, fragments[name] if name in fragments else data[name])
+                for name in order if name in fragments or name in data
+            ],
+            serializer=serializer,
+        ))
+
+    def get_fragments(self, instance, fields):
+        """Return {field name: rendered data} from the cache, rendering missing fragments."""
+        if not fields:
+            return {}
+        tags = {
+            name: child_tag(self.fragment_models[name], type(instance), instance.pk) for name in fields
+        }
+        versions = get_versions(tags.values())
+        keys = {
+            name: fragment_cache_key(self.request, name, tag, versions[tag][0])
+            for name, tag in tags.items()
+        }
+
+        cached = cache.get_many(list(keys.values()))
+        fragments = {name: cached[key] for name, key in keys.items() if key in cached}
+        missing = [name for name in fields if name not in fragments]
+        if missing:
+            self.prefetch_fragments(instance, missing)
+            rendered = {
+                name: fields[name].to_representation(fields[name].get_attribute(instance))
+                for name in missing
+            }
+            cache.set_many(
+                {keys[name]: value for name, value in rendered.items()}, self.get_fragment_timeout()
+            )
+            fragments.update(rendered)
+        return fragments
+
+    def prefetch_fragments(self, instance, names):
+        """Load the relations of the given fragment fields onto the instance."""
+        projection = self.get_translation_projection()
+        lookups, seen = [], set()
+        for name in names:
+            for lookup in self.field_prefetch_related.get(name, []):
+                lookup = lookup() if callable(lookup) else lookup
+                lookup = self._project_prefetch(type(instance), lookup, projection)
+                key = getattr(lookup, 'prefetch_to', lookup)
+                if key not in seen:
+                    seen.add(key)
+                    lookups.append(lookup)
+        prefetch_related_objects([instance], *lookups)
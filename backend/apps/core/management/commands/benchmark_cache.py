@@ -0,0 +1,121 @@
+"""
+Benchmark the SQLite cache backend against Django's per-host backends.
+
+Usage:
+    python manage.py benchmark_cache
+    python manage.py benchmark_cache --operations 5000 --processes 8
+
+Each backend (LocMemCache, FileBasedCache, apps.core.sqlite_cache.SQLiteCache)
+gets a fresh location in a temporary directory. The command times set, get
+(hit and miss) and incr in one process. Then several processes increment one
+counter at the same time, as throttles do under load. It reports whether
+the parent process sees the total and how many increments were lost.
+"""
+import multiprocessing
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from apps.core.caching import increment
+
+BACKENDS = [
+    ('LocMemCache', 'django.core.cache.backends.locmem.LocMemCache'),
+    ('FileBasedCache', 'django.core.cache.backends.filebased.FileBasedCache'),
+    ('SQLiteCache', 'apps.core.sqlite_cache.SQLiteCache'),
+]
+
+VALUE = {'content': b'x' * 2048, 'content_type': 'application/json', 'versions': {'tours.tour': 12}}
+
+
+def create_cache(backend, location):
+    return import_string(backend)(location, {'OPTIONS': {'MAX_ENTRIES': 1000000}})
+
+
+def _count(backend, location, operations, start):
+    cache = create_cache(backend, location)
+    start.wait()
+    for _ in range(operations):
+        increment('counter', cache=cache)
+
+
+class Command(BaseCommand):
+    help = 'Compare the SQLite cache backend with LocMemCache and FileBasedCache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=2000, help='Operations per test')
+        parser.add_argument('--processes', type=int, default=4, help='Processes incrementing one counter')
+
+    def handle(self, *args, **options):
+        operations = options['operations']
+        processes = options['processes']
+
+        self.stdout.write(f"{'backend':16} {'set':>10} {'get hit':>10} {'get miss':>10} {'incr':>10}   (us/op)")
+        with tempfile.TemporaryDirectory() as directory:
+            locations = {name: f'{directory}/{name}' for name, backend in BACKENDS}
+            for name, backend in BACKENDS:
+                if name == 'SQLiteCache':
+                    locations[name] += '/cache.sqlite3'
+                cache = create_cache(backend, locations[name])
+                timings = self.time_operations(cache, operations)
+                self.stdout.write(f'{name:16} ' + ' '.join(f'{timing:>10.1f}' for timing in timings))
+
+            self.stdout.write('')
+            self.stdout.write(f'{processes} processes x {operations} increments of one counter:')
+            for name, backend in BACKENDS:
+                self.concurrent_increments(name, backend, locations[name], processes, operations)
+
+    def time_operations(self, cache, operations):
+        keys = [f'key:{i}' for i in range(operations)]
+        timings = []
+
+        started = time.perf_counter()
+        for key in keys:
+            cache.set(key, VALUE, 300)
+        timings.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for key in keys:
+            cache.get(key)
+        timings.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for key in keys:
+            cache.get(f'missing:{key}')
+        timings.append(time.perf_counter() - started)
+
+        cache.set('counter', 0, 300)
+        started = time.perf_counter()
+        for _ in keys:
+            cache.incr('counter')
+        timings.append(time.perf_counter() - started)
+
+        return [timing / operations * 1e6 for timing in timings]
+
+    def concurrent_increments(self, name, backend, location, processes, operations):
+        cache = create_cache(backend, location)
+        cache.delete('counter')
+
+        context = multiprocessing.get_context('fork')
+        start = context.Event()
+        workers = [
+            context.Process(target=_count, args=(backend, location, operations, start))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        started = time.perf_counter()
+        start.set()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        expected = processes * operations
+        total = cache.get('counter')
+        if total is None:
+            result = 'not shared between processes'
+        else:
+            result = f'{total} counted, {expected - total} lost'
+        rate = expected / elapsed
+        self.stdout.write(f'  {name:16} {result:34} {rate:>10.0f} incr/s')
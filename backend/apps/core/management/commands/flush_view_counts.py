@@ -0,0 +1,29 @@
+"""
+Write the buffered page views to the view_count columns.
+
+Usage:
+    python manage.py flush_view_counts
+    python manage.py flush_view_counts --all
+
+Detail requests already flush every VIEW_COUNT_FLUSH_SECONDS; run this (or
+flush_view_counts_task from apps.core.tasks) to flush without traffic. Each
+run drains the batches spilled before the previous flush; --all drains
+every batch at once, for when no worker is counting views.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.view_counters import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = 'Add the page views buffered in the cache to Post.view_count and Tour.view_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Also drain the batches spilled since the previous run'
+        )
+
+    def handle(self, *args, **options):
+        views = flush_view_counts(settle=not options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Done! {views} views flushed.'))
@@ -0,0 +1,21 @@
+"""
+Rebuild the in-process search text index file (TEXT_INDEX_PATH).
+
+Usage:
+    python manage.py rebuild_text_index
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.text_index import get_text_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search text index used when the database has no full-text search'
+
+    def handle(self, *args, **options):
+        index = get_text_index()
+        if index is None:
+            self.stdout.write(self.style.WARNING('TEXT_INDEX_PATH is not set, nothing to do.'))
+            return
+        count = index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Done! Indexed {count} documents into {index.path}.'))
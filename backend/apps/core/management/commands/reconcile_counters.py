@@ -0,0 +1,35 @@
+"""
+Repair drift in the denormalized counter caches.
+
+Usage:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.counters import get_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored counts (tour_count, post_count, comment_count) that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report drifted rows, do not update them'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        total = 0
+
+        for counter in get_counters():
+            repaired = counter.reconcile(dry_run=dry_run)
+            total += repaired
+            action = 'drifted' if dry_run else 'repaired'
+            self.stdout.write(f'{counter}: {repaired} {action}')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{total} rows need repair'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Done! {total} rows repaired.'))
@@ -0,0 +1,41 @@
+"""
+Show the response cache hit/miss statistics per view.
+
+Usage:
+    python manage.py response_cache_stats
+    python manage.py response_cache_stats --reset
+
+The counters live in the default cache, so with a per-process backend
+(LocMemCache) they only cover the process running the command. With a
+shared backend (apps.core.sqlite_cache on shared hosting) they cover every
+worker.
+"""
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from apps.core.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Show response cache hits, misses and stale entries per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Clear the counters after printing them'
+        )
+
+    def handle(self, *args, **options):
+        # Import every view so all cached views are known
+        get_resolver().url_patterns
+
+        self.stdout.write(f"{'view':40} {'hit':>8} {'miss':>8} {'stale':>8} {'hit rate':>9}")
+        for name, counts in get_stats().items():
+            rate = '-' if counts['hit_rate'] is None else f"{counts['hit_rate']:.1%}"
+            self.stdout.write(
+                f"{name:40} {counts['hit']:>8} {counts['miss']:>8} {counts['stale']:>8} {rate:>9}"
+            )
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters cleared.'))
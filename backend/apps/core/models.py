@@ -2,6 +2,7 @@
 Core models - Abstract base models for the project.
 """
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 import uuid
 
@@ -59,6 +60,15 @@ class PublishableModel(models.Model):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        # Keyset pagination on published_at needs it set on published rows
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'published_at' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'published_at']
+        super().save(*args, **kwargs)
+
 
 class SEOModel(models.Model):
     """Abstract model for SEO fields."""
@@ -77,3 +87,22 @@ class SortableModel(models.Model):
     class Meta:
         abstract = True
         ordering = ['sort_order']
+
+
+class ContentVersion(models.Model):
+    """
+    Change counter per model, bumped whenever rows of the model change.
+
+    Read by apps.core.conditional to build ETags without touching the
+    content tables.
+    """
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Content Version'
+        verbose_name_plural = 'Content Versions'
+
+    def __str__(self):
+        return f'{self.label} v{self.version}'
@@ -0,0 +1,209 @@
+"""
+Keyset (cursor) pagination.
+
+Page-number pagination runs COUNT(*) and an OFFSET scan on every page, which
+gets slower the deeper the page. KeysetPagination keeps the page-number
+behaviour by default and switches to keyset pagination when the request
+carries a `cursor` parameter (an empty `?cursor=` asks for the first page):
+
+    GET /api/reviews/?cursor=            first page
+    GET /api/reviews/?cursor=eyJkIj...   page after / before a cursor
+
+Keyset pages are read with `WHERE (created_at, id) < (last row)` on a fixed
+composite key, so every page costs O(page size) with a matching index. The
+`count` parameter picks how the total is reported:
+
+    count=approx  (default) cached total, refreshed every few minutes by
+                  one request while the others keep the previous total
+    count=exact   COUNT(*) on every request
+    count=none    no total, "count" is null
+
+Usage:
+    class ReviewPagination(KeysetPagination):
+        keyset = ('-created_at', '-id')
+
+The keyset must end with a unique field, and its fields must not be null.
+In cursor mode the keyset replaces any ?ordering= of the view.
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import shared_cache
+
+
+class KeysetPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in keyset (cursor) mode."""
+
+    keyset = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('approx', 'exact', 'none')
+    approximate_count_timeout = 300
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset_mode = True
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.count = self.get_count(queryset, request)
+
+        forward, values = self.decode_cursor(request)
+        ordering = self.keyset if forward else [self._flip(field) for field in self.keyset]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        # Going forward there is a previous page whenever we started from a
+        # cursor; going back there is always a next page (the one we left).
+        self.has_next = has_more if forward else True
+        self.has_previous = (values is not None) if forward else has_more
+        self.first_key = self._key(rows[0]) if rows else values
+        self.last_key = self._key(rows[-1]) if rows else values
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last_key is None:
+            return None
+        return self._link(True, self.last_key)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_key is None:
+            return None
+        return self._link(False, self.first_key)
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count']['nullable'] = True
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Keyset pagination cursor; pass an empty value for the first page.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Total count in cursor mode: approx (default), exact or none.',
+                'schema': {'type': 'string', 'enum': list(self.count_modes)},
+            },
+        ]
+
+    # Counting
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'approx')
+        if mode == 'none':
+            return None
+        if mode == 'exact':
+            return queryset.count()
+
+        sql_hash = hashlib.md5(str(queryset.order_by().query).encode()).hexdigest()
+        key = f'keyset_count:{queryset.model._meta.label_lower}:{sql_hash}'
+        return shared_cache.get_or_set(key, queryset.count, self.approximate_count_timeout)
+
+    # Cursors
+
+    def decode_cursor(self, request):
+        """Return (forward, key values or None) from the cursor parameter."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return True, None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            direction, raw = data['d'], data['k']
+            if direction not in ('n', 'p') or len(raw) != len(self.keyset):
+                raise ValueError
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.keyset, raw)
+            ]
+        except (KeyError, TypeError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return direction == 'n', values
+
+    def encode_cursor(self, forward, values):
+        raw = [
+            self._field(name).value_to_string(_Row(self._field(name).attname, value))
+            for name, value in zip(self.keyset, values)
+        ]
+        data = json.dumps({'d': 'n' if forward else 'p', 'k': raw}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _link(self, forward, values):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(forward, values))
+
+    def _field(self, name):
+        return self.model._meta.get_field(name.lstrip('-'))
+
+    def _key(self, obj):
+        # Model instances or values() rows
+        if isinstance(obj, dict):
+            return [obj[self._field(name).attname] for name in self.keyset]
+        return [getattr(obj, self._field(name).attname) for name in self.keyset]
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _after(self, ordering, values):
+        """Rows strictly after `values` in `ordering`: (a < x) OR (a = x AND b < y) ..."""
+        condition = Q()
+        for position, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[position]})
+            for previous, value in zip(ordering[:position], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+
+class _Row:
+    """Minimal object for Field.value_to_string()."""
+
+    def __init__(self, attname, value):
+        setattr(self, attname, value)
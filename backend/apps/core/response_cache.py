@@ -0,0 +1,208 @@
+"""
+Per-language response cache for read-only API views.
+
+ResponseCacheMixin stores the rendered JSON of GET responses in the default
+cache, keyed by host, path, normalized query string, resolved language and
+format. It shares `version_models` / `version_interval` with
+ConditionalGetMixin:
+
+    class TourDetailView(ConditionalGetMixin, ResponseCacheMixin, generics.RetrieveAPIView):
+        version_models = [Tour, TourImage, TourCategory, ...]
+        cache_object_models = [Tour, TourImage, ...]
+
+Each entry records the versions of its dependency tags (see
+apps.core.conditional). The tags are the labels of `version_models`.
+Detail views list the models whose changes reach the object's own tag in
+`cache_object_models`. Those are replaced by the object tag of the
+rendered row ('tours.tour:5'), so saving one tour, or one of its images
+or departures, only invalidates that tour's detail responses. An entry
+whose tag versions moved on is recomputed on the next request, so it is
+evicted lazily. One query on ContentVersion checks the tags, whatever
+cache backend CACHES configures.
+
+Views with `transition_sources` (apps.core.transitions) keep each entry
+until the next transition instant after it was rendered: its cache
+timeout is clamped to that instant and an entry past it is never served,
+not even as a stale copy.
+
+Rebuilds are single-flight (apps.core.caching): while one request renders
+a stale entry again, concurrent requests get the stale copy (X-Cache:
+STALE, without validators so clients don't keep it), and requests with
+nothing cached wait for the new entry.
+
+Hits, misses and stale entries are counted per view in the cache. See
+`manage.py response_cache_stats`. Responses carry an X-Cache header.
+"""
+import hashlib
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .caching import CacheLock, increment, wait_for
+from .conditional import get_versions, object_tag, version_label
+from .serializers import get_request_language
+from .transitions import transition_window
+
+KEY_PREFIX = 'response'
+STATS_PREFIX = 'response_cache:stats'
+OUTCOMES = ('hit', 'miss', 'stale')
+
+# Views using the cache, for the statistics
+cached_views = set()
+
+
+def response_cache_key(request, window=None):
+    """Cache key of a request: host, path, sorted query, language and format."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    parts = [
+        request.get_host(), request.path, query,
+        get_request_language(request), request.accepted_renderer.format,
+    ]
+    if window is not None:
+        parts.append(str(window))
+    return f"{KEY_PREFIX}:{hashlib.md5('|'.join(parts).encode()).hexdigest()}"
+
+
+def record(view_name, outcome):
+    increment(f'{STATS_PREFIX}:{view_name}:{outcome}')
+
+
+def get_stats():
+    """Return {view name: {'hit', 'miss', 'stale', 'hit_rate'}}."""
+    keys = {
+        f'{STATS_PREFIX}:{name}:{outcome}': (name, outcome)
+        for name in cached_views for outcome in OUTCOMES
+    }
+    values = cache.get_many(list(keys))
+    stats = {name: dict.fromkeys(OUTCOMES, 0) for name in sorted(cached_views)}
+    for key, count in values.items():
+        name, outcome = keys[key]
+        stats[name][outcome] = count
+    for counts in stats.values():
+        total = sum(counts[outcome] for outcome in OUTCOMES)
+        counts['hit_rate'] = round(counts['hit'] / total, 3) if total else None
+    return stats
+
+
+def reset_stats():
+    cache.delete_many([
+        f'{STATS_PREFIX}:{name}:{outcome}' for name in cached_views for outcome in OUTCOMES
+    ])
+
+
+class ResponseCacheMixin:
+    """Serve GET responses from the cache while their dependency tags are unchanged."""
+
+    # Models the response is built from (shared with ConditionalGetMixin)
+    version_models = []
+    # Seconds after which time-dependent content must be rebuilt
+    version_interval = None
+    # Names of the apps.core.transitions sources of the instants the content changes at
+    transition_sources = []
+    # Detail views: models whose changes bump the rendered object's tag,
+    # the object's own model first
+    cache_object_models = []
+    # Seconds other requests wait for a rebuild before rendering themselves
+    cache_lock_timeout = 10
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cached_views.add(cls.__name__)
+
+    def get_cache_timeout(self, until=None):
+        timeout = self.version_interval or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600)
+        if until is not None:
+            timeout = max(1, min(timeout, math.ceil(until - time.time())))
+        return timeout
+
+    def get_cache_tags(self, data):
+        """Dependency tags of a rendered response."""
+        object_models = set(self.cache_object_models)
+        pk = data.get('id') if object_models and isinstance(data, dict) else None
+        if pk is None:
+            return [version_label(model) for model in self.version_models]
+        tags = [version_label(model) for model in self.version_models if model not in object_models]
+        return tags + [object_tag(self.cache_object_models[0], pk)]
+
+    def get(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().get(request, *args, **kwargs)
+
+        name = type(self).__name__
+        window = int(time.time() // self.version_interval) if self.version_interval else None
+        key = response_cache_key(request, window)
+
+        entry = cache.get(key)
+        if entry is not None:
+            if self.is_current(entry):
+                record(name, 'hit')
+                return self.cached_response(entry, 'HIT')
+            record(name, 'stale')
+            if self.has_expired(entry):
+                # Content past a transition is wrong, not merely old
+                entry = None
+        else:
+            record(name, 'miss')
+
+        # One request per key rebuilds; the others serve the stale entry or
+        # wait for the rebuilt one
+        lock = CacheLock(key, self.cache_lock_timeout)
+        if not lock.acquire():
+            if entry is not None:
+                return self.cached_response(entry, 'STALE')
+            entry = wait_for(key, self.is_current, self.cache_lock_timeout, lock)
+            if entry is not None:
+                return self.cached_response(entry, 'HIT')
+        try:
+            return self.render_and_store(key, request, *args, **kwargs)
+        finally:
+            lock.release()
+
+    def has_expired(self, entry):
+        until = entry.get('until')
+        return until is not None and time.time() >= until
+
+    def is_current(self, entry):
+        if self.has_expired(entry):
+            return False
+        current = get_versions(entry['versions'])
+        return {label: version for label, (version, updated_at) in current.items()} == entry['versions']
+
+    def render_and_store(self, key, request, *args, **kwargs):
+        started = timezone.now()
+        until = None
+        if self.transition_sources:
+            last, until = transition_window(self.transition_sources, started.timestamp())
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200 or not hasattr(response, 'data'):
+            return response
+
+        renderer = request.accepted_renderer
+        entry = {
+            'content': renderer.render(response.data, request.accepted_media_type, self.get_renderer_context()),
+            'content_type': (
+                f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset
+                else renderer.media_type
+            ),
+        }
+
+        # Tags changed while rendering may or may not be in the content:
+        # serve it, but don't store it (version 0 rows were never changed)
+        versions = get_versions(self.get_cache_tags(response.data))
+        settled = started - timedelta(seconds=1)
+        if all(version == 0 or updated_at < settled for version, updated_at in versions.values()):
+            entry['versions'] = {label: version for label, (version, updated_at) in versions.items()}
+            entry['until'] = until
+            cache.set(key, entry, self.get_cache_timeout(until))
+        return self.cached_response(entry, 'MISS')
+
+    def cached_response(self, entry, outcome):
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response['X-Cache'] = outcome
+        return response
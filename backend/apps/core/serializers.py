@@ -1,8 +1,22 @@
 """
-Core serializer mixins for language support.
+Core serializer mixins for language support and sparse fieldsets.
 """
 from rest_framework import serializers
 
+SUPPORTED_LANGUAGES = ['en', 'es', 'pt']
+
+FIELDS_PARAM = 'fields'
+INCLUDE_PARAM = 'include'
+
+
+def get_request_language(request):
+    """Return the language requested via the Accept-Language header (default 'en')."""
+    if request:
+        accept_lang = request.headers.get('Accept-Language', 'en')
+        if accept_lang in SUPPORTED_LANGUAGES:
+            return accept_lang
+    return 'en'
+
 
 class MultiLanguageSerializerMixin:
     """
@@ -13,7 +27,11 @@ class MultiLanguageSerializerMixin:
     2. Define TRANSLATABLE_FIELDS = ['name', 'description', ...] in your serializer
 
     The mixin will:
-    - Read the Accept-Language header from the request
+    - Read the language from the serializer context ('language') or the
+      Accept-Language header of the request
+    - Only declare the base and requested-language columns of each
+      TRANSLATABLE_FIELDS entry, so the other translations are never read
+      (views can defer them, see translation_projection())
     - For each field in TRANSLATABLE_FIELDS, return the localized version
     - Fallback to English (base field) if translation not available
     """
@@ -21,19 +39,24 @@ class MultiLanguageSerializerMixin:
     # Define which fields have translations (_es, _pt suffixes)
     TRANSLATABLE_FIELDS = []
 
+    def get_language(self):
+        return self.context.get('language') or get_request_language(self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        language = self.get_language()
+        for field in self.TRANSLATABLE_FIELDS:
+            for other in SUPPORTED_LANGUAGES:
+                if other not in ('en', language):
+                    fields.pop(f'{field}_{other}', None)
+        return fields
+
     def to_representation(self, instance):
         """Override to include localized fields."""
         data = super().to_representation(instance)
 
-        # Get language from request context
-        request = self.context.get('request')
-        language = 'en'
-
-        if request:
-            # Try Accept-Language header first
-            accept_lang = request.headers.get('Accept-Language', 'en')
-            if accept_lang in ['es', 'pt', 'en']:
-                language = accept_lang
+        # Get language from serializer context or request
+        language = self.get_language()
 
         # If language is English, no changes needed (base fields are in English)
         if language == 'en':
@@ -51,7 +74,8 @@ class MultiLanguageSerializerMixin:
             localized_value = getattr(instance, localized_field, None)
 
             # If translation exists and is not empty, use it
-            if localized_value:
+            # (unless the field was left out with ?fields=)
+            if localized_value and field in data:
                 data[field] = localized_value
 
             # Remove the language suffixed fields from response
@@ -61,6 +85,110 @@ class MultiLanguageSerializerMixin:
         return data
 
 
+def translation_projection(serializer, language, prefix=''):
+    """
+    Return {relation path: [columns]} of the translation columns a serializer
+    never reads in `language`, for use with QuerySet.defer().
+
+    The root serializer's columns are under '' and nested serializers under
+    their source path (e.g. 'category', 'images'). Only fields a serializer
+    lists in TRANSLATABLE_FIELDS are deferred.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    projection = {}
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    translatable = getattr(serializer, 'TRANSLATABLE_FIELDS', [])
+    if model is not None and translatable:
+        names = {field.name for field in model._meta.concrete_fields}
+        columns = [
+            f'{field}_{other}'
+            for field in translatable
+            for other in SUPPORTED_LANGUAGES
+            if other not in ('en', language) and f'{field}_{other}' in names
+        ]
+        if columns:
+            projection[prefix] = columns
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, (serializers.ListSerializer, serializers.Serializer)) and field.source != '*':
+            source = field.source.replace('.', '__')
+            path = f'{prefix}__{source}' if prefix else source
+            projection.update(translation_projection(field, language, path))
+    return projection
+
+
+def _param_set(request, name):
+    if request is None:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_requested_fields(request):
+    """
+    Return (fields, include) from the `?fields=` and `?include=` parameters.
+
+    `fields` is None when the parameter is absent (all default fields).
+    `include` is always a set.
+    """
+    return _param_set(request, FIELDS_PARAM), _param_set(request, INCLUDE_PARAM) or set()
+
+
+def select_fields(names, fields, include, optional=()):
+    """
+    Return the subset of `names` (in order) to render.
+
+    Optional fields are only rendered when included. Translated variants
+    (name_es, name_pt) follow their base field.
+    """
+    selected = []
+    for name in names:
+        base = name[:-3] if name[-3:] in ('_es', '_pt') else name
+        if base in optional or name in optional:
+            if base in include or name in include:
+                selected.append(name)
+        elif fields is None or base in fields or name in fields or base in include:
+            selected.append(name)
+    return selected
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin adding `?fields=` and `?include=` support to a serializer.
+
+    - `?fields=id,name,price` renders only these fields
+    - `?include=reviews` adds fields listed in OPTIONAL_FIELDS, which are
+      left out unless asked for
+
+    Only applies to the top-level serializer of a response (and to each
+    item of a list); nested serializers always render in full. Without a
+    request in the context (e.g. when building cached data) all default
+    fields are rendered. Views pair this with
+    apps.core.views.SparseFieldsetViewMixin to skip unused prefetches.
+    """
+
+    # Fields only rendered when requested with ?include=
+    OPTIONAL_FIELDS = []
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        requested, include = get_requested_fields(self.context.get('request'))
+        keep = select_fields(fields, requested, include, self.OPTIONAL_FIELDS)
+        return {name: fields[name] for name in keep}
+
+
 class LocalizedSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
     """
     Base serializer class with language support built-in.
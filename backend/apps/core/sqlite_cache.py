@@ -0,0 +1,270 @@
+"""
+Cache backend shared by all workers of one host, stored in an SQLite file.
+
+For hosts without Redis or Memcached (the shared hosting setup). Every
+worker process opens the same database file in WAL mode. Readers never
+block and writes are serialized by SQLite, so the response cache, the
+stampede locks of apps.core.caching and the throttle counters are shared
+between workers instead of being kept once per process as LocMemCache
+does.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'apps.core.sqlite_cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache' / 'cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+Entries expire after their timeout. When there are more than MAX_ENTRIES,
+the least recently used ones are evicted: CULL_FREQUENCY works as in
+Django's backends (1/N of the entries go, 0 clears the cache). The size is
+checked every CULL_INTERVAL writes of a process, so it may run over briefly.
+Reads refresh an entry's access time at most every TOUCH_INTERVAL seconds,
+which keeps hot keys from turning every read into a write.
+
+add() and incr() run in one write transaction each, so they are atomic
+across processes. Integers are stored as SQLite integers, and other values
+are pickled.
+
+The file is only shared by processes on one machine. Don't put it on a
+network file system.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires REAL,
+        accessed REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+]
+
+# Rows whose timeout has not passed (expires is NULL for no timeout)
+LIVE = '(expires IS NULL OR expires > ?)'
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+CHUNK_SIZE = 500
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SQLiteCache(BaseCache):
+    """Django cache backend on an SQLite file in WAL mode."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = os.path.abspath(location)
+        self.busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self.touch_interval = options.get('TOUCH_INTERVAL', 5)
+        self.cull_interval = options.get('CULL_INTERVAL', 100)
+        self._local = threading.local()
+        self._writes = 0
+
+    # Connections
+
+    def _connection(self):
+        """The connection of the current thread, opened again after a fork."""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        # WAL keeps the file consistent; NORMAL only risks the last writes on power loss
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    @contextmanager
+    def _write(self):
+        """A write transaction; BEGIN IMMEDIATE takes the write lock up front."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    # Encoding
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        return value if isinstance(value, int) else pickle.loads(value)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        now = time.time()
+        connection = self._connection()
+        found, stale = {}, []
+        for chunk in _chunks(list(keys)):
+            rows = connection.execute(
+                f"SELECT key, value, accessed FROM cache "
+                f"WHERE key IN ({', '.join('?' * len(chunk))}) AND {LIVE}",
+                chunk + [now],
+            )
+            for key, value, accessed in rows:
+                found[keys[key]] = self._decode(value)
+                if accessed < now - self.touch_interval:
+                    stale.append(key)
+        if stale:
+            self._touch_accessed(stale, now)
+        return found
+
+    def _touch_accessed(self, keys, now):
+        """Record a read for LRU eviction."""
+        try:
+            with self._write() as connection:
+                for chunk in _chunks(keys):
+                    connection.execute(
+                        f"UPDATE cache SET accessed = ? WHERE key IN ({', '.join('?' * len(chunk))})",
+                        [now] + chunk,
+                    )
+        except sqlite3.OperationalError:
+            # Busy: an approximate access time is good enough
+            pass
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = [
+            (self._key(key, version), self._encode(value), expires, now)
+            for key, value in data.items()
+        ]
+        with self._write() as connection:
+            connection.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', rows)
+        self._written(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write() as connection:
+            if connection.execute(f'SELECT 1 FROM cache WHERE key = ? AND {LIVE}', (key, now)).fetchone():
+                return False
+            connection.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                (key, self._encode(value), self.get_backend_timeout(timeout), now),
+            )
+        self._written(1)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        cache_key = self._key(key, version)
+        now = time.time()
+        with self._write() as connection:
+            row = connection.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {LIVE}', (cache_key, now)
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = self._decode(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ?, accessed = ? WHERE key = ?',
+                (self._encode(value), now, cache_key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            cursor = connection.execute(
+                f'UPDATE cache SET expires = ? WHERE key = ? AND {LIVE}',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            )
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._connection().execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {LIVE}', (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            cursor = connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        with self._write() as connection:
+            for chunk in _chunks(keys):
+                connection.execute(
+                    f"DELETE FROM cache WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+
+    def clear(self):
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache')
+
+    # Eviction
+
+    def _written(self, count):
+        self._writes += count
+        if self._writes >= self.cull_interval:
+            self._writes = 0
+            self.cull()
+
+    def cull(self):
+        """Delete expired entries, then the least recently used ones over MAX_ENTRIES."""
+        now = time.time()
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+            count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache')
+                return
+            excess = count - self._max_entries + self._max_entries // self._cull_frequency
+            connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (excess,),
+            )
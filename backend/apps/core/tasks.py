@@ -0,0 +1,23 @@
+"""
+Celery tasks for core.
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_view_counts_task():
+    """
+    Add the page views buffered in the cache to the view_count columns.
+
+    Returns:
+        dict: Number of views flushed
+    """
+    from .view_counters import flush_view_counts
+
+    views = flush_view_counts()
+    if views:
+        logger.info(f"Flushed {views} page views")
+    return {'views': views}
@@ -0,0 +1,633 @@
+"""
+In-process inverted index for full-text search without database support.
+
+Used when the database has no full-text search of its own (the MySQL shared
+hosting setup). Enabled by setting TEXT_INDEX_PATH; the index covers every
+registered source (published tours, active destinations, published posts)
+in each language, with accent folding, so "piramides" matches "Pirámides".
+
+The index lives in a single file that every worker memory-maps:
+
+    b'TIX1' | uint32 header length | JSON header | postings
+
+The header holds the document keys and, per language, a term dictionary of
+{term: [offset, count]} into the postings area, which is a packed array of
+(uint32 document number, float32 weight) records. Workers re-map the file
+when it is replaced, so a search never touches the database.
+
+Changes are applied incrementally: signals collect the changed (kind, pk)
+keys, and on commit only those documents are re-tokenized and appended, as
+JSON lines of [kind, pk, {language: {term: weight}} or null], to the delta
+file of the current generation (`<path>.<generation>.delta`). Searches
+read the lines appended since their last search and let them override the
+mapped postings. rebuild(), or an update that grows the delta past
+DELTA_MERGE_BYTES, writes the next generation of the file with the delta
+folded in; writers hold a file lock from reading the rows to writing.
+
+Usage (in an app's signals module):
+
+    from apps.core.text_index import IndexSource, register_source
+
+    register_source(IndexSource(
+        'post', Post, {'is_published': True},
+        fields=[('title', 10), ('excerpt', 3), ('content', 1)],
+    ))
+"""
+import bisect
+import glob
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from rest_framework import filters
+
+from .batching import OnCommitBatch
+from .serializers import get_request_language
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TIX1'
+HEADER_LENGTH = struct.Struct('<I')
+POSTING = struct.Struct('<If')
+# Size past which an update folds the delta file into the index file
+DELTA_MERGE_BYTES = 1024 * 1024
+
+LANGUAGES = [code for code, name in settings.LANGUAGES]
+
+STOPWORDS = {
+    'en': {
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
+        'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with', 'your', 'our', 'you',
+    },
+    'es': {
+        'a', 'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+        'para', 'por', 'que', 'se', 'su', 'sus', 'un', 'una', 'y', 'o', 'tu',
+    },
+    'pt': {
+        'a', 'ao', 'as', 'com', 'da', 'das', 'de', 'do', 'dos', 'e', 'em', 'na',
+        'nas', 'no', 'nos', 'o', 'os', 'para', 'por', 'que', 'se', 'um', 'uma', 'seu',
+    },
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """Lowercase and strip accents: 'Pirámides' -> 'piramides'."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def normalize_term(word):
+    """Light plural stripping, applied the same way to documents and queries."""
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text, language='en'):
+    """Split text into folded, normalized index terms."""
+    stopwords = STOPWORDS.get(language, set())
+    terms = []
+    for word in WORD_RE.findall(fold(text or '')):
+        if len(word) < 2 or word in stopwords:
+            continue
+        terms.append(normalize_term(word))
+    return terms
+
+
+def localized(obj, field, language):
+    """A translated field value, falling back to the base (English) field."""
+    if language != 'en':
+        value = getattr(obj, f'{field}_{language}', '')
+        if value:
+            return value
+    return getattr(obj, field)
+
+
+class IndexSource:
+    """
+    A model whose rows are indexed under a document kind.
+
+    Args:
+        kind: document kind used in search results, e.g. 'tour'
+        model: indexed model
+        conditions: filter a row must match to be indexed
+        fields: [(field, weight)] where field is a translatable field name
+            or a callable(obj, language) returning text
+        prefetch: prefetch_related lookups used by callable fields
+    """
+
+    def __init__(self, kind, model, conditions=None, fields=(), prefetch=()):
+        self.kind = kind
+        self.model = model
+        self.conditions = conditions or {}
+        self.fields = list(fields)
+        self.prefetch = list(prefetch)
+
+    def get_queryset(self, pks=None):
+        queryset = self.model._default_manager.filter(**self.conditions)
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return queryset.prefetch_related(*self.prefetch)
+
+    def term_weights(self, obj, language):
+        """{term: weight} of one row in one language."""
+        weights = defaultdict(float)
+        for field, weight in self.fields:
+            text = field(obj, language) if callable(field) else localized(obj, field, language)
+            for term in tokenize(text, language):
+                weights[term] += weight
+        return weights
+
+
+class _Snapshot:
+    """One mapped version of the index file."""
+
+    def __init__(self, data):
+        if data[:4] != MAGIC:
+            raise ValueError('not a text index file')
+        length, = HEADER_LENGTH.unpack_from(data, 4)
+        start = 4 + HEADER_LENGTH.size
+        header = json.loads(data[start:start + length])
+        base = start + length
+
+        self.data = data
+        self.generation = header.get('generation', 0)
+        self.docs = [tuple(doc) for doc in header['docs']]
+        self.numbers = {key: number for number, key in enumerate(self.docs)}
+        self.terms = {
+            language: {term: (base + offset, count) for term, (offset, count) in terms.items()}
+            for language, terms in header['terms'].items()
+        }
+        self._sorted_terms = {}
+
+    def postings(self, language, term):
+        """{document number: weight} of a term."""
+        location = self.terms.get(language, {}).get(term)
+        if location is None:
+            return {}
+        offset, count = location
+        return dict(POSTING.iter_unpack(self.data[offset:offset + count * POSTING.size]))
+
+    def expand_prefix(self, language, prefix, limit=50):
+        """Indexed terms starting with prefix, for the word still being typed."""
+        terms = self._sorted_terms.get(language)
+        if terms is None:
+            terms = self._sorted_terms[language] = sorted(self.terms.get(language, {}))
+        return _prefixed(terms, prefix, limit)
+
+
+class _Delta:
+    """The documents re-indexed since a snapshot was written, read from its delta file."""
+
+    def __init__(self, generation):
+        self.generation = generation
+        # Bytes of the delta file read so far
+        self.offset = 0
+        # {(kind, pk): {language: {term: weight}}}, None for dropped documents
+        self.docs = {}
+        # {language: {term: {(kind, pk): weight}}}
+        self.terms = defaultdict(lambda: defaultdict(dict))
+        self._sorted_terms = {}
+
+    def extended(self, chunk):
+        """
+        A copy with the complete records of newly appended bytes applied;
+        searches may still be reading this one.
+        """
+        end = chunk.rfind(b'\n') + 1
+        if not end:
+            return self
+        delta = _Delta(self.generation)
+        delta.offset = self.offset + end
+        delta.docs = dict(self.docs)
+        for language, terms in self.terms.items():
+            for term, postings in terms.items():
+                delta.terms[language][term] = dict(postings)
+        for line in chunk[:end].splitlines():
+            kind, pk, languages = json.loads(line)
+            delta._set((kind, pk), languages)
+        return delta
+
+    def _set(self, key, languages):
+        for language, weights in (self.docs.get(key) or {}).items():
+            for term in weights:
+                postings = self.terms[language][term]
+                postings.pop(key, None)
+                if not postings:
+                    del self.terms[language][term]
+        self.docs[key] = languages or None
+        for language, weights in (languages or {}).items():
+            for term, weight in weights.items():
+                self.terms[language][term][key] = weight
+
+    def postings(self, language, term):
+        """{(kind, pk): weight} of a term."""
+        return self.terms.get(language, {}).get(term, {})
+
+    def expand_prefix(self, language, prefix, limit=50):
+        terms = self._sorted_terms.get(language)
+        if terms is None:
+            terms = self._sorted_terms[language] = sorted(self.terms.get(language, {}))
+        return _prefixed(terms, prefix, limit)
+
+
+def _prefixed(terms, prefix, limit):
+    """The first `limit` of the sorted terms starting with prefix."""
+    matches = []
+    for term in terms[bisect.bisect_left(terms, prefix):]:
+        if not term.startswith(prefix) or len(matches) >= limit:
+            break
+        matches.append(term)
+    return matches
+
+
+def _float32(weight):
+    """A weight rounded as the postings area stores it."""
+    return struct.unpack('<f', struct.pack('<f', weight))[0]
+
+
+class TextIndex:
+    """A memory-mapped inverted index file shared by all workers."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._stat = None
+        self._snapshot = None
+        self._delta = None
+
+    def _delta_path(self, generation):
+        return f'{self.path}.{generation}.delta'
+
+    # Reading
+
+    def _current(self):
+        """The mapped index, re-mapped if another process replaced the file."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != self._stat:
+            with self._lock:
+                if key != self._stat:
+                    with open(self.path, 'rb') as f:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    # Searches still holding the old snapshot keep its mapping alive
+                    self._snapshot = _Snapshot(data)
+                    self._stat = key
+        return self._snapshot
+
+    def _current_delta(self, snapshot):
+        """The snapshot's delta, with the records appended since the last read applied."""
+        path = self._delta_path(snapshot.generation)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+        delta = self._delta
+        if delta is not None and delta.generation == snapshot.generation and delta.offset == size:
+            return delta
+        with self._lock:
+            delta = self._delta
+            if delta is None or delta.generation != snapshot.generation:
+                delta = _Delta(snapshot.generation)
+            # Appends only: the records before offset are already applied
+            with open(path, 'rb') as f:
+                f.seek(delta.offset)
+                delta = delta.extended(f.read())
+            self._delta = delta
+        return delta
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def search(self, query, language='en', kinds=None, limit=None, prefix=True):
+        """
+        Return [(kind, pk, score)] for documents matching every query term,
+        best match first. The last query word also matches as a prefix.
+        """
+        snapshot = self._current()
+        terms = tokenize(query, language)
+        if snapshot is None or not terms:
+            return []
+        delta = self._current_delta(snapshot)
+        changed = delta.docs if delta is not None else {}
+
+        total = len(snapshot.docs)
+        for key, languages in changed.items():
+            total += (languages is not None) - (key in snapshot.numbers)
+        total = max(total, 1)
+
+        scores = None
+        for position, term in enumerate(terms):
+            candidates = [term]
+            if prefix and position == len(terms) - 1 and len(term) >= 3:
+                candidates = snapshot.expand_prefix(language, term)
+                if delta is not None:
+                    candidates += [
+                        candidate for candidate in delta.expand_prefix(language, term)
+                        if candidate not in snapshot.terms.get(language, {})
+                    ]
+                candidates = candidates or [term]
+
+            matched = defaultdict(float)
+            for candidate in candidates:
+                postings = {
+                    snapshot.docs[doc]: weight
+                    for doc, weight in snapshot.postings(language, candidate).items()
+                    if snapshot.docs[doc] not in changed
+                }
+                if delta is not None:
+                    postings.update(delta.postings(language, candidate))
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for key, weight in postings.items():
+                    matched[key] = max(matched[key], weight * idf)
+
+            if scores is None:
+                scores = matched
+            else:
+                scores = {key: score + matched[key] for key, score in scores.items() if key in matched}
+            if not scores:
+                return []
+
+        results = []
+        for (kind, pk), score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            if kinds is None or kind in kinds:
+                results.append((kind, pk, score))
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    # Writing
+
+    def _load_postings(self):
+        """{language: {term: {(kind, pk): weight}}} of the current file and its delta."""
+        index = {language: defaultdict(dict) for language in LANGUAGES}
+        snapshot = self._current()
+        if snapshot is None:
+            return index
+        delta = self._current_delta(snapshot)
+        changed = delta.docs if delta is not None else {}
+        for language, terms in snapshot.terms.items():
+            postings_by_term = index.setdefault(language, defaultdict(dict))
+            for term in terms:
+                postings_by_term[term] = {
+                    snapshot.docs[doc]: weight
+                    for doc, weight in snapshot.postings(language, term).items()
+                    if snapshot.docs[doc] not in changed
+                }
+        for key, languages in changed.items():
+            for language, weights in (languages or {}).items():
+                for term, weight in weights.items():
+                    index.setdefault(language, defaultdict(dict))[term][key] = weight
+        return index
+
+    def _write(self, index):
+        """Write index as the next generation of the file, folding in its delta."""
+        snapshot = self._current()
+        if snapshot is None:
+            # Deltas left by a deleted index file
+            for path in glob.glob(f'{glob.escape(self.path)}.*.delta'):
+                _unlink(path)
+        generation = snapshot.generation + 1 if snapshot is not None else 1
+
+        docs = sorted({key for terms in index.values() for postings in terms.values() for key in postings})
+        numbers = {key: number for number, key in enumerate(docs)}
+
+        body = bytearray()
+        header = {'generation': generation, 'docs': [list(key) for key in docs], 'terms': {}}
+        for language, terms in index.items():
+            header['terms'][language] = dictionary = {}
+            for term in sorted(terms):
+                postings = terms[term]
+                if not postings:
+                    continue
+                dictionary[term] = [len(body), len(postings)]
+                for key, weight in sorted(postings.items()):
+                    body += POSTING.pack(numbers[key], weight)
+
+        header = json.dumps(header, separators=(',', ':')).encode()
+        _replace(self.path, MAGIC + HEADER_LENGTH.pack(len(header)) + header + body)
+        if snapshot is not None:
+            _unlink(self._delta_path(snapshot.generation))
+
+    def _append(self, snapshot, records):
+        """Append [kind, pk, {language: {term: weight}} or None] records; return the delta size."""
+        path = self._delta_path(snapshot.generation)
+        lines = b''.join(json.dumps(record, separators=(',', ':')).encode() + b'\n' for record in records)
+        # One write per batch, so readers see whole records or none
+        with open(path, 'ab') as f:
+            f.write(lines)
+            return f.tell()
+
+    def _locked(self):
+        return _FileLock(f'{self.path}.lock')
+
+    def rebuild(self):
+        """Index every registered source from scratch. Returns the document count."""
+        # Read under the lock, so an update committed meanwhile can't be overwritten
+        with self._locked():
+            return self._rebuild()
+
+    def _rebuild(self):
+        index = {language: defaultdict(dict) for language in LANGUAGES}
+        count = 0
+        for source in _sources.values():
+            for obj in source.get_queryset():
+                _add_document(index, source, obj)
+                count += 1
+        self._write(index)
+        return count
+
+    def update(self, keys):
+        """Re-index the given (kind, pk) documents; missing or hidden rows are dropped."""
+        by_kind = defaultdict(set)
+        for kind, pk in keys:
+            by_kind[kind].add(pk)
+
+        with self._locked():
+            snapshot = self._current()
+            if snapshot is None:
+                self._rebuild()
+                return
+
+            records = []
+            for kind, pks in by_kind.items():
+                source = _sources.get(kind)
+                found = {}
+                if source is not None:
+                    for obj in source.get_queryset(pks):
+                        found[obj.pk] = _document_terms(source, obj)
+                for pk in sorted(pks):
+                    records.append([kind, pk, found.get(pk)])
+
+            if self._append(snapshot, records) > DELTA_MERGE_BYTES:
+                self._write(self._load_postings())
+
+
+class _FileLock:
+    """Exclusive lock on a file shared by all worker processes (no-op without fcntl)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def _add_document(index, source, obj):
+    key = (source.kind, obj.pk)
+    for language in LANGUAGES:
+        for term, weight in source.term_weights(obj, language).items():
+            index[language][term][key] = weight
+
+
+def _document_terms(source, obj):
+    """{language: {term: weight}} of one row, as a delta record stores it."""
+    languages = {}
+    for language in LANGUAGES:
+        weights = source.term_weights(obj, language)
+        if weights:
+            languages[language] = {term: _float32(weight) for term, weight in weights.items()}
+    return languages or None
+
+
+def _replace(path, data):
+    """Atomically replace the file at path with data."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.text_index')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# Registered sources by kind
+_sources = {}
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def text_index_enabled():
+    return bool(getattr(settings, 'TEXT_INDEX_PATH', None))
+
+
+def get_text_index():
+    """The process-wide TextIndex, or None when TEXT_INDEX_PATH is not set."""
+    global _index
+    if not text_index_enabled():
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TextIndex(settings.TEXT_INDEX_PATH)
+    return _index
+
+
+def ensure_text_index():
+    """Build the index file if it does not exist yet (called at worker start)."""
+    index = get_text_index()
+    if index is not None and not index.exists():
+        try:
+            index.rebuild()
+        except Exception:
+            logger.exception('Could not build the text index')
+    return index
+
+
+def search(query, language='en', kinds=None, limit=None):
+    """Search the text index: [(kind, pk, score)], best first. Empty when disabled."""
+    index = ensure_text_index()
+    if index is None:
+        return []
+    return index.search(query, language, kinds=kinds, limit=limit)
+
+
+def _update_index(keys):
+    index = get_text_index()
+    if index is not None:
+        index.update(keys)
+
+
+_update_batch = OnCommitBatch(_update_index)
+
+
+def schedule_index_update(kind, pks):
+    """Re-index the given documents once the current transaction commits."""
+    if text_index_enabled():
+        _update_batch.add((kind, pk) for pk in pks)
+
+
+def register_source(source):
+    """Register an index source and re-index its rows when they are saved or deleted."""
+    _sources[source.kind] = source
+    uid = f'text_index:{source.kind}'
+    post_save.connect(_source_changed, sender=source.model, dispatch_uid=uid)
+    post_delete.connect(_source_changed, sender=source.model, dispatch_uid=uid)
+    return source
+
+
+def _source_changed(sender, instance, **kwargs):
+    for source in _sources.values():
+        if source.model is sender:
+            schedule_index_update(source.kind, [instance.pk])
+
+
+class TextIndexSearchFilter(filters.SearchFilter):
+    """
+    `?search=` answered from the text index when it is enabled.
+
+    The view sets `search_index_kind` (e.g. 'post'); without a text index the
+    usual SearchFilter lookups over `search_fields` are used.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_index_kind', None)
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query or kind is None or not text_index_enabled():
+            return super().filter_queryset(request, queryset, view)
+
+        hits = search(query, get_request_language(request), kinds={kind})
+        return queryset.filter(pk__in=[pk for kind, pk, score in hits])
@@ -0,0 +1,52 @@
+"""
+Request throttles counted with atomic cache increments.
+
+DRF's rate throttles keep a list of request timestamps per client and write
+it back after every request. When workers handle the same client at the
+same time, each reads the list, appends its request and overwrites the
+others' writes, so some requests are never counted. These throttles count
+requests per fixed window with one atomic increment (apps.core.caching.
+increment), so every request is counted whichever worker serves it:
+
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.core.throttling.AnonWindowRateThrottle',
+        'apps.core.throttling.UserWindowRateThrottle',
+    ],
+
+They use the same scopes and rates ('anon', 'user') as the DRF classes.
+A fixed window lets a client send up to twice the rate across a window
+boundary; the limit is shared between workers only on a shared cache
+backend.
+"""
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from .caching import increment
+
+
+class WindowRateThrottleMixin:
+    """Count requests per fixed window of the rate's duration."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        count = increment(f'{self.key}:{window}', timeout=self.duration, cache=self.cache)
+        return count <= self.num_requests
+
+    def wait(self):
+        return self.window_end - self.now
+
+
+class AnonWindowRateThrottle(WindowRateThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class UserWindowRateThrottle(WindowRateThrottleMixin, UserRateThrottle):
+    pass
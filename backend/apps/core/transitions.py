@@ -0,0 +1,178 @@
+"""
+Next content transition index.
+
+Some responses change at known instants rather than when rows are saved:
+an early booking offer opens or closes, a tour discount window ends, an
+offer's days_remaining ticks down. A transition source names the datetime
+columns holding those instants:
+
+    register_transitions(Transitions(
+        'tours.offers', EarlyBookingOffer, ['offer_start_date', 'offer_end_date'],
+        filter={'is_active': True},
+    ))
+
+and views list the sources their content depends on:
+
+    class EarlyBookingOfferListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
+        version_models = [EarlyBookingOffer, Tour]
+        transition_sources = ['tours.offers']
+
+transition_window() returns the last instant that has passed and the next
+one to come. ConditionalGetMixin puts the last one in the ETag and
+Last-Modified, and ResponseCacheMixin keeps an entry until the next one,
+so responses are cached for as long as nothing changes and still flip
+exactly on time. This replaces fixed `version_interval` windows, which
+either serve expired offers for up to a window or rebuild unchanged
+responses every window.
+
+Each source's instants are loaded once per process and model version (the
+source model must be in the view's version_models, which invalidates the
+cached responses when the instants are edited) and answered from memory
+afterwards.
+"""
+import bisect
+from datetime import datetime, time, timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from .conditional import get_versions, version_label
+
+# Upcoming instants kept per column; more are loaded once these have passed
+MAX_MOMENTS = 1000
+
+# Registered sources by name
+_sources = {}
+
+# {source name: (model version, Moments)}
+_indexes = {}
+
+
+class Moments:
+    """The instants of a source loaded at one time: the latest passed one and the upcoming ones."""
+
+    def __init__(self, last, upcoming, complete):
+        self.last = last            # timestamp or None
+        self.upcoming = upcoming    # sorted timestamps after load time
+        self.complete = complete    # whether `upcoming` holds every later instant
+
+    def window(self, now):
+        """(last, next) at timestamp `now`, or None when the index must be reloaded."""
+        index = bisect.bisect_right(self.upcoming, now)
+        if index == len(self.upcoming) and not self.complete:
+            return None
+        last = self.upcoming[index - 1] if index else self.last
+        upcoming = self.upcoming[index] if index < len(self.upcoming) else None
+        return last, upcoming
+
+
+class Transitions:
+    """
+    The values of datetime `fields` of `model` rows matching `filter`.
+
+    With a `period` (a timedelta), every period before each value is an
+    instant too: a countdown such as days_remaining changes each day up to
+    the value.
+    """
+
+    def __init__(self, name, model, fields, filter=None, period=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.filter = filter or {}
+        self.period = period.total_seconds() if period else None
+
+    def load(self, now):
+        rows = self.model._default_manager.filter(**self.filter)
+        moment = datetime.fromtimestamp(now, timezone.utc)
+        last, upcoming, horizon = None, [], None
+        for field in self.fields:
+            values = [value.timestamp() for value in rows.filter(**{f'{field}__gt': moment}).order_by(
+                field
+            ).values_list(field, flat=True)[:MAX_MOMENTS]]
+            upcoming.extend(values)
+            if len(values) == MAX_MOMENTS:
+                # Later values of this column are unknown past its last loaded one
+                horizon = values[-1] if horizon is None else min(horizon, values[-1])
+            passed = rows.filter(**{f'{field}__lte': moment}).aggregate(last=Max(field))['last']
+            if passed is not None and (last is None or passed.timestamp() > last):
+                last = passed.timestamp()
+        if horizon is not None:
+            upcoming = [value for value in upcoming if value <= horizon]
+        return Moments(last, sorted(upcoming), horizon is None)
+
+    def window(self, moments, now):
+        if self.period is None:
+            return moments.window(now)
+        # Countdowns: the next tick of each upcoming value
+        ends = moments.window(now)
+        if ends is None:
+            return None
+        last, upcoming = ends
+        for value in moments.upcoming[bisect.bisect_right(moments.upcoming, now):]:
+            ahead = (value - now) % self.period or self.period
+            tick = now + ahead
+            upcoming = tick if upcoming is None else min(upcoming, tick)
+            last = max(last or 0, tick - self.period)
+        return last, upcoming
+
+
+class DailyTransitions:
+    """Local midnight: content that depends on today's date."""
+
+    model = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def window(self, moments, now):
+        today = timezone.localdate(datetime.fromtimestamp(now, timezone.utc))
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        return midnight.timestamp(), (midnight + timedelta(days=1)).timestamp()
+
+
+def register_transitions(source):
+    """Register a transition source under its name."""
+    _sources[source.name] = source
+
+
+def transition_window(names, now=None, versions=None):
+    """
+    (last, next) transition timestamps across the given sources: the
+    latest instant that has passed and the earliest one to come (None when
+    there is none).
+
+    `versions` are ContentVersion rows the caller already read
+    ({label: (version, updated_at)}); missing ones are queried.
+    """
+    now = now if now is not None else timezone.now().timestamp()
+    sources = [_sources[name] for name in names]
+    labels = [version_label(source.model) for source in sources if source.model is not None]
+    versions = dict(versions or {})
+    missing = [label for label in labels if label not in versions]
+    if missing:
+        versions.update(get_versions(missing))
+
+    last, upcoming = None, None
+    for source in sources:
+        window = None
+        if source.model is None:
+            window = source.window(None, now)
+        else:
+            version = versions[version_label(source.model)][0]
+            cached = _indexes.get(source.name)
+            if cached is not None and cached[0] == version:
+                window = source.window(cached[1], now)
+            if window is None:
+                moments = source.load(now)
+                _indexes[source.name] = (version, moments)
+                window = source.window(moments, now)
+        source_last, source_next = window
+        if source_last is not None and (last is None or source_last > last):
+            last = source_last
+        if source_next is not None and (upcoming is None or source_next < upcoming):
+            upcoming = source_next
+    return last, upcoming
+
+
+register_transitions(DailyTransitions('midnight'))
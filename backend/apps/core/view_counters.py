@@ -0,0 +1,185 @@
+"""
+Buffered view counters.
+
+Detail views count their page views without writing to the database:
+
+    class PostDetailView(ViewCountMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+        lookup_field = 'slug'
+
+- record_view() adds the view to an in-process buffer (no I/O).
+- Every VIEW_COUNT_BUFFER_SECONDS the buffer is spilled to the shared cache
+  as one numbered batch ({(model label, lookup, value): views}), which
+  costs one cache.incr() and one cache.set() per process and interval.
+- flush_view_counts() merges the batches and adds them to the rows with
+  one `UPDATE ... SET view_count = view_count + n` per model and distinct n.
+  A request that spills after VIEW_COUNT_FLUSH_SECONDS without a flush
+  runs it once its response is sent (on request_finished, one request per
+  interval across workers, under a CacheLock), so counts move without a
+  scheduler and no response waits for them; the flush_view_counts command
+  or Celery task can run it instead.
+
+The counts are added with F() expressions, so concurrent flushes, saves
+and views cannot lose increments the way the read-modify-write save() per
+view did. A flush only drains the batches numbered before the previous
+flush: a batch is numbered before it is written, and the delay leaves it
+time to arrive. Views still buffered when a process is killed, or batches
+evicted from the cache, are lost; view counts are statistics, not records.
+
+Views are counted by the URL lookup (the slug), so views of a slug renamed
+before the flush are dropped. The updates send no signals and bump no
+content versions: cached responses show the count of their last rebuild.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+
+from .caching import CacheLock, increment
+
+logger = logging.getLogger(__name__)
+
+BATCH_PREFIX = 'view_counts:batch'
+# Number of the last batch written, of the last batch drained, and the
+# last number seen by the previous flush (drained by the next one)
+BATCHES_KEY = 'view_counts:batches'
+FLUSHED_KEY = 'view_counts:flushed'
+SEALED_KEY = 'view_counts:sealed'
+# Time of the last flush
+FLUSHED_AT_KEY = 'view_counts:flushed_at'
+# Seconds a batch waits in the cache for a flush
+BATCH_TIMEOUT = 24 * 3600
+
+FIELD = 'view_count'
+
+# {(model label, lookup, value): views} not yet spilled by this process
+_buffer = defaultdict(int)
+_lock = threading.Lock()
+_last_spill = time.monotonic()
+# Whether a spill left a flush check for the end of the request
+_flush_pending = False
+
+
+def record_view(model, lookup, value):
+    """Count one view of the `model` row whose `lookup` field equals `value`."""
+    global _last_spill, _flush_pending
+    with _lock:
+        _buffer[(model._meta.label_lower, lookup, value)] += 1
+        due = time.monotonic() - _last_spill >= settings.VIEW_COUNT_BUFFER_SECONDS
+        if due:
+            _last_spill = time.monotonic()
+    if due:
+        spill_views()
+        _flush_pending = True
+
+
+def spill_views():
+    """Move this process' buffered views to the shared cache; return how many."""
+    global _buffer
+    with _lock:
+        views, _buffer = _buffer, defaultdict(int)
+    if not views:
+        return 0
+    try:
+        slot = increment(BATCHES_KEY)
+        cache.set(f'{BATCH_PREFIX}:{slot}', dict(views), BATCH_TIMEOUT)
+    except Exception:
+        logger.exception(f"Could not spill {sum(views.values())} views to the cache")
+        return 0
+    return sum(views.values())
+
+
+def flush_due_view_counts():
+    """Flush the spilled views when the last flush is VIEW_COUNT_FLUSH_SECONDS old."""
+    if time.time() - cache.get(FLUSHED_AT_KEY, 0) < settings.VIEW_COUNT_FLUSH_SECONDS:
+        return 0
+    try:
+        return flush_view_counts()
+    except Exception:
+        # The views stay in the cache for the next flush
+        logger.exception("Could not flush the view counts")
+        return 0
+
+
+@receiver(request_finished, dispatch_uid='view_counters:flush')
+def flush_after_response(sender, **kwargs):
+    """Run the flush check left by record_view() once the response is sent."""
+    global _flush_pending
+    if _flush_pending:
+        _flush_pending = False
+        flush_due_view_counts()
+
+
+def _add_views(views):
+    """Add {(label, lookup, value): views} to the rows, one UPDATE per model, lookup and count."""
+    groups = defaultdict(list)
+    for (label, lookup, value), count in views.items():
+        groups[(label, lookup, count)].append(value)
+
+    with transaction.atomic():
+        for (label, lookup, count), values in groups.items():
+            model = apps.get_model(label)
+            model._default_manager.filter(**{f'{lookup}__in': values}).update(
+                **{FIELD: F(FIELD) + count}
+            )
+    return len(groups)
+
+
+def flush_view_counts(settle=True):
+    """
+    Add the views spilled to the cache to the database; return how many.
+
+    With settle=False every batch is drained at once, including one whose
+    number was taken but that isn't written yet (it is then lost): use it
+    when no other process is counting, e.g. in tests.
+    """
+    spill_views()
+    with CacheLock('view_counts', timeout=300) as acquired:
+        if not acquired:
+            return 0
+
+        last = cache.get(BATCHES_KEY, 0)
+        flushed = cache.get(FLUSHED_KEY, 0)
+        sealed = cache.get(SEALED_KEY, 0)
+        if last < flushed or last < sealed:
+            # The cache was cleared: start numbering again
+            flushed = sealed = 0
+        end = last if not settle else sealed
+
+        keys = [f'{BATCH_PREFIX}:{slot}' for slot in range(flushed + 1, end + 1)]
+        views = defaultdict(int)
+        for batch in cache.get_many(keys).values():
+            for key, count in batch.items():
+                views[key] += count
+
+        if views:
+            _add_views(views)
+        cache.set_many({FLUSHED_KEY: end, SEALED_KEY: last, FLUSHED_AT_KEY: time.time()}, None)
+        cache.delete_many(keys)
+        return sum(views.values())
+
+
+class ViewCountMixin:
+    """Count successful GETs (including 304 and cached responses) of a detail view."""
+
+    # Model whose view_count is incremented (the queryset's model by default)
+    view_count_model = None
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            model = self.view_count_model or self.get_queryset().model
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            record_view(model, self.lookup_field, self.kwargs[lookup_url_kwarg])
+        return response
+
+
+atexit.register(spill_views)
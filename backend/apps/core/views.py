@@ -0,0 +1,102 @@
+"""
+Core view mixins.
+"""
+from django.db.models import Prefetch
+
+from .serializers import (
+    get_request_language, get_requested_fields, select_fields, translation_projection
+)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Only load the relations and columns a request renders.
+
+    Pairs with apps.core.serializers.SparseFieldsetMixin. Map serializer
+    fields to the lookups they need; lookups may be callables returning a
+    Prefetch (built per request, e.g. for time-dependent querysets):
+
+        field_select_related = {'category': ['category']}
+        field_prefetch_related = {
+            'images': ['images'],
+            'is_early_booking': [prefetch_active_offers],
+        }
+
+    and pass the base queryset through apply_field_relations() in
+    get_queryset(). Translation columns of the other languages are deferred
+    on the queryset and on every joined or prefetched relation.
+    """
+
+    field_select_related = {}
+    field_prefetch_related = {}
+
+    def get_rendered_fields(self):
+        """Names of the top-level serializer fields this request renders."""
+        serializer_class = self.get_serializer_class()
+        declared = getattr(serializer_class.Meta, 'fields', None)
+        if not isinstance(declared, (list, tuple)):
+            declared = list(serializer_class().fields)
+        fields, include = get_requested_fields(self.request)
+        return set(select_fields(
+            declared, fields, include, getattr(serializer_class, 'OPTIONAL_FIELDS', ())
+        ))
+
+    def get_loaded_fields(self):
+        """Fields whose relations are loaded with the object (the rendered ones)."""
+        return self.get_rendered_fields()
+
+    def get_translation_projection(self):
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return translation_projection(serializer, get_request_language(self.request))
+
+    def apply_field_relations(self, queryset):
+        """Add the lookups of the rendered fields and defer unused translations."""
+        rendered = self.get_loaded_fields()
+        projection = self.get_translation_projection()
+
+        select = []
+        for field, lookups in self.field_select_related.items():
+            if field in rendered:
+                select.extend(lookup for lookup in lookups if lookup not in select)
+
+        prefetches, seen = [], set()
+        for field, lookups in self.field_prefetch_related.items():
+            if field not in rendered:
+                continue
+            for lookup in lookups:
+                lookup = lookup() if callable(lookup) else lookup
+                key = lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+                if key not in seen:
+                    seen.add(key)
+                    prefetches.append(self._project_prefetch(queryset.model, lookup, projection))
+
+        deferred = list(projection.get('', []))
+        for path in select:
+            deferred.extend(f'{path}__{column}' for column in projection.get(path, []))
+
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    @staticmethod
+    def _project_prefetch(model, lookup, projection):
+        """Defer the unused translations of a prefetched relation."""
+        path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        columns = projection.get(path)
+        if not columns:
+            return lookup
+        if isinstance(lookup, Prefetch) and lookup.queryset is not None:
+            lookup.queryset = lookup.queryset.defer(*columns)
+            return lookup
+
+        related = model
+        for part in path.split('__'):
+            related = related._meta.get_field(part).related_model
+        return Prefetch(
+            path, queryset=related._default_manager.defer(*columns),
+            to_attr=getattr(lookup, 'to_attr', None)
+        )
@@ -5,3 +5,6 @@ class DestinationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.destinations'
     verbose_name = 'Destinations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
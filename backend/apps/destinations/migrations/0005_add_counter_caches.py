@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(rows, group_by):
+    counts = rows.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def populate_tour_counts(apps, schema_editor):
+    Destination = apps.get_model('destinations', 'Destination')
+    Tour = apps.get_model('tours', 'Tour')
+    links = Tour.destinations.through.objects.filter(
+        destination=OuterRef('pk'), tour__is_published=True
+    )
+    Destination.objects.update(tour_count=count_subquery(links, 'destination'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('destinations', '0004_add_translation_fields'),
+        ('tours', '0008_add_translation_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='destination',
+            name='tour_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_tour_counts, migrations.RunPython.noop),
+    ]
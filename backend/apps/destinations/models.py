@@ -38,6 +38,9 @@ class Destination(TimeStampedModel, SluggedModel, SEOModel, SortableModel):
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
 
+    # Counter cache (maintained by apps.core.counters)
+    tour_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Destination'
         verbose_name_plural = 'Destinations'
@@ -49,10 +52,6 @@ class Destination(TimeStampedModel, SluggedModel, SEOModel, SortableModel):
     def get_slug_source(self):
         return self.name
 
-    @property
-    def tour_count(self):
-        return self.tours.filter(is_published=True).count()
-
 
 class DestinationImage(TimeStampedModel, SortableModel):
     """Gallery images for destinations."""
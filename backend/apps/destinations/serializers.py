@@ -2,7 +2,7 @@
 Destination serializers for API.
 """
 from rest_framework import serializers
-from apps.core.serializers import MultiLanguageSerializerMixin
+from apps.core.serializers import MultiLanguageSerializerMixin, SparseFieldsetMixin
 from .models import Destination, DestinationImage, Activity
 
 
@@ -22,7 +22,7 @@ class ActivitySerializer(MultiLanguageSerializerMixin, serializers.ModelSerializ
         fields = ['id', 'name', 'name_es', 'name_pt', 'description', 'description_es', 'description_pt', 'image', 'price_from', 'price_to', 'duration']
 
 
-class DestinationListSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
+class DestinationListSerializer(SparseFieldsetMixin, MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['name', 'tagline']
     tour_count = serializers.IntegerField(read_only=True)
 
@@ -34,7 +34,7 @@ class DestinationListSerializer(MultiLanguageSerializerMixin, serializers.ModelS
         ]
 
 
-class DestinationDetailSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
+class DestinationDetailSerializer(SparseFieldsetMixin, MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['name', 'tagline', 'description']
     images = DestinationImageSerializer(many=True, read_only=True)
     activities = ActivitySerializer(many=True, read_only=True)
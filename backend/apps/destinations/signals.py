@@ -0,0 +1,16 @@
+"""
+Signal wiring for the destinations app.
+"""
+from apps.core.conditional import track_versions
+from apps.core.text_index import IndexSource, register_source
+from .models import Activity, Destination, DestinationImage
+
+# ETag / response cache versions
+track_versions(Destination)
+track_versions(DestinationImage, Activity, parent='destination')
+
+# Text index search (when TEXT_INDEX_PATH is set)
+register_source(IndexSource(
+    'destination', Destination, {'is_active': True},
+    fields=[('name', 10), ('tagline', 3), ('description', 1)],
+))
@@ -3,37 +3,49 @@ Destination views for API.
 """
 from rest_framework import generics, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Destination
+from apps.core.compiled import CompiledListMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.response_cache import ResponseCacheMixin
+from apps.core.text_index import TextIndexSearchFilter
+from apps.core.views import SparseFieldsetViewMixin
+from .models import Activity, Destination, DestinationImage
 from .serializers import DestinationListSerializer, DestinationDetailSerializer
 
 
-class DestinationListView(generics.ListAPIView):
+class DestinationListView(ConditionalGetMixin, ResponseCacheMixin, CompiledListMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     """List all active destinations."""
     serializer_class = DestinationListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    version_models = [Destination]
+    filter_backends = [DjangoFilterBackend, TextIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_featured', 'country', 'region']
+    search_index_kind = 'destination'
     search_fields = ['name', 'description', 'tagline']
     ordering_fields = ['name', 'sort_order']
     ordering = ['sort_order']
 
     def get_queryset(self):
-        return Destination.objects.filter(is_active=True)
+        return self.apply_field_relations(Destination.objects.filter(is_active=True))
 
 
-class DestinationDetailView(generics.RetrieveAPIView):
-    """Get destination details by slug."""
+class DestinationDetailView(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
+    """Get destination details by slug (supports ?fields=)."""
     serializer_class = DestinationDetailSerializer
+    version_models = [Destination, DestinationImage, Activity]
+    cache_object_models = [Destination, DestinationImage, Activity]
     lookup_field = 'slug'
+    field_prefetch_related = {
+        'images': ['images'],
+        'activities': ['activities'],
+    }
 
     def get_queryset(self):
-        return Destination.objects.filter(is_active=True).prefetch_related(
-            'images', 'activities'
-        )
+        return self.apply_field_relations(Destination.objects.filter(is_active=True))
 
 
-class FeaturedDestinationsView(generics.ListAPIView):
+class FeaturedDestinationsView(ConditionalGetMixin, ResponseCacheMixin, CompiledListMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     """List featured destinations."""
     serializer_class = DestinationListSerializer
+    version_models = [Destination]
 
     def get_queryset(self):
-        return Destination.objects.filter(is_active=True, is_featured=True)[:6]
+        return self.apply_field_relations(Destination.objects.filter(is_active=True, is_featured=True))[:6]
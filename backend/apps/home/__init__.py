@@ -0,0 +1 @@
+# Home App
@@ -0,0 +1,107 @@
+"""
+Home views for API.
+
+GET /api/home/ returns every homepage section in one response, instead of
+one request per section:
+
+    featured_tours            /api/tours/featured/
+    popular_tours             /api/tours/popular/
+    multi_destination_tours   /api/tours/multi-destination/
+    featured_destinations     /api/destinations/featured/
+    testimonials              /api/reviews/testimonials/
+    statistics                /api/contact/statistics/
+    early_booking_offers      /api/tours/early-booking/featured/
+    latest_posts              /api/blog/posts/latest/
+
+Each section holds the results of its endpoint (without the pagination
+envelope). The sections are built from the same views' querysets and
+serializers. The three tour sections share one offers query. The document
+is cached per language and has one ETag covering the models of every
+section.
+"""
+from rest_framework import generics
+from rest_framework.response import Response
+
+from apps.blog.views import LatestPostsView
+from apps.contact.views import StatisticListView
+from apps.core.compiled import CompiledListMixin, NotCompilable, compile_serializer
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.response_cache import ResponseCacheMixin
+from apps.destinations.views import FeaturedDestinationsView
+from apps.reviews.views import TestimonialListView
+from apps.tours.cards import TourCardListMixin, get_cards, render_cards
+from apps.tours.effective_prices import ensure_effective_prices
+from apps.tours.models import Tour
+from apps.tours.views import (
+    FeaturedEarlyBookingView, FeaturedToursView, MultiDestinationToursView, PopularToursView
+)
+
+SECTIONS = [
+    ('featured_tours', FeaturedToursView),
+    ('popular_tours', PopularToursView),
+    ('multi_destination_tours', MultiDestinationToursView),
+    ('featured_destinations', FeaturedDestinationsView),
+    ('testimonials', TestimonialListView),
+    ('statistics', StatisticListView),
+    ('early_booking_offers', FeaturedEarlyBookingView),
+    ('latest_posts', LatestPostsView),
+]
+
+
+def _section_view(view_class, request):
+    """An instance of a section's view bound to the bundle request."""
+    view = view_class()
+    view.request = request
+    view.args, view.kwargs = (), {}
+    view.format_kwarg = None
+    return view
+
+
+def _card_sections(views, request):
+    """Render all tour card sections together, with one offers query."""
+    sections = {}
+    for key, view in views.items():
+        queryset = view.get_queryset()
+        if queryset.model is Tour:
+            sections[key] = get_cards(queryset.values_list('pk', flat=True), view.get_card_language())
+        else:
+            sections[key] = list(queryset)
+
+    rendered = iter(render_cards([card for cards in sections.values() for card in cards], request))
+    return {key: [next(rendered) for card in cards] for key, cards in sections.items()}
+
+
+def _section_data(view, request):
+    queryset = view.get_queryset()
+    if isinstance(view, CompiledListMixin):
+        try:
+            plan = compile_serializer(view.get_serializer_class(), request)
+            return plan.serialize(queryset.prefetch_related(None).values(*plan.columns), request)
+        except NotCompilable:
+            pass
+    return view.get_serializer(queryset, many=True).data
+
+
+class HomeView(ConditionalGetMixin, ResponseCacheMixin, generics.RetrieveAPIView):
+    """All homepage sections in one cached response."""
+    version_models = list(dict.fromkeys(
+        model for key, view_class in SECTIONS for model in view_class.version_models
+    ))
+    version_interval = min(
+        view_class.version_interval for key, view_class in SECTIONS if view_class.version_interval
+    )
+    transition_sources = list(dict.fromkeys(
+        source for key, view_class in SECTIONS for source in view_class.transition_sources
+    ))
+
+    def retrieve(self, request, *args, **kwargs):
+        ensure_effective_prices()
+        views = {key: _section_view(view_class, request) for key, view_class in SECTIONS}
+
+        cards = _card_sections(
+            {key: view for key, view in views.items() if isinstance(view, TourCardListMixin)}, request
+        )
+        return Response({
+            key: cards[key] if key in cards else _section_data(view, request)
+            for key, view in views.items()
+        })
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_add_translation_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_approved', '-created_at', '-id'], name='reviews_rev_is_appr_c77c05_idx'),
+        ),
+    ]
@@ -55,6 +55,10 @@ class Review(TimeStampedModel):
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the review lists
+            models.Index(fields=['is_approved', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.reviewer_name} - {self.tour.name} ({self.rating}★)"
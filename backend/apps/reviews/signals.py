@@ -0,0 +1,10 @@
+"""
+Signal wiring for the reviews app.
+"""
+from apps.core.conditional import track_versions
+from .models import Review, ReviewImage, Testimonial
+
+# ETag / response cache versions
+track_versions(Review, parent='tour')
+track_versions(ReviewImage, parent='review')
+track_versions(Testimonial)
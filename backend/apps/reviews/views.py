@@ -3,15 +3,26 @@ Review views for API.
 """
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Review, Testimonial
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.response_cache import ResponseCacheMixin
+from apps.core.pagination import KeysetPagination
+from apps.tours.models import Tour
+from .models import Review, ReviewImage, Testimonial
 from .serializers import (
     ReviewSerializer, ReviewCreateSerializer, TestimonialSerializer
 )
 
 
-class ReviewListView(generics.ListAPIView):
+class ReviewPagination(KeysetPagination):
+    """Newest reviews first; ?cursor= switches to keyset pages."""
+    keyset = ('-created_at', '-id')
+
+
+class ReviewListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List approved reviews."""
     serializer_class = ReviewSerializer
+    version_models = [Review, ReviewImage, Tour]
+    pagination_class = ReviewPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['tour', 'rating', 'is_verified', 'is_featured']
     ordering_fields = ['created_at', 'rating']
@@ -21,9 +32,11 @@ class ReviewListView(generics.ListAPIView):
         return Review.objects.filter(is_approved=True).select_related('tour')
 
 
-class TourReviewsView(generics.ListAPIView):
+class TourReviewsView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List reviews for a specific tour."""
     serializer_class = ReviewSerializer
+    version_models = [Review, ReviewImage, Tour]
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
         tour_slug = self.kwargs.get('tour_slug')
@@ -38,9 +51,10 @@ class ReviewCreateView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
 
-class FeaturedReviewsView(generics.ListAPIView):
+class FeaturedReviewsView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List featured reviews for homepage."""
     serializer_class = ReviewSerializer
+    version_models = [Review, ReviewImage, Tour]
 
     def get_queryset(self):
         return Review.objects.filter(
@@ -48,9 +62,10 @@ class FeaturedReviewsView(generics.ListAPIView):
         ).select_related('tour')[:6]
 
 
-class TestimonialListView(generics.ListAPIView):
+class TestimonialListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List active testimonials."""
     serializer_class = TestimonialSerializer
+    version_models = [Testimonial]
 
     def get_queryset(self):
         return Testimonial.objects.filter(is_active=True)
@@ -1,3 +1,4 @@
+from django import forms
 from django.contrib import admin
 from .models import (
     TourCategory, TourType, Tour, TourImage, TourHighlight, TourItinerary,
@@ -70,8 +71,52 @@ class TourPricingInline(admin.TabularInline):
     fields = ['season_name', 'season_name_es', 'season_name_pt', 'start_date', 'end_date', 'price_per_person', 'single_supplement']
 
 
+class TourDepartureForm(forms.ModelForm):
+    """
+    The seats of an existing departure belong to its bookings
+    (apps.bookings.reservations): available_spots is read-only, and the
+    status follows the seats except that it can be set to cancelled.
+    """
+
+    class Meta:
+        model = TourDeparture
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['available_spots'].disabled = True
+            current = self.instance.status
+            self.fields['status'].widget.choices = [
+                (value, label) for value, label in self.fields['status'].choices
+                if value in (current, 'cancelled')
+            ]
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        if self.instance.pk and status != 'cancelled':
+            # A booking may have moved it since the form was loaded
+            return self.instance.status
+        return status
+
+
+class TourDepartureFormSet(forms.BaseInlineFormSet):
+    def save_existing(self, form, instance, commit=True):
+        """Save only the edited columns, never the seats read with the form."""
+        instance = form.save(commit=False)
+        fields = [
+            name for name in form.changed_data
+            if name != 'status' or form.cleaned_data['status'] == 'cancelled'
+        ]
+        if commit and fields:
+            instance.save(update_fields=[*fields, 'updated_at'])
+        return instance
+
+
 class TourDepartureInline(admin.TabularInline):
     model = TourDeparture
+    form = TourDepartureForm
+    formset = TourDepartureFormSet
     extra = 1
 
 
@@ -138,10 +183,11 @@ class TourAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Stats', {
-            'fields': ('average_rating', 'review_count'),
+            'fields': ('average_rating', 'review_count', 'view_count'),
             'classes': ('collapse',)
         }),
     )
+    readonly_fields = ['view_count']
 
     inlines = [
         TourImageInline, TourHighlightInline, TourItineraryInline,
@@ -0,0 +1,223 @@
+"""
+Tour card read model.
+
+Maintains TourCard rows (the pre-rendered TourListSerializer output per tour
+and language) and renders listing responses from them. Cards are rebuilt
+incrementally: signals collect the affected tour ids and the rebuild runs
+once when the surrounding transaction commits.
+
+The early booking fields depend on the current time, so they are not stored
+and are added to the cards at read time with one offers query per page. So
+are the category and tour type tour_count (one query each per page): stored
+in the card, publishing one tour would rebuild every card of its category
+and type.
+"""
+from django.conf import settings
+from django.db import transaction
+from rest_framework.response import Response
+
+from apps.core.batching import OnCommitBatch
+from apps.core.conditional import bump_versions
+from apps.core.serializers import get_request_language, get_requested_fields, select_fields
+from .effective_prices import ensure_effective_prices
+from .models import Tour, TourCard, TourCategory, TourType
+from .offers import get_best_offers
+from .pricing import early_booking_price
+
+CARD_LANGUAGES = [code for code, name in settings.LANGUAGES]
+
+# Fields added at read time, in TourListSerializer field order
+EARLY_BOOKING_FIELDS = [
+    'is_early_booking', 'early_booking_discount', 'early_booking_price', 'early_booking_badge'
+]
+
+# Top-level card fields, in TourListSerializer field order
+CARD_FIELDS = [
+    'id', 'name', 'slug', 'short_description', 'featured_image', 'category', 'tour_type',
+    'days', 'nights', 'duration_display', 'price', 'discounted_price', 'currency',
+    'has_discount', 'discount_percentage', 'discount_start_date', 'discount_end_date',
+    'is_featured', 'is_best_seller', 'is_new', 'is_multi_destination',
+    'average_rating', 'review_count', 'difficulty_level',
+    'destination_names', 'max_group_size', 'highlights',
+] + EARLY_BOOKING_FIELDS
+
+# Nested objects whose tour_count is read at render time: (card field, model)
+COUNTED_RELATIONS = [('category', TourCategory), ('tour_type', TourType)]
+
+# Image paths inside a card, stored relative and made absolute per request
+IMAGE_FIELDS = [('featured_image',), ('category', 'image')]
+
+
+def build_cards(tours, languages=CARD_LANGUAGES):
+    """Render unsaved TourCard rows for the given tours in the given languages (all by default)."""
+    from .serializers import TourListSerializer
+
+    cards = []
+    for language in languages:
+        serializer = TourListSerializer(tours, many=True, context={'language': language})
+        for tour, data in zip(tours, serializer.data):
+            for field in EARLY_BOOKING_FIELDS:
+                data.pop(field, None)
+            cards.append(TourCard(
+                tour=tour,
+                language=language,
+                data=data,
+                price=tour.price,
+                is_featured=tour.is_featured,
+                is_best_seller=tour.is_best_seller,
+                is_multi_destination=tour.is_multi_destination,
+                tour_created_at=tour.created_at,
+            ))
+    return cards
+
+
+def rebuild_tour_cards(tour_ids=None):
+    """
+    Rebuild the cards of the given tours (all tours when None).
+
+    Unpublished or deleted tours simply lose their cards.
+    """
+    tours = _card_tours()
+    stale = TourCard.objects.all()
+    if tour_ids is not None:
+        tour_ids = list(tour_ids)
+        tours = tours.filter(pk__in=tour_ids)
+        stale = stale.filter(tour_id__in=tour_ids)
+
+    tours = list(tours)
+    with transaction.atomic():
+        stale.delete()
+        # A concurrent rebuild of the same tours may insert their cards first
+        TourCard.objects.bulk_create(build_cards(tours), batch_size=500, ignore_conflicts=True)
+    bump_versions([TourCard])
+    return len(tours)
+
+
+def _card_tours():
+    return Tour.objects.filter(is_published=True).select_related(
+        'category', 'tour_type'
+    ).prefetch_related('destinations')
+
+
+_rebuild_batch = OnCommitBatch(rebuild_tour_cards)
+
+
+def schedule_card_rebuild(tour_ids):
+    """Rebuild the cards of the given tours once the current transaction commits."""
+    _rebuild_batch.add(tour_ids)
+
+
+def render_cards(cards, request):
+    """
+    Turn TourCard rows into TourListSerializer-shaped dicts for the response.
+
+    Honours ?fields= like the serializer; the offers and tour_count queries
+    are skipped when none of their fields is requested.
+    """
+    requested, include = get_requested_fields(request)
+    keep = None
+    if requested is not None:
+        keep = select_fields(CARD_FIELDS, requested, include)
+
+    with_offers = keep is None or any(field in keep for field in EARLY_BOOKING_FIELDS)
+    offers = get_best_offers([card.tour_id for card in cards]) if with_offers else {}
+    counts = _relation_counts(cards, keep)
+    results = []
+    for card in cards:
+        data = dict(card.data)
+        for field, model in COUNTED_RELATIONS:
+            if isinstance(data.get(field), dict) and data[field].get('id') in counts[field]:
+                data[field] = dict(data[field], tour_count=counts[field][data[field]['id']])
+        if with_offers:
+            offer = offers.get(card.tour_id)
+            data['is_early_booking'] = offer is not None
+            data['early_booking_discount'] = offer.discount_percentage if offer else None
+            data['early_booking_price'] = float(early_booking_price(card.price, offer)) if offer else None
+            data['early_booking_badge'] = offer.badge_text if offer else None
+        if keep is not None:
+            data = {field: data[field] for field in keep if field in data}
+        _absolutize_images(data, request)
+        results.append(data)
+    return results
+
+
+def _relation_counts(cards, keep):
+    """{card field: {pk: tour_count}} of the categories and types on the cards."""
+    counts = {}
+    for field, model in COUNTED_RELATIONS:
+        pks = set()
+        if keep is None or field in keep:
+            pks = {
+                card.data[field]['id'] for card in cards if isinstance(card.data.get(field), dict)
+            }
+        counts[field] = dict(model.objects.filter(pk__in=pks).values_list('pk', 'tour_count')) if pks else {}
+    return counts
+
+
+def get_cards(tour_ids, language):
+    """
+    Return the cards of the given tours in the given order.
+
+    Cards missing from the table (e.g. before the first full rebuild) are
+    rendered in memory for this response and stored by a scheduled rebuild,
+    so concurrent listings missing the same cards don't insert them twice.
+    """
+    tour_ids = list(tour_ids)
+    cards = {
+        card.tour_id: card
+        for card in TourCard.objects.filter(tour_id__in=tour_ids, language=language)
+    }
+    missing = [pk for pk in tour_ids if pk not in cards]
+    if missing:
+        tours = list(_card_tours().filter(pk__in=missing))
+        cards.update((card.tour_id, card) for card in build_cards(tours, [language]))
+        schedule_card_rebuild(missing)
+    return [cards[pk] for pk in tour_ids if pk in cards]
+
+
+def _absolutize_images(data, request):
+    if request is None:
+        return
+    for path in IMAGE_FIELDS:
+        container = data
+        for key in path[:-1]:
+            container = container.get(key) if isinstance(container, dict) else None
+        if isinstance(container, dict) and container.get(path[-1]):
+            container[path[-1]] = request.build_absolute_uri(container[path[-1]])
+
+
+class TourCardListMixin:
+    """
+    Serve a tour listing from the TourCard read model.
+
+    The view's queryset only selects and orders the tours (it may be a Tour
+    or a TourCard queryset); the response body comes from the cards.
+    """
+
+    def get_card_language(self):
+        return get_request_language(self.request)
+
+    def add_card_fields(self, data, tours):
+        """Add request-specific fields to the rendered cards of the page's tours."""
+
+    def list(self, request, *args, **kwargs):
+        # Cards and price filters past a discount or offer boundary are refreshed first
+        ensure_effective_prices()
+        queryset = self.filter_queryset(self.get_queryset())
+        if queryset.model is Tour:
+            queryset = queryset.only('id')
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+
+        if queryset.model is TourCard:
+            cards = rows
+        else:
+            cards = get_cards([tour.pk for tour in rows], self.get_card_language())
+
+        data = render_cards(cards, request)
+        if queryset.model is Tour:
+            self.add_card_fields(data, rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
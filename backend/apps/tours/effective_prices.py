@@ -0,0 +1,89 @@
+"""
+Effective tour prices.
+
+Tour.effective_price is the listing price of apps.tours.pricing:
+Tour.price less the tour discount or early booking offer open now. It is
+stored and indexed so the listing's price filters and ?ordering=price stay
+an index range scan, and Tour.effective_price_until records when it next
+changes (a discount or offer window opening or closing).
+
+- Signals refresh the affected tours when a tour or an offer changes, once
+  the transaction commits.
+- Prices that reach their boundary are refreshed by the
+  refresh_effective_prices command or Celery task, and on the first
+  listing request after it, so listings stay correct without a scheduler.
+  Those tours' cards are rebuilt too: they store the discounted price.
+  Card listings check for due prices before reading the cards.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.batching import OnCommitBatch
+from apps.core.caching import CacheLock
+from apps.core.conditional import bump_versions, object_tag
+from .models import Tour
+from .pricing import listing_prices
+
+
+def refresh_effective_prices(tour_ids=None, now=None, rebuild_cards=False):
+    """
+    Recompute the effective prices of the given tours (all tours when None).
+    Returns the number of tours whose price changed.
+    """
+    with transaction.atomic():
+        # Serialize concurrent refreshes of the same tours: each computes from
+        # what the previous one wrote, so a late sweep can't write an older price
+        tours = Tour.objects.select_for_update()
+        if tour_ids is not None:
+            tours = tours.filter(pk__in=list(tour_ids))
+        stored = {
+            pk: (price, until)
+            for pk, price, until in tours.values_list('pk', 'effective_price', 'effective_price_until')
+        }
+        if not stored:
+            return 0
+
+        now = now or timezone.now()
+        prices = listing_prices(stored, now)
+        updated = [
+            Tour(pk=pk, effective_price=price, effective_price_until=until)
+            for pk, (price, until) in prices.items() if stored[pk] != (price, until)
+        ]
+        # bulk_update sends no post_save, so a refresh isn't taken for an edit of the tour
+        Tour.objects.bulk_update(updated, ['effective_price', 'effective_price_until'], batch_size=500)
+
+    changed = [tour.pk for tour in updated if stored[tour.pk][0] != tour.effective_price]
+    if changed:
+        bump_versions([Tour] + [object_tag(Tour, pk) for pk in changed])
+    if rebuild_cards:
+        from .cards import rebuild_tour_cards
+        rebuild_tour_cards(list(prices))
+    return len(changed)
+
+
+def refresh_due_effective_prices(now=None):
+    """Refresh the tours whose effective price reached its boundary; return how many changed."""
+    now = now or timezone.now()
+    due = list(Tour.objects.filter(effective_price_until__lte=now).values_list('pk', flat=True))
+    if not due:
+        return 0
+    return refresh_effective_prices(due, now, rebuild_cards=True)
+
+
+def ensure_effective_prices(now=None):
+    """Refresh due effective prices before they are filtered or sorted on (one indexed query when none are)."""
+    now = now or timezone.now()
+    if not Tour.objects.filter(effective_price_until__lte=now).exists():
+        return
+    # Concurrent requests use the current prices while one refreshes
+    with CacheLock('effective_prices') as acquired:
+        if acquired:
+            refresh_due_effective_prices(now)
+
+
+_refresh_batch = OnCommitBatch(refresh_effective_prices)
+
+
+def schedule_effective_price_refresh(tour_ids):
+    """Refresh the effective prices of the given tours once the current transaction commits."""
+    _refresh_batch.add(tour_ids)
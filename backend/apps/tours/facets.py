@@ -0,0 +1,171 @@
+"""
+Facet counts for the tour filter sidebar.
+
+Counts tours per category, tour type, destination, difficulty, duration
+bucket and price bucket for the current TourFilter selection. Each facet is
+counted with every other selected filter applied but not its own, so the
+sidebar still shows the alternatives to the selected value.
+
+All facets come from a single query over the matching tours (one row per
+tour and destination); the counting happens in Python in one pass.
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from apps.core.text_index import localized
+from apps.destinations.models import Destination
+from .models import Tour, TourCategory, TourType
+
+# (key, min, max) with inclusive bounds, matching the TourFilter gte/lte
+# parameters the UI sends when a bucket is picked. None means open-ended.
+DURATION_BUCKETS = [
+    ('1-3', 1, 3),
+    ('4-7', 4, 7),
+    ('8-14', 8, 14),
+    ('15+', 15, None),
+]
+
+PRICE_BUCKETS = [
+    ('0-499', 0, Decimal('499.99')),
+    ('500-999', 500, Decimal('999.99')),
+    ('1000-1999', 1000, Decimal('1999.99')),
+    ('2000+', 2000, None),
+]
+
+# TourFilter parameters owned by each facet
+FACET_PARAMS = {
+    'category': ['category'],
+    'tour_type': ['tour_type'],
+    'destination': ['destination'],
+    'difficulty': ['difficulty'],
+    'duration': ['min_days', 'max_days'],
+    'price': ['min_price', 'max_price'],
+}
+
+
+def _number(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def _in_range(value, low, high):
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _bucket(buckets, value):
+    for key, low, high in buckets:
+        if _in_range(value, low, high):
+            return key
+    return None
+
+
+def _predicates(params):
+    """{facet: test(row)} for the facets selected in the query parameters."""
+    tests = {}
+    for facet in ('category', 'tour_type', 'difficulty'):
+        value = params.get(facet)
+        if value:
+            tests[facet] = lambda row, facet=facet, value=value: row[facet] == value
+    if params.get('destination'):
+        slug = params['destination']
+        tests['destination'] = lambda row: slug in row['destinations']
+
+    min_days, max_days = _number(params.get('min_days')), _number(params.get('max_days'))
+    if min_days is not None or max_days is not None:
+        tests['duration'] = lambda row: _in_range(row['days'], min_days, max_days)
+
+    min_price, max_price = _number(params.get('min_price')), _number(params.get('max_price'))
+    if min_price is not None or max_price is not None:
+        tests['price'] = lambda row: _in_range(row['price'], min_price, max_price)
+    return tests
+
+
+def strip_facet_params(params):
+    """A copy of the query parameters without any facet selection."""
+    params = params.copy()
+    for names in FACET_PARAMS.values():
+        for name in names:
+            params.pop(name, None)
+    return params
+
+
+def compute_facets(queryset, params, language='en'):
+    """
+    Facet counts for the tours in `queryset` (already filtered by everything
+    except the facet parameters) under the facet selection in `params`.
+    """
+    rows = {}
+    for pk, category, tour_type, difficulty, days, price, destination in queryset.order_by().values_list(
+        'pk', 'category__slug', 'tour_type__slug', 'difficulty_level', 'days', 'effective_price',
+        'destinations__slug'
+    ):
+        row = rows.get(pk)
+        if row is None:
+            row = rows[pk] = {
+                'category': category, 'tour_type': tour_type, 'difficulty': difficulty,
+                'days': days, 'price': price, 'destinations': set(),
+            }
+        if destination:
+            row['destinations'].add(destination)
+
+    tests = _predicates(params)
+    counts = {facet: defaultdict(int) for facet in FACET_PARAMS}
+    for row in rows.values():
+        failed = [facet for facet, test in tests.items() if not test(row)]
+        if len(failed) > 1:
+            continue
+
+        # Count a facet only if the other selected facets all match
+        def counted(facet):
+            return not failed or failed == [facet]
+
+        for facet in ('category', 'tour_type', 'difficulty'):
+            if row[facet] and counted(facet):
+                counts[facet][row[facet]] += 1
+        if counted('destination'):
+            for slug in row['destinations']:
+                counts['destination'][slug] += 1
+        if counted('duration'):
+            counts['duration'][_bucket(DURATION_BUCKETS, row['days'])] += 1
+        if counted('price') and row['price'] is not None:
+            counts['price'][_bucket(PRICE_BUCKETS, row['price'])] += 1
+
+    return {
+        'category': _named_values(TourCategory, counts['category'], params.get('category'), language),
+        'tour_type': _named_values(TourType, counts['tour_type'], params.get('tour_type'), language),
+        'destination': _named_values(Destination, counts['destination'], params.get('destination'), language),
+        'difficulty': [
+            {'value': value, 'label': label, 'count': counts['difficulty'].get(value, 0),
+             'selected': params.get('difficulty') == value}
+            for value, label in Tour._meta.get_field('difficulty_level').choices
+        ],
+        'duration': _bucket_values(DURATION_BUCKETS, counts['duration'], 'min_days', 'max_days', params),
+        'price': _bucket_values(PRICE_BUCKETS, counts['price'], 'min_price', 'max_price', params),
+    }
+
+
+def _named_values(model, counts, selected, language):
+    """Facet values with their localized names, most tours first."""
+    values = [
+        {'value': obj.slug, 'label': localized(obj, 'name', language),
+         'count': counts[obj.slug], 'selected': obj.slug == selected}
+        for obj in model.objects.filter(slug__in=[*counts, selected]).only(
+            'slug', 'name', *([f'name_{language}'] if language != 'en' else [])
+        )
+    ]
+    return sorted(values, key=lambda value: (-value['count'], value['label']))
+
+
+def _bucket_values(buckets, counts, min_param, max_param, params):
+    values = []
+    for key, low, high in buckets:
+        values.append({
+            'value': key,
+            min_param: low,
+            max_param: high,
+            'count': counts.get(key, 0),
+            'selected': _number(params.get(min_param)) == low and _number(params.get(max_param)) == high,
+        })
+    return values
@@ -1,8 +1,67 @@
 """
 Tour filters for API.
 """
+from datetime import timedelta
+
 import django_filters
-from .models import Tour, TourType
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+from rest_framework import filters
+
+from .models import Tour, TourDeparture, TourType
+
+DEPARTURE_STATUSES = ['available', 'limited', 'sold_out']
+BOOKABLE_STATUSES = ['available', 'limited']
+MAX_DEPARTURE_FLEX = 30
+
+# Filters that all apply to the same departure
+DEPARTURE_FILTERS = [
+    'departure_from', 'departure_to', 'departure_flex', 'party_size', 'departure_status', 'guaranteed'
+]
+
+
+class ChoiceInFilter(django_filters.BaseInFilter, django_filters.ChoiceFilter):
+    """Comma-separated choices, e.g. ?departure_status=available,limited; unknown ones are a 400."""
+
+
+def matching_departures(departure_from=None, departure_to=None, departure_flex=None,
+                        party_size=None, departure_status=None, guaranteed=None):
+    """
+    Upcoming departures matching an availability search.
+
+    The date window is widened by `departure_flex` days on both sides.
+    Without `departure_status` only bookable departures match.
+    """
+    flex = timedelta(days=max(0, min(int(departure_flex or 0), MAX_DEPARTURE_FLEX)))
+    earliest = timezone.localdate()
+    if departure_from:
+        earliest = max(earliest, departure_from - flex)
+    departures = TourDeparture.objects.filter(
+        departure_date__gte=earliest, status__in=departure_status or BOOKABLE_STATUSES,
+    )
+    if departure_to:
+        departures = departures.filter(departure_date__lte=departure_to + flex)
+    if party_size:
+        departures = departures.filter(available_spots__gte=party_size)
+    if guaranteed is not None:
+        departures = departures.filter(is_guaranteed=guaranteed)
+    return departures
+
+
+def filter_by_departures(queryset, departures):
+    """
+    Keep the tours with a matching departure and annotate the earliest one.
+
+    A semi-join (EXISTS) instead of a join on departures, so tours with
+    several matching departures are neither repeated nor need DISTINCT.
+    The earliest match comes back in the same query as
+    `matching_departure_id` / `matching_departure_date`.
+    """
+    earliest = departures.filter(tour=OuterRef('pk')).order_by('departure_date', 'pk')
+    return queryset.filter(Exists(earliest)).annotate(
+        matching_departure_id=Subquery(earliest.values('pk')[:1]),
+        matching_departure_date=Subquery(earliest.values('departure_date')[:1]),
+    )
 
 
 class TourFilter(django_filters.FilterSet):
@@ -21,8 +80,10 @@ class TourFilter(django_filters.FilterSet):
         lookup_expr='exact'
     )
 
-    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
-    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    # The price after the discount or early booking offer open now
+    min_price = django_filters.NumberFilter(field_name='effective_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='effective_price', lookup_expr='lte')
+    currency = django_filters.CharFilter(field_name='currency', lookup_expr='iexact')
 
     min_days = django_filters.NumberFilter(field_name='days', lookup_expr='gte')
     max_days = django_filters.NumberFilter(field_name='days', lookup_expr='lte')
@@ -34,10 +95,49 @@ class TourFilter(django_filters.FilterSet):
     is_multi_destination = django_filters.BooleanFilter()
     has_discount = django_filters.BooleanFilter()
 
+    # Departure availability (combined into one condition in filter_queryset)
+    departure_from = django_filters.DateFilter(method='filter_departure')
+    departure_to = django_filters.DateFilter(method='filter_departure')
+    departure_flex = django_filters.NumberFilter(method='filter_departure')
+    party_size = django_filters.NumberFilter(method='filter_departure')
+    departure_status = ChoiceInFilter(
+        method='filter_departure', choices=[(status, status) for status in DEPARTURE_STATUSES]
+    )
+    guaranteed = django_filters.BooleanFilter(method='filter_departure')
+
     class Meta:
         model = Tour
         fields = [
             'destination', 'category', 'tour_type',
-            'min_price', 'max_price', 'min_days', 'max_days',
-            'difficulty', 'is_featured', 'is_best_seller', 'is_multi_destination', 'has_discount'
+            'min_price', 'max_price', 'currency', 'min_days', 'max_days',
+            'difficulty', 'is_featured', 'is_best_seller', 'is_multi_destination', 'has_discount',
+        ] + DEPARTURE_FILTERS
+
+    def filter_departure(self, queryset, name, value):
+        # Applied together in filter_queryset, so all conditions hold for the same departure
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = {
+            name: self.form.cleaned_data.get(name) for name in DEPARTURE_FILTERS
+            if self.form.cleaned_data.get(name) not in (None, '', [])
+        }
+        if not params:
+            return queryset
+        return filter_by_departures(queryset, matching_departures(**params))
+
+
+class TourOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter where ?ordering=price sorts by the effective price."""
+
+    ordering_aliases = {'price': 'effective_price'}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            ('-' if field.startswith('-') else '') + self.ordering_aliases.get(field.lstrip('-'), field.lstrip('-'))
+            for field in ordering
         ]
@@ -0,0 +1,105 @@
+"""
+Benchmark the pricing engine (apps.tours.pricing).
+
+Usage:
+    python manage.py benchmark_pricing
+    python manage.py benchmark_pricing --days 60 --repeat 5
+
+Prices every published tour for a party of two adults, a child and a
+single room on each of the next --days dates, three ways: loading the rules
+of one tour at a time (as a booking does), loading them for all tours in
+one batch, and quoting from rules already in memory. Then counts the
+prices where the float formula the serializers used before
+(round(float(price) * (100 - discount) / 100, 2)) is off by a cent from
+the Decimal result.
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.tours.models import Tour
+from apps.tours.pricing import PriceRules, apply_discount
+
+PARTY = {'adults': 2, 'children': 1, 'singles': 1}
+
+
+class Command(BaseCommand):
+    help = 'Time per-tour and batch pricing and check the old float rounding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Travel dates priced per tour')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+        parser.add_argument('--samples', type=int, default=100000, help='Random prices for the rounding check')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        today = timezone.localdate(now)
+        dates = [today + timedelta(days=i) for i in range(options['days'])]
+        tour_ids = list(Tour.objects.filter(is_published=True).values_list('pk', flat=True))
+        if not tour_ids:
+            self.stdout.write('No published tours to price')
+            return
+
+        def per_tour():
+            for tour_id in tour_ids:
+                rules = PriceRules.load([tour_id], now, dates[0], dates[-1])
+                for date in dates:
+                    rules.quote(tour_id, date, **PARTY)
+
+        def batch():
+            rules = PriceRules.load(tour_ids, now, dates[0], dates[-1])
+            for tour_id in tour_ids:
+                for date in dates:
+                    rules.quote(tour_id, date, **PARTY)
+
+        preloaded = PriceRules.load(tour_ids, now, dates[0], dates[-1])
+
+        def quotes_only():
+            for tour_id in tour_ids:
+                for date in dates:
+                    preloaded.quote(tour_id, date, **PARTY)
+
+        self.stdout.write(f'{len(tour_ids)} tours x {len(dates)} dates, party {PARTY}')
+        self.stdout.write(f"{'mode':12} {'ms':>10} {'tours/s':>10} {'quotes/s':>10} {'queries':>8}")
+        for name, run in [('per tour', per_tour), ('batch', batch), ('preloaded', quotes_only)]:
+            elapsed, queries = self.measure(run, options['repeat'])
+            quotes = len(tour_ids) * len(dates)
+            self.stdout.write(
+                f'{name:12} {elapsed * 1000:>10.1f} {len(tour_ids) / elapsed:>10.0f} '
+                f'{quotes / elapsed:>10.0f} {queries:>8}'
+            )
+
+        self.stdout.write('')
+        self.check_rounding(options['samples'])
+
+    def measure(self, run, repeat):
+        best, queries = None, 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            queries = len(captured)
+        return best, queries
+
+    def check_rounding(self, samples):
+        rng = random.Random(0)
+        prices = [Decimal(rng.randint(100, 1000000)).scaleb(-2) for _ in range(samples)]
+        percentages = [rng.randint(1, 99) for _ in range(samples)]
+
+        off = 0
+        for price, percentage in zip(prices, percentages):
+            exact = apply_discount(price, percentage)
+            old = Decimal(repr(round(float(price) * (100 - percentage) / 100, 2))).quantize(exact)
+            off += old != exact
+        self.stdout.write(
+            f'Float formula off by a cent on {off} of {samples} random prices and discounts '
+            f'({off / samples:.2%})'
+        )
@@ -0,0 +1,33 @@
+"""
+Rebuild the precomputed tour price calendars.
+
+Usage:
+    python manage.py rebuild_price_calendar
+    python manage.py rebuild_price_calendar --tour 12 --tour 15
+
+Calendars are kept up to date by signals and rebuilt on request once they
+expire; a full rebuild is only needed after bulk imports or data fixes.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.tours.price_calendar import rebuild_price_calendar
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TourPriceDay table behind /api/tours/<slug>/calendar/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour', type=int, action='append', dest='tour_ids',
+            help='Only rebuild the calendar of this tour id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_price_calendar(options['tour_ids'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Rebuilt price calendars for {count} tours in {elapsed:.2f}s.'
+        ))
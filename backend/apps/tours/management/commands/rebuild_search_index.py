@@ -0,0 +1,29 @@
+"""
+Rebuild the tour full-text search documents (PostgreSQL only).
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --tour 12 --tour 15
+"""
+from django.core.management.base import BaseCommand
+
+from apps.tours.search import search_enabled, update_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the tour full-text search documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour', type=int, action='append', dest='tour_ids',
+            help='Only reindex this tour id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING(
+                'Full-text search needs PostgreSQL; other databases use icontains lookups.'
+            ))
+            return
+        count = update_search_documents(options['tour_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Done! Indexed {count} tours.'))
@@ -0,0 +1,24 @@
+"""
+Rebuild the denormalized tour cards.
+
+Usage:
+    python manage.py rebuild_tour_cards
+    python manage.py rebuild_tour_cards --tour 12 --tour 15
+"""
+from django.core.management.base import BaseCommand
+
+from apps.tours.cards import rebuild_tour_cards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TourCard read model used by the tour listing endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour', type=int, action='append', dest='tour_ids',
+            help='Only rebuild the cards of this tour id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_tour_cards(options['tour_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Done! Rebuilt cards for {count} tours.'))
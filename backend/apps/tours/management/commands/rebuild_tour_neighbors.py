@@ -0,0 +1,71 @@
+"""
+Recompute the related tours (TourNeighbor rows).
+
+Usage:
+    python manage.py rebuild_tour_neighbors
+    python manage.py rebuild_tour_neighbors --tour 12 --tour 15
+    python manage.py rebuild_tour_neighbors --benchmark 10000
+
+Signals keep the lists up to date as tours change; a full rebuild also
+refreshes the scores of unchanged pairs (e.g. after changing WEIGHTS).
+--tour updates the lists affected by that tour. --benchmark times the
+similarity computation on that many random tours, without the database.
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.tours.neighbors import compute_neighbors, encode_tours, rebuild_tour_neighbors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TourNeighbor table behind /api/tours/<slug>/related/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour', type=int, action='append', dest='tour_ids',
+            help='Only update the lists affected by this tour id (repeatable)'
+        )
+        parser.add_argument(
+            '--benchmark', type=int, metavar='TOURS',
+            help='Time the computation on this many random tours instead'
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options['benchmark'])
+            return
+
+        started = time.perf_counter()
+        count = rebuild_tour_neighbors(options['tour_ids'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Rebuilt the related tours of {count} tours in {elapsed:.2f}s.'
+        ))
+
+    def benchmark(self, count):
+        rng = np.random.default_rng(0)
+        tours = [
+            (
+                pk, int(rng.integers(12)), int(rng.integers(6)),
+                ['easy', 'moderate', 'challenging'][rng.integers(3)],
+                int(rng.integers(1, 21)), float(rng.lognormal(7, 0.6)), float(rng.uniform(3, 5)),
+            )
+            for pk in range(1, count + 1)
+        ]
+        destinations = {
+            pk: rng.choice(200, size=rng.integers(1, 4), replace=False).tolist() for pk in range(1, count + 1)
+        }
+
+        started = time.perf_counter()
+        features = encode_tours(tours, destinations)
+        encoded = time.perf_counter()
+        rows, neighbours, scores = compute_neighbors(*features[1:], settings.TOUR_NEIGHBORS)
+        finished = time.perf_counter()
+        self.stdout.write(
+            f'{count} tours, {settings.TOUR_NEIGHBORS} neighbours each: encoded in '
+            f'{(encoded - started) * 1000:.0f} ms, scored in {finished - encoded:.2f}s '
+            f'({count / (finished - started):.0f} tours/s)'
+        )
@@ -0,0 +1,30 @@
+"""
+Refresh the stored effective prices of tours (Tour.effective_price).
+
+Usage:
+    python manage.py refresh_effective_prices
+    python manage.py refresh_effective_prices --all
+
+Run it every few minutes from cron (or schedule refresh_effective_prices_task)
+so prices and cards change as soon as a discount or early booking offer
+starts or ends. Without it they are refreshed on the first tour listing
+request after the boundary. --all recomputes every tour, after bulk imports
+or data fixes.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.tours.effective_prices import refresh_due_effective_prices, refresh_effective_prices
+
+
+class Command(BaseCommand):
+    help = 'Update Tour.effective_price for tours whose discount or offer window opened or closed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every tour, not only the due ones')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            changed = refresh_effective_prices(rebuild_cards=True)
+        else:
+            changed = refresh_due_effective_prices()
+        self.stdout.write(self.style.SUCCESS(f'Done! Updated the effective price of {changed} tours.'))
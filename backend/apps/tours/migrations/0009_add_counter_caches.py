@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(rows, group_by):
+    counts = rows.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def populate_tour_counts(apps, schema_editor):
+    Tour = apps.get_model('tours', 'Tour')
+    for model_name, relation in [('TourCategory', 'category'), ('TourType', 'tour_type')]:
+        model = apps.get_model('tours', model_name)
+        published = Tour.objects.filter(is_published=True, **{relation: OuterRef('pk')})
+        model.objects.update(tour_count=count_subquery(published, relation))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0008_add_translation_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourcategory',
+            name='tour_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tourtype',
+            name='tour_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_tour_counts, migrations.RunPython.noop),
+    ]
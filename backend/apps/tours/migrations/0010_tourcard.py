@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0009_add_counter_caches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=5)),
+                ('data', models.JSONField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('is_best_seller', models.BooleanField(default=False)),
+                ('is_multi_destination', models.BooleanField(default=False)),
+                ('tour_created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cards', to='tours.tour')),
+            ],
+            options={
+                'verbose_name': 'Tour Card',
+                'verbose_name_plural': 'Tour Cards',
+                'ordering': ['-is_featured', '-tour_created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tourcard',
+            index=models.Index(fields=['language', 'is_featured', 'tour_created_at'], name='tours_tourc_languag_1de72c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourcard',
+            index=models.Index(fields=['language', 'is_best_seller', 'tour_created_at'], name='tours_tourc_languag_f8d563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourcard',
+            index=models.Index(fields=['language', 'is_multi_destination', 'tour_created_at'], name='tours_tourc_languag_cce0ec_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tourcard',
+            unique_together={('tour', 'language')},
+        ),
+    ]
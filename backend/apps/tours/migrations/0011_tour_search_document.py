@@ -0,0 +1,39 @@
+# Full-text search documents (PostgreSQL only), see apps/tours/search.py
+
+from django.db import migrations
+
+LANGUAGES = ['en', 'es', 'pt']
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    vectors = ', '.join(f'vector_{language} tsvector NOT NULL' for language in LANGUAGES)
+    schema_editor.execute(
+        'CREATE TABLE tours_search_document ('
+        'tour_id bigint PRIMARY KEY REFERENCES tours_tour (id) '
+        'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+        f'{vectors}, '
+        'updated_at timestamp with time zone NOT NULL DEFAULT now())'
+    )
+    for language in LANGUAGES:
+        schema_editor.execute(
+            f'CREATE INDEX tours_search_document_{language}_gin '
+            f'ON tours_search_document USING gin (vector_{language})'
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS tours_search_document')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0010_tourcard'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0011_tour_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourPriceCalendar',
+            fields=[
+                ('tour', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='price_calendar', serialize=False, to='tours.tour')),
+                ('built_at', models.DateTimeField()),
+                ('valid_until', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Tour Price Calendar',
+                'verbose_name_plural': 'Tour Price Calendars',
+            },
+        ),
+        migrations.CreateModel(
+            name='TourPriceDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('original_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount_percentage', models.PositiveSmallIntegerField(default=0)),
+                ('is_early_booking', models.BooleanField(default=False)),
+                ('is_available', models.BooleanField(default=True)),
+                ('departure', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tours.tourdeparture')),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_days', to='tours.tour')),
+            ],
+            options={
+                'verbose_name': 'Tour Price Day',
+                'verbose_name_plural': 'Tour Price Days',
+                'ordering': ['tour', 'date'],
+                'unique_together': {('tour', 'date')},
+            },
+        ),
+    ]
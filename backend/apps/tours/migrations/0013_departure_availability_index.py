@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0012_tour_price_calendar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tourdeparture',
+            index=models.Index(fields=['departure_date', 'status', 'available_spots', 'tour'], name='tours_tourd_departu_beb942_idx'),
+        ),
+    ]
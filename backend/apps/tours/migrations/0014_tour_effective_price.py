@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:35
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def populate_effective_prices(apps, schema_editor):
+    # Start from the undiscounted price; marking every tour due makes the
+    # first listing request (or refresh_effective_prices) apply the discounts
+    Tour = apps.get_model('tours', 'Tour')
+    Tour.objects.update(effective_price=F('price'), effective_price_until=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0013_departure_availability_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Price less the discount or early booking offer open now', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='tour',
+            name='effective_price_until',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When a discount or offer window next opens or closes', null=True),
+        ),
+        migrations.RunPython(populate_effective_prices, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['is_published', 'effective_price'], name='tours_tour_is_publ_9aee87_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['effective_price_until'], name='tours_tour_effecti_804127_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_neighbors(apps, schema_editor):
+    from apps.tours.neighbors import neighbor_links, published_catalog
+
+    Tour = apps.get_model('tours', 'Tour')
+    TourNeighbor = apps.get_model('tours', 'TourNeighbor')
+    TourNeighbor.objects.bulk_create([
+        TourNeighbor(tour_id=tour_pk, neighbor_id=neighbour_pk, rank=rank, score=score)
+        for tour_pk, neighbour_pk, rank, score in neighbor_links(*published_catalog(Tour))
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0014_tour_effective_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='tours.tour')),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='tours.tour')),
+            ],
+            options={
+                'verbose_name': 'Tour Neighbor',
+                'verbose_name_plural': 'Tour Neighbors',
+                'ordering': ['tour', 'rank'],
+                'unique_together': {('tour', 'rank')},
+            },
+        ),
+        migrations.RunPython(build_neighbors, migrations.RunPython.noop),
+    ]
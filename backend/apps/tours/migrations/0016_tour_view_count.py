@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0015_tour_neighbors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Detail page views (buffered by apps.core.view_counters)'),
+        ),
+    ]
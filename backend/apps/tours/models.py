@@ -19,6 +19,9 @@ class TourCategory(TimeStampedModel, SluggedModel, SortableModel):
     image = models.ImageField(upload_to='tours/categories/', null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
+    # Counter cache (maintained by apps.core.counters)
+    tour_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Tour Category'
         verbose_name_plural = 'Tour Categories'
@@ -43,6 +46,9 @@ class TourType(TimeStampedModel, SluggedModel, SortableModel):
     icon = models.CharField(max_length=50, blank=True, help_text='Icon class name')
     is_active = models.BooleanField(default=True)
 
+    # Counter cache (maintained by apps.core.counters)
+    tour_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Tour Type'
         verbose_name_plural = 'Tour Types'
@@ -121,6 +127,15 @@ class Tour(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
         'Discount End Date', null=True, blank=True,
         help_text='When the discount offer ends'
     )
+    # Maintained by apps.tours.effective_prices for price filters and sorting
+    effective_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False,
+        help_text='Price less the discount or early booking offer open now'
+    )
+    effective_price_until = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        help_text='When a discount or offer window next opens or closes'
+    )
 
     # Rating
     average_rating = models.DecimalField(
@@ -128,6 +143,10 @@ class Tour(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
     review_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text='Detail page views (buffered by apps.core.view_counters)'
+    )
 
     # Difficulty/Physical
     difficulty_level = models.CharField(
@@ -148,6 +167,10 @@ class Tour(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
         verbose_name = 'Tour'
         verbose_name_plural = 'Tours'
         ordering = ['-is_featured', '-created_at']
+        indexes = [
+            models.Index(fields=['is_published', 'effective_price']),
+            models.Index(fields=['effective_price_until']),
+        ]
 
     def __str__(self):
         return self.name
@@ -163,9 +186,9 @@ class Tour(TimeStampedModel, SluggedModel, SEOModel, PublishableModel):
 
     @property
     def discounted_price(self):
-        if self.has_discount and self.discount_percentage:
-            return self.price * (100 - self.discount_percentage) / 100
-        return self.price
+        """The price less the discount, while its discount window is open."""
+        from .pricing import discounted_price
+        return discounted_price(self)
 
 
 class TourImage(TimeStampedModel, SortableModel):
@@ -308,6 +331,10 @@ class TourDeparture(TimeStampedModel):
         verbose_name = 'Tour Departure'
         verbose_name_plural = 'Tour Departures'
         ordering = ['departure_date']
+        indexes = [
+            # Availability search across tours (apps.tours.filters)
+            models.Index(fields=['departure_date', 'status', 'available_spots', 'tour']),
+        ]
 
     def __str__(self):
         return f"{self.tour.name} - {self.departure_date}"
@@ -495,3 +522,116 @@ class EarlyBookingOffer(TimeStampedModel):
         return int(delta.total_seconds() % 60)
 
 
+
+
+class TourCard(models.Model):
+    """
+    Denormalized tour listing card, one row per published tour and language.
+
+    Stores the TourListSerializer output so listing endpoints read a single
+    table instead of rebuilding each card from Tour and its relations. The
+    early booking fields are time dependent and are added at read time.
+    Rows are maintained by apps.tours.cards.
+    """
+
+    tour = models.ForeignKey(Tour, on_delete=models.CASCADE, related_name='cards')
+    language = models.CharField(max_length=5)
+    data = models.JSONField()
+
+    # Copied from the tour for ordering and filtering cards
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    is_featured = models.BooleanField(default=False)
+    is_best_seller = models.BooleanField(default=False)
+    is_multi_destination = models.BooleanField(default=False)
+    tour_created_at = models.DateTimeField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Tour Card'
+        verbose_name_plural = 'Tour Cards'
+        ordering = ['-is_featured', '-tour_created_at']
+        unique_together = [('tour', 'language')]
+        indexes = [
+            models.Index(fields=['language', 'is_featured', 'tour_created_at']),
+            models.Index(fields=['language', 'is_best_seller', 'tour_created_at']),
+            models.Index(fields=['language', 'is_multi_destination', 'tour_created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.tour_id} ({self.language})"
+
+
+class TourPriceCalendar(models.Model):
+    """
+    Build state of a tour's price calendar (its TourPriceDay rows).
+
+    Prices depend on the booking date (discount and offer windows, minimum
+    advance days), so a calendar is only valid until the next such boundary
+    and is rebuilt on the first request after it. Maintained by
+    apps.tours.price_calendar.
+    """
+
+    tour = models.OneToOneField(
+        Tour, on_delete=models.CASCADE, primary_key=True, related_name='price_calendar'
+    )
+    built_at = models.DateTimeField()
+    valid_until = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Tour Price Calendar'
+        verbose_name_plural = 'Tour Price Calendars'
+
+    def __str__(self):
+        return f"{self.tour_id} (valid until {self.valid_until})"
+
+
+class TourPriceDay(models.Model):
+    """
+    Precomputed cheapest per-person price of a tour for one travel date.
+
+    Tours with scheduled departures get a row per departure date, other
+    tours a row per day. Rows are maintained by apps.tours.price_calendar.
+    """
+
+    tour = models.ForeignKey(Tour, on_delete=models.CASCADE, related_name='price_days')
+    date = models.DateField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    original_price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_percentage = models.PositiveSmallIntegerField(default=0)
+    is_early_booking = models.BooleanField(default=False)
+    departure = models.ForeignKey(
+        TourDeparture, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    is_available = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = 'Tour Price Day'
+        verbose_name_plural = 'Tour Price Days'
+        ordering = ['tour', 'date']
+        unique_together = [('tour', 'date')]
+
+    def __str__(self):
+        return f"{self.tour_id} {self.date}: {self.price}"
+
+
+class TourNeighbor(models.Model):
+    """
+    A precomputed related tour: one of the `rank`-th most similar published
+    tours by destinations, category, type, difficulty, duration and price.
+    Rows are maintained by apps.tours.neighbors.
+    """
+
+    tour = models.ForeignKey(Tour, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Tour, on_delete=models.CASCADE, related_name='neighbor_of')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        verbose_name = 'Tour Neighbor'
+        verbose_name_plural = 'Tour Neighbors'
+        ordering = ['tour', 'rank']
+        unique_together = [('tour', 'rank')]
+
+    def __str__(self):
+        return f"{self.tour_id} -> {self.neighbor_id} (#{self.rank})"
@@ -0,0 +1,248 @@
+"""
+Related tours read model.
+
+Every published tour is encoded as a feature vector and its
+TOUR_NEIGHBORS most similar published tours are stored as TourNeighbor
+rows, so the related tours endpoint is one indexed lookup.
+
+The similarity of two tours is a weighted sum (WEIGHTS) of:
+
+- destinations: the cosine of their destination sets,
+- category, tour type and difficulty: 1 when they are the same,
+- duration and price band: exp(-(log ratio / scale)^2 / 2), near 1 for
+  similar lengths and prices and falling off as they drift apart,
+
+plus a small preference for well-rated neighbours (rating / 5).
+
+The destination and categorical parts are one weighted one-hot matrix, so
+they come out of a single matrix product; the whole catalog is scored in
+blocks of rows against every tour with NumPy, which takes a few seconds for
+10,000 tours (`manage.py rebuild_tour_neighbors --benchmark 10000`).
+
+Migration 0015 computes the first lists. Signals update them when the
+transaction commits: the changed tour's own, those that held it, those
+with fewer than TOUR_NEIGHBORS entries and those whose last entry scores
+below the changed tour. A changed tour thus enters or leaves every list it
+belongs to without a full rebuild. Scores of other pairs only move on the
+next full rebuild (the rebuild_tour_neighbors command or Celery task),
+which is rarely needed.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+
+from apps.core.batching import OnCommitBatch
+from apps.core.conditional import bump_versions
+from .models import Tour, TourNeighbor
+
+WEIGHTS = {
+    'destination': 3.0,
+    'category': 1.5,
+    'tour_type': 1.0,
+    'difficulty': 0.5,
+    'duration': 1.0,
+    'price': 1.0,
+    'rating': 0.3,
+}
+# Log ratios at which duration and price similarity fall to exp(-1/2):
+# about 1.5 times the days and 1.65 times the price
+DURATION_SCALE = 0.4
+PRICE_SCALE = 0.5
+
+# Tours scored per matrix product (rows x all tours floats at a time)
+BLOCK_ROWS = 1024
+
+TOUR_COLUMNS = ['pk', 'category_id', 'tour_type_id', 'difficulty_level', 'days', 'price', 'average_rating']
+
+
+def _one_hot(values, weight):
+    """Rows with sqrt(weight) in the column of their value (no column for None)."""
+    keys = sorted({value for value in values if value is not None}, key=str)
+    column = {key: index for index, key in enumerate(keys)}
+    matrix = np.zeros((len(values), len(keys)), dtype=np.float32)
+    rows = [row for row, value in enumerate(values) if value is not None]
+    matrix[rows, [column[values[row]] for row in rows]] = np.sqrt(weight)
+    return matrix
+
+
+def encode_tours(tours, destinations):
+    """
+    Feature arrays of tours given as TOUR_COLUMNS tuples, with `destinations`
+    {tour pk: [destination ids]}.
+
+    Returns (pks, categorical, log_days, log_price, rating): the dot product
+    of two rows of `categorical` is their weighted destination, category,
+    tour type and difficulty similarity.
+    """
+    pks = np.array([tour[0] for tour in tours], dtype=np.int64)
+
+    destination_ids = sorted({pk for ids in destinations.values() for pk in ids})
+    column = {pk: index for index, pk in enumerate(destination_ids)}
+    places = np.zeros((len(tours), len(destination_ids)), dtype=np.float32)
+    for row, tour in enumerate(tours):
+        for pk in destinations.get(tour[0], ()):
+            places[row, column[pk]] = 1
+    norms = np.linalg.norm(places, axis=1, keepdims=True)
+    places = places / np.where(norms > 0, norms, 1) * np.sqrt(WEIGHTS['destination'])
+
+    categorical = np.hstack([
+        places,
+        _one_hot([tour[1] for tour in tours], WEIGHTS['category']),
+        _one_hot([tour[2] for tour in tours], WEIGHTS['tour_type']),
+        _one_hot([tour[3] for tour in tours], WEIGHTS['difficulty']),
+    ])
+    log_days = np.log(np.array([max(tour[4], 1) for tour in tours], dtype=np.float32))
+    log_price = np.log(np.array([max(float(tour[5]), 1) for tour in tours], dtype=np.float32))
+    rating = np.array([float(tour[6]) for tour in tours], dtype=np.float32) / 5
+    return pks, categorical, log_days, log_price, rating
+
+
+def _closeness(values, block, scale):
+    """exp(-((a - b) / scale)^2 / 2) between the block's values and all values."""
+    distance = (values[block][:, None] - values[None, :]) / scale
+    return np.exp(-0.5 * distance * distance)
+
+
+def pair_similarity(categorical, log_days, log_price, block):
+    """Symmetric similarity of the tours at indexes `block` to every tour (without the rating preference)."""
+    similarity = categorical[block] @ categorical.T
+    similarity += WEIGHTS['duration'] * _closeness(log_days, block, DURATION_SCALE)
+    similarity += WEIGHTS['price'] * _closeness(log_price, block, PRICE_SCALE)
+    return similarity
+
+
+def compute_neighbors(categorical, log_days, log_price, rating, k, rows=None):
+    """
+    The k most similar tours of each row in `rows` (every tour when None).
+
+    Returns (rows, neighbours, scores): neighbours and scores are
+    len(rows) x k arrays of tour indexes and similarities, best first.
+    """
+    count = len(categorical)
+    rows = np.arange(count) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = min(k, count - 1)
+    neighbours = np.zeros((len(rows), max(k, 0)), dtype=np.int64)
+    scores = np.zeros((len(rows), max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return rows, neighbours, scores
+
+    preference = WEIGHTS['rating'] * rating
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block = rows[start:start + BLOCK_ROWS]
+        similarity = pair_similarity(categorical, log_days, log_price, block)
+        similarity += preference[None, :]
+        similarity[np.arange(len(block)), block] = -np.inf
+
+        best = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        neighbours[start:start + len(block)] = np.take_along_axis(best, order, axis=1)
+        scores[start:start + len(block)] = np.take_along_axis(best_scores, order, axis=1)
+    return rows, neighbours, scores
+
+
+def _affected_rows(tour_ids, pks, categorical, log_days, log_price, rating, k):
+    """
+    Indexes of the published tours whose lists may change with the given
+    (changed, unpublished or deleted) tours.
+    """
+    affected = set(tour_ids)
+    # Lists that held them
+    affected.update(TourNeighbor.objects.filter(neighbor_id__in=tour_ids).values_list('tour_id', flat=True))
+
+    # Lists cut short (e.g. by a deleted neighbour) and lists a changed tour now ranks in
+    last_scores = {
+        tour_id: score for tour_id, entries, score in TourNeighbor.objects.values_list('tour_id').annotate(
+            entries=Count('pk'), last=Min('score')
+        ).values_list('tour_id', 'entries', 'last') if entries >= k
+    }
+    threshold = np.array([last_scores.get(pk, -np.inf) for pk in pks.tolist()], dtype=np.float32)
+    entering = threshold == -np.inf
+    changed = np.flatnonzero(np.isin(pks, list(tour_ids)))
+    if len(changed):
+        # The score tour t gives changed tour x: similarity plus x's rating preference
+        scores = pair_similarity(categorical, log_days, log_price, changed)
+        scores += WEIGHTS['rating'] * rating[changed][:, None]
+        scores[np.arange(len(changed)), changed] = -np.inf
+        entering |= (scores > threshold[None, :]).any(axis=0)
+    affected.update(pks[entering].tolist())
+    return [row for row, pk in enumerate(pks.tolist()) if pk in affected]
+
+
+def published_catalog(tour_model=Tour):
+    """
+    TOUR_COLUMNS tuples of the published tours, by pk, and {tour pk:
+    [destination ids]}. Takes the historical Tour model in migrations.
+    """
+    tours = list(tour_model.objects.filter(is_published=True).order_by('pk').values_list(*TOUR_COLUMNS))
+    destinations = {}
+    for tour_id, destination_id in tour_model.destinations.through.objects.filter(
+        tour__is_published=True
+    ).values_list('tour_id', 'destination_id'):
+        destinations.setdefault(tour_id, []).append(destination_id)
+    return tours, destinations
+
+
+def _links(pks, rows, neighbours, scores):
+    """(tour pk, neighbour pk, rank, score) of the computed lists."""
+    tour_pks, neighbour_pks = pks[rows].tolist(), pks[neighbours].tolist()
+    return [
+        (tour_pk, neighbour_pk, rank, score)
+        for tour_pk, row_neighbours, row_scores in zip(tour_pks, neighbour_pks, scores.tolist())
+        for rank, (neighbour_pk, score) in enumerate(zip(row_neighbours, row_scores), start=1)
+    ]
+
+
+def neighbor_links(tours, destinations):
+    """(tour pk, neighbour pk, rank, score) of every list, from published_catalog()."""
+    if not tours:
+        return []
+    pks, categorical, log_days, log_price, rating = encode_tours(tours, destinations)
+    rows, neighbours, scores = compute_neighbors(
+        categorical, log_days, log_price, rating, settings.TOUR_NEIGHBORS
+    )
+    return _links(pks, rows, neighbours, scores)
+
+
+def rebuild_tour_neighbors(tour_ids=None):
+    """
+    Recompute the neighbours of every published tour (tour_ids=None), or
+    update the lists affected by the given changed tours. Unpublished or
+    deleted tours simply lose their neighbours. Returns the number of lists
+    computed.
+    """
+    tours, destinations = published_catalog()
+
+    stale = TourNeighbor.objects.all()
+    rows = None
+    links = []
+    if tours:
+        pks, categorical, log_days, log_price, rating = encode_tours(tours, destinations)
+        if tour_ids is not None:
+            k = min(settings.TOUR_NEIGHBORS, len(tours) - 1)
+            rows = _affected_rows(set(tour_ids), pks, categorical, log_days, log_price, rating, k)
+            stale = stale.filter(tour_id__in=set(tour_ids) | set(pks[rows].tolist()))
+        rows, neighbours, scores = compute_neighbors(
+            categorical, log_days, log_price, rating, settings.TOUR_NEIGHBORS, rows
+        )
+        links = [
+            TourNeighbor(tour_id=tour_pk, neighbor_id=neighbour_pk, rank=rank, score=score)
+            for tour_pk, neighbour_pk, rank, score in _links(pks, rows, neighbours, scores)
+        ]
+    elif tour_ids is not None:
+        stale = stale.filter(tour_id__in=tour_ids)
+
+    with transaction.atomic():
+        stale.delete()
+        TourNeighbor.objects.bulk_create(links, batch_size=5000)
+    bump_versions([TourNeighbor])
+    return len(tours) if rows is None else len(rows)
+
+
+_rebuild_batch = OnCommitBatch(rebuild_tour_neighbors)
+
+
+def schedule_neighbor_rebuild(tour_ids):
+    """Update the related tours affected by the given tours once the current transaction commits."""
+    _rebuild_batch.add(tour_ids)
@@ -0,0 +1,64 @@
+"""
+Early booking offer resolution for tours.
+
+Resolves the best currently active EarlyBookingOffer for tours in bulk, so
+tour listings do not query the offers table once per card and per field.
+"""
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from .models import EarlyBookingOffer
+
+# Attribute the prefetched active offers are stored under on each Tour
+ACTIVE_OFFERS_ATTR = 'active_early_booking_offers'
+
+
+def active_offers(now=None):
+    """Currently active early booking offers, best discount first."""
+    now = now or timezone.now()
+    return EarlyBookingOffer.objects.filter(
+        is_active=True,
+        offer_start_date__lte=now,
+        offer_end_date__gte=now
+    ).order_by('-discount_percentage')
+
+
+def prefetch_active_offers(now=None):
+    """
+    Prefetch the active offers of every tour in a queryset with one query.
+
+    Usage:
+        Tour.objects.filter(...).prefetch_related(prefetch_active_offers())
+    """
+    return Prefetch(
+        'early_booking_offers',
+        queryset=active_offers(now),
+        to_attr=ACTIVE_OFFERS_ATTR
+    )
+
+
+def get_best_offer(tour):
+    """
+    Return the best active early booking offer for a tour, or None.
+
+    Uses the prefetched offers when available. Otherwise the offer is
+    queried once and remembered on the instance.
+    """
+    offers = getattr(tour, ACTIVE_OFFERS_ATTR, None)
+    if offers is None:
+        offers = list(active_offers().filter(tours=tour)[:1])
+        setattr(tour, ACTIVE_OFFERS_ATTR, offers)
+    return offers[0] if offers else None
+
+
+def get_best_offers(tour_ids, now=None):
+    """
+    Return {tour_id: best active offer} for the given tours with one query.
+
+    Tours without an active offer are left out of the result.
+    """
+    offers = active_offers(now).filter(tours__in=tour_ids).annotate(offer_tour_id=F('tours'))
+    best = {}
+    for offer in offers:
+        best.setdefault(offer.offer_tour_id, offer)
+    return best
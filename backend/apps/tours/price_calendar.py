@@ -0,0 +1,354 @@
+"""
+Tour price calendar read model.
+
+Precomputes the cheapest per-person price of every published tour for each
+travel date in the next PRICE_CALENDAR_DAYS days (TourPriceDay rows).
+
+For a travel date the price is:
+
+- the departure's own price on a departure date, otherwise
+- the cheapest TourPricing season covering the date, otherwise
+- Tour.price,
+
+less the larger of the tour discount (when its discount window contains
+the booking time) and the best early booking offer that is open now and
+covers the date (travel window and min_days_advance). Discounts don't
+stack. Amounts are computed in integer cents, rounded half up.
+
+Tours with scheduled departures only get rows on their departure dates
+(sold out departures are kept as unavailable). Other tours get a row for
+every day.
+
+The whole catalog is evaluated at once as (tour x day) NumPy arrays, so a
+full rebuild takes one query per input table and a batched insert. Signals
+rebuild the affected tours when their inputs change. Calendars also expire
+at the next booking-time boundary (midnight, a discount or offer window
+opening or closing) and are rebuilt on the first request after it, so no
+scheduled job is needed to keep them correct. A rebuild records each
+tour's valid_until in the cache as well, and requests only trust that
+marker: a missing or passed one means expired. A rebuild after a change
+that fails deletes the markers first, which needs no database, so the
+calendars are rebuilt on the next request even when the database is locked.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.batching import OnCommitBatch
+from apps.core.caching import CacheLock
+from apps.core.conditional import bump_versions, child_tag
+from .models import EarlyBookingOffer, Tour, TourDeparture, TourPriceCalendar, TourPriceDay, TourPricing
+
+logger = logging.getLogger(__name__)
+
+# Departures shown in the calendar, and those that can be booked
+CALENDAR_STATUSES = ['available', 'limited', 'sold_out']
+AVAILABLE_STATUSES = ['available', 'limited']
+
+NO_PRICE = np.iinfo(np.int64).max
+
+# Cached valid_until of a tour's calendar
+VALID_UNTIL_KEY = 'price_calendar:valid_until:{}'
+
+# TourPriceDay columns, in the order compute_price_days() returns them
+PRICE_DAY_COLUMNS = [
+    'tour_id', 'date', 'price', 'original_price', 'discount_percentage',
+    'is_early_booking', 'departure_id', 'is_available',
+]
+
+
+def _cents(amount):
+    return int(amount * 100)
+
+
+def _amount(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def _offsets(dates, today):
+    return np.array([(date - today).days for date in dates], dtype=np.int64)
+
+
+def _window_contains(start, end, now):
+    return (start is None or start <= now) and (end is None or now <= end)
+
+
+def compute_price_days(tour_ids, now):
+    """
+    Evaluate the calendars of the given tours.
+
+    Returns (rows of PRICE_DAY_COLUMNS values, {tour_id: valid_until}).
+    """
+    today = timezone.localdate(now)
+    days = np.arange(getattr(settings, 'PRICE_CALENDAR_DAYS', 365), dtype=np.int64)
+    last_day = today + timedelta(days=int(days[-1]))
+
+    tours = list(Tour.objects.filter(pk__in=tour_ids).values_list(
+        'pk', 'price', 'has_discount', 'discount_percentage', 'discount_start_date', 'discount_end_date'
+    ))
+    if not tours:
+        return [], {}
+    row = {pk: index for index, (pk, *rest) in enumerate(tours)}
+    tour_pks = [pk for pk, *rest in tours]
+
+    # Base price: the tour price, replaced by the cheapest season covering the day
+    tour_prices = np.array([_cents(price) for pk, price, *rest in tours], dtype=np.int64)
+    base = np.repeat(tour_prices[:, None], len(days), axis=1)
+    seasons = list(TourPricing.objects.filter(
+        tour_id__in=tour_pks, end_date__gte=today, start_date__lte=last_day
+    ).values_list('tour_id', 'start_date', 'end_date', 'price_per_person'))
+    if seasons:
+        season_rows = np.array([row[tour_id] for tour_id, *rest in seasons])
+        starts = _offsets([start for tour_id, start, end, price in seasons], today)
+        ends = _offsets([end for tour_id, start, end, price in seasons], today)
+        prices = np.array([_cents(price) for *rest, price in seasons], dtype=np.int64)
+        covered = (days >= starts[:, None]) & (days <= ends[:, None])
+        season_price = np.full(base.shape, NO_PRICE, dtype=np.int64)
+        np.minimum.at(season_price, season_rows, np.where(covered, prices[:, None], NO_PRICE))
+        base = np.where(season_price < NO_PRICE, season_price, base)
+
+    # Departure dates: the cheapest available departure of the day, else the cheapest sold out one
+    original = base.copy()
+    included = np.zeros(base.shape, dtype=bool)
+    available = np.zeros(base.shape, dtype=bool)
+    departure_ids = np.zeros(base.shape, dtype=np.int64)
+
+    scheduled = set(TourDeparture.objects.filter(
+        tour_id__in=tour_pks, status__in=CALENDAR_STATUSES
+    ).values_list('tour_id', flat=True).distinct())
+    departures = list(TourDeparture.objects.filter(
+        tour_id__in=scheduled, status__in=CALENDAR_STATUSES,
+        departure_date__gte=today, departure_date__lte=last_day,
+    ).values_list('pk', 'tour_id', 'departure_date', 'price', 'status'))
+    if departures:
+        ids = np.array([pk for pk, *rest in departures], dtype=np.int64)
+        tour_rows = np.array([row[tour_id] for pk, tour_id, *rest in departures])
+        offsets = _offsets([date for pk, tour_id, date, *rest in departures], today)
+        prices = np.array([
+            _cents(price) if price is not None else -1 for pk, tour_id, date, price, status in departures
+        ], dtype=np.int64)
+        prices = np.where(prices >= 0, prices, base[tour_rows, offsets])
+        bookable = np.array([status in AVAILABLE_STATUSES for *rest, status in departures])
+
+        cells = tour_rows * len(days) + offsets
+        order = np.lexsort((prices, ~bookable, cells))
+        cells, first = np.unique(cells[order], return_index=True)
+        chosen = order[first]
+        tour_rows, offsets = tour_rows[chosen], offsets[chosen]
+        included[tour_rows, offsets] = True
+        available[tour_rows, offsets] = bookable[chosen]
+        original[tour_rows, offsets] = prices[chosen]
+        departure_ids[tour_rows, offsets] = ids[chosen]
+
+    unscheduled = np.array([pk not in scheduled for pk in tour_pks])
+    included[unscheduled] = True
+    available[unscheduled] = True
+
+    # Discounts open at booking time `now`
+    tour_discount = np.array([
+        percentage if has_discount and _window_contains(start, end, now) else 0
+        for pk, price, has_discount, percentage, start, end in tours
+    ], dtype=np.int64)
+    offer_pairs = list(EarlyBookingOffer.objects.filter(
+        is_active=True, offer_start_date__lte=now, offer_end_date__gte=now, tours__in=tour_pks
+    ).values_list('tours', 'discount_percentage', 'travel_start_date', 'travel_end_date', 'min_days_advance'))
+    early_booking = np.zeros(base.shape, dtype=np.int64)
+    if offer_pairs:
+        offer_rows = np.array([row[tour_id] for tour_id, *rest in offer_pairs])
+        percentages = np.array([percentage for tour_id, percentage, *rest in offer_pairs], dtype=np.int64)
+        starts = np.maximum(
+            _offsets([start for tour_id, percentage, start, end, advance in offer_pairs], today),
+            np.array([advance for *rest, advance in offer_pairs], dtype=np.int64),
+        )
+        ends = _offsets([end for tour_id, percentage, start, end, advance in offer_pairs], today)
+        covered = (days >= starts[:, None]) & (days <= ends[:, None])
+        np.maximum.at(early_booking, offer_rows, np.where(covered, percentages[:, None], 0))
+
+    discount = np.maximum(tour_discount[:, None], early_booking)
+    price = (original * (100 - discount) + 50) // 100
+    is_early_booking = early_booking > tour_discount[:, None]
+
+    # Convert whole columns at once; indexing arrays per element is slow
+    cells = np.nonzero(included)
+    dates = [today + timedelta(days=d) for d in range(len(days))]
+    rows = [
+        (
+            tour_pks[t], dates[d], _amount(amount), _amount(original_amount), percentage,
+            early, departure_id or None, bookable,
+        )
+        for t, d, amount, original_amount, percentage, early, departure_id, bookable in zip(
+            *(column.tolist() for column in (
+                *cells, price[cells], original[cells], discount[cells],
+                is_early_booking[cells], departure_ids[cells], available[cells],
+            ))
+        )
+    ]
+    return rows, _valid_until(tours, now)
+
+
+def _valid_until(tours, now):
+    """The next booking-time boundary of each tour's prices."""
+    tomorrow = timezone.localdate(now) + timedelta(days=1)
+    midnight = timezone.make_aware(datetime.combine(tomorrow, time.min))
+    boundaries = {pk: [midnight] for pk, *rest in tours}
+
+    for pk, price, has_discount, percentage, start, end in tours:
+        if has_discount:
+            boundaries[pk].extend(moment for moment in (start, end) if moment and moment > now)
+    offers = EarlyBookingOffer.objects.filter(
+        is_active=True, offer_end_date__gt=now, tours__in=list(boundaries)
+    ).values_list('tours', 'offer_start_date', 'offer_end_date')
+    for tour_id, start, end in offers:
+        boundaries[tour_id].extend(moment for moment in (start, end) if moment > now)
+
+    return {pk: min(moments) for pk, moments in boundaries.items()}
+
+
+def rebuild_price_calendar(tour_ids=None, now=None):
+    """
+    Rebuild the price calendars of the given tours (all tours when None).
+
+    Unpublished or deleted tours simply lose their calendar.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Serialize concurrent rebuilds of the same tours
+        tours = Tour.objects.select_for_update().filter(is_published=True)
+        stale_days, stale_states = TourPriceDay.objects.all(), TourPriceCalendar.objects.all()
+        if tour_ids is not None:
+            tour_ids = list(tour_ids)
+            tours = tours.filter(pk__in=tour_ids)
+            stale_days = stale_days.filter(tour_id__in=tour_ids)
+            stale_states = stale_states.filter(tour_id__in=tour_ids)
+        published = list(tours.values_list('pk', flat=True))
+
+        rows, valid_until = compute_price_days(published, now)
+        stale_days.delete()
+        stale_states.delete()
+        _insert_price_days(rows)
+        TourPriceCalendar.objects.bulk_create([
+            TourPriceCalendar(tour_id=pk, built_at=now, valid_until=moment)
+            for pk, moment in valid_until.items()
+        ])
+
+    changed = published if tour_ids is None else tour_ids
+    cache.set_many({VALID_UNTIL_KEY.format(pk): moment for pk, moment in valid_until.items()}, None)
+    cache.delete_many([VALID_UNTIL_KEY.format(pk) for pk in changed if pk not in valid_until])
+    bump_versions([TourPriceDay] + [child_tag(TourPriceDay, Tour, pk) for pk in changed])
+    return len(published)
+
+
+def _insert_price_days(rows):
+    """Insert TourPriceDay rows with executemany (model instances cost more than the evaluation)."""
+    ops = connection.ops
+    table = TourPriceDay._meta.db_table
+    sql = (
+        f"INSERT INTO {table} ({', '.join(PRICE_DAY_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(PRICE_DAY_COLUMNS))})"
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), 5000):
+            cursor.executemany(sql, [
+                (
+                    tour_id, ops.adapt_datefield_value(date),
+                    ops.adapt_decimalfield_value(price, 10, 2),
+                    ops.adapt_decimalfield_value(original_price, 10, 2),
+                    discount, early, departure_id, bookable,
+                )
+                for tour_id, date, price, original_price, discount, early, departure_id, bookable
+                in rows[start:start + 5000]
+            ])
+
+
+def rebuild_or_expire_price_calendar(tour_ids):
+    """
+    Rebuild the price calendars of the given tours after a change, or when
+    that fails (e.g. the database is locked), expire them so the next
+    request rebuilds them instead of serving the outdated rows.
+    """
+    tour_ids = list(tour_ids)
+    try:
+        rebuild_price_calendar(tour_ids)
+    except Exception:
+        # The cache markers first: the other steps need the database that just failed
+        cache.delete_many([VALID_UNTIL_KEY.format(pk) for pk in tour_ids])
+        try:
+            bump_versions([TourPriceDay] + [child_tag(TourPriceDay, Tour, pk) for pk in tour_ids])
+            TourPriceCalendar.objects.filter(tour_id__in=tour_ids).update(valid_until=timezone.now())
+        except Exception:
+            logger.exception(f"Could not expire the price calendars of tours {tour_ids}")
+        raise
+
+
+_rebuild_batch = OnCommitBatch(rebuild_or_expire_price_calendar)
+
+
+def schedule_calendar_rebuild(tour_ids):
+    """Rebuild the price calendars of the given tours once the current transaction commits."""
+    _rebuild_batch.add(tour_ids)
+
+
+def ensure_price_calendar(tour_id, now=None):
+    """
+    Rebuild a tour's calendar if it was never built or has expired: its
+    cached valid_until is missing (expired by a failed rebuild, or evicted)
+    or has passed.
+    """
+    now = now or timezone.now()
+    valid_until = cache.get(VALID_UNTIL_KEY.format(tour_id))
+    if valid_until is not None and valid_until > now:
+        return
+    # Concurrent requests serve the current rows while one rebuilds
+    with CacheLock(f'price_calendar:{tour_id}') as acquired:
+        if acquired:
+            rebuild_price_calendar([tour_id], now)
+
+
+def get_price_calendar(tour, start=None, end=None, now=None):
+    """
+    The calendar of a tour: its cheapest bookable price overall and per
+    month, and the days between `start` and `end` (all days when None).
+    """
+    now = now or timezone.now()
+    ensure_price_calendar(tour.pk, now)
+    rows = TourPriceDay.objects.filter(tour=tour, date__gte=timezone.localdate(now)).order_by('date')
+
+    days, months, cheapest = [], {}, None
+    for day in rows.values(
+        'date', 'price', 'original_price', 'discount_percentage', 'is_early_booking',
+        'departure_id', 'is_available',
+    ):
+        date, price = day['date'], day['price']
+        if (start is None or date >= start) and (end is None or date <= end):
+            days.append(dict(
+                day, date=date.isoformat(), price=str(price), original_price=str(day['original_price'])
+            ))
+        if not day['is_available']:
+            continue
+        month = date.strftime('%Y-%m')
+        if month not in months or price < months[month][1]:
+            months[month] = (date, price)
+        if cheapest is None or price < cheapest[1]:
+            cheapest = (date, price)
+
+    return {
+        'id': tour.pk,
+        'slug': tour.slug,
+        'currency': tour.currency,
+        'cheapest': _cheapest(cheapest),
+        'months': [{'month': month, **_cheapest(best)} for month, best in months.items()],
+        'days': days,
+    }
+
+
+def _cheapest(best):
+    if best is None:
+        return None
+    date, price = best
+    return {'date': date.isoformat(), 'price': str(price)}
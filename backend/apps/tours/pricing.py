@@ -0,0 +1,271 @@
+"""
+Tour pricing engine.
+
+The one place tour prices are worked out. For a travel date the
+per-person price is:
+
+- the departure's own price on a departure date, otherwise
+- the cheapest TourPricing season covering the date, otherwise
+- Tour.price,
+
+less the larger of the tour discount (when its discount window contains
+the booking time) and the best early booking offer that is open now and
+covers the date (travel window and min_days_advance). Discounts don't
+stack. Children pay Tour.child_price when set (otherwise the adult price)
+less the same discount, infants travel free, and travelers in single
+rooms add the season's single supplement (else the tour's), undiscounted.
+
+All amounts are Decimals rounded half up to cents once per person.
+
+Tours with scheduled departures are only priced on their departure dates;
+without a given departure the cheapest bookable one of the day is used
+(the cheapest sold out one when all are). apps.tours.price_calendar is the
+vectorized form of the same rules for whole date ranges, and
+test_price_calendar.py checks it against this module.
+
+Batch use loads the rules of many tours in five queries:
+
+    rules = PriceRules.load(tour_ids)
+    quotes = {tour_id: rules.quote(tour_id, date, adults=2, children=1) for tour_id in tour_ids}
+
+Listings without a travel date use discounted_price() and
+early_booking_price(), which work on already loaded tours and offers, and
+sort and filter on the listing price of listing_prices() stored in
+Tour.effective_price (apps.tours.effective_prices).
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
+from .models import EarlyBookingOffer, Tour, TourDeparture, TourPricing
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+# Departures that are priced, and those that can be booked
+PRICED_STATUSES = ['available', 'limited', 'sold_out']
+BOOKABLE_STATUSES = ['available', 'limited']
+
+
+def apply_discount(price, percentage):
+    """`price` less `percentage` percent, rounded half up to cents."""
+    if not percentage:
+        return Decimal(price).quantize(CENT)
+    return (Decimal(price) * (100 - percentage) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def window_contains(start, end, moment):
+    """Whether an optional [start, end] window contains `moment`."""
+    return (start is None or start <= moment) and (end is None or moment <= end)
+
+
+def tour_discount(tour, now=None):
+    """The tour's own discount percentage at booking time `now` (0 outside its window)."""
+    if not (tour.has_discount and tour.discount_percentage):
+        return 0
+    now = now or timezone.now()
+    return tour.discount_percentage if window_contains(
+        tour.discount_start_date, tour.discount_end_date, now
+    ) else 0
+
+
+def discounted_price(tour, now=None):
+    """Tour.price less the tour discount that applies now."""
+    return apply_discount(tour.price, tour_discount(tour, now))
+
+
+def early_booking_price(price, offer):
+    """A listing price less an early booking offer's discount (None without an offer)."""
+    return apply_discount(price, offer.discount_percentage) if offer is not None else None
+
+
+def listing_prices(tour_ids, now=None):
+    """
+    {tour_id: (listing_price, valid_until)} for the given tours, in two queries.
+
+    The listing price is Tour.price less the larger of the tour discount and
+    the best early booking offer open at `now` (travel dates aside), the
+    lowest of the prices a listing card shows. valid_until is the next time
+    a discount or offer window opens or closes, None when nothing is
+    scheduled.
+    """
+    now = now or timezone.now()
+    tours = Tour.objects.filter(pk__in=list(tour_ids)).only(
+        'price', 'has_discount', 'discount_percentage', 'discount_start_date', 'discount_end_date',
+    )
+    discounts = {tour.pk: (tour.price, tour_discount(tour, now)) for tour in tours}
+    boundaries = {pk: [] for pk in discounts}
+    for tour in tours:
+        if tour.has_discount:
+            boundaries[tour.pk].extend(
+                moment for moment in (tour.discount_start_date, tour.discount_end_date) if moment and moment > now
+            )
+
+    for tour_id, percentage, start, end in EarlyBookingOffer.objects.filter(
+        is_active=True, offer_end_date__gte=now, tours__in=list(discounts)
+    ).values_list('tours', 'discount_percentage', 'offer_start_date', 'offer_end_date'):
+        price, discount = discounts[tour_id]
+        if start <= now:
+            discounts[tour_id] = (price, max(discount, percentage))
+        boundaries[tour_id].extend(moment for moment in (start, end) if moment > now)
+
+    return {
+        pk: (apply_discount(price, discount), min(boundaries[pk], default=None))
+        for pk, (price, discount) in discounts.items()
+    }
+
+
+class Quote:
+    """The price of a party on one tour and travel date."""
+
+    def __init__(self, tour_id, date, departure_id, is_available, original_price, child_original_price,
+                 single_supplement, discount_percentage, is_early_booking,
+                 adults=1, children=0, singles=0):
+        self.tour_id = tour_id
+        self.date = date
+        self.departure_id = departure_id
+        self.is_available = is_available
+        self.discount_percentage = discount_percentage
+        self.is_early_booking = is_early_booking
+        self.adults, self.children, self.singles = adults, children, singles
+
+        # Per person
+        self.original_price = original_price
+        self.price = apply_discount(original_price, discount_percentage)
+        self.child_original_price = child_original_price
+        self.child_price = apply_discount(child_original_price, discount_percentage)
+        self.single_supplement = single_supplement
+
+        # Party
+        supplements = single_supplement * singles
+        self.base_price = original_price * adults + child_original_price * children + supplements
+        self.total_price = self.price * adults + self.child_price * children + supplements
+        self.discount_amount = self.base_price - self.total_price
+
+    def __repr__(self):
+        return f'<Quote tour={self.tour_id} {self.date} {self.total_price}>'
+
+
+class PriceRules:
+    """
+    The pricing inputs of a set of tours, loaded in five queries whatever
+    their number.
+
+    Seasons and departures can be limited to a date range when only some
+    dates will be quoted.
+    """
+
+    def __init__(self, tours, seasons, departures, scheduled, offers, now):
+        self.tours = tours              # {tour_id: Tour with only the price fields}
+        self.seasons = seasons          # {tour_id: [(start, end, price, single_supplement)]}
+        self.departures = departures    # {(tour_id, date): [(pk, price, status)]}
+        self.scheduled = scheduled      # tour ids with scheduled departures
+        self.offers = offers            # {tour_id: [(percentage, start, end, min_days_advance)]}
+        self.now = now
+        self.today = timezone.localdate(now)
+
+    @classmethod
+    def load(cls, tour_ids, now=None, start=None, end=None):
+        now = now or timezone.now()
+        tour_ids = list(tour_ids)
+        tours = Tour.objects.filter(pk__in=tour_ids).only(
+            'price', 'child_price', 'price_single_supplement', 'has_discount',
+            'discount_percentage', 'discount_start_date', 'discount_end_date',
+        ).in_bulk()
+
+        seasons = TourPricing.objects.filter(tour_id__in=tour_ids)
+        departures = TourDeparture.objects.filter(tour_id__in=tour_ids, status__in=PRICED_STATUSES)
+        scheduled = set(departures.values_list('tour_id', flat=True).distinct())
+        if start is not None:
+            seasons = seasons.filter(end_date__gte=start)
+            departures = departures.filter(departure_date__gte=start)
+        if end is not None:
+            seasons = seasons.filter(start_date__lte=end)
+            departures = departures.filter(departure_date__lte=end)
+
+        season_map = {}
+        for tour_id, *season in seasons.values_list(
+            'tour_id', 'start_date', 'end_date', 'price_per_person', 'single_supplement'
+        ):
+            season_map.setdefault(tour_id, []).append(tuple(season))
+        departure_map = {}
+        for pk, tour_id, date, price, status in departures.values_list(
+            'pk', 'tour_id', 'departure_date', 'price', 'status'
+        ):
+            departure_map.setdefault((tour_id, date), []).append((pk, price, status))
+
+        offer_map = {}
+        for tour_id, *offer in EarlyBookingOffer.objects.filter(
+            is_active=True, offer_start_date__lte=now, offer_end_date__gte=now, tours__in=tour_ids
+        ).values_list('tours', 'discount_percentage', 'travel_start_date', 'travel_end_date', 'min_days_advance'):
+            offer_map.setdefault(tour_id, []).append(tuple(offer))
+
+        return cls(tours, season_map, departure_map, scheduled, offer_map, now)
+
+    def season(self, tour_id, date):
+        """The cheapest season covering the date as (price, single_supplement), or None."""
+        covering = [
+            (price, supplement) for start, end, price, supplement in self.seasons.get(tour_id, ())
+            if start <= date <= end
+        ]
+        return min(covering, key=lambda season: season[0]) if covering else None
+
+    def early_booking_discount(self, tour_id, date):
+        """The best early booking percentage open now for travel on the date."""
+        advance = (date - self.today).days
+        return max((
+            percentage for percentage, start, end, min_days in self.offers.get(tour_id, ())
+            if start <= date <= end and advance >= min_days
+        ), default=0)
+
+    def quote(self, tour_id, date, adults=1, children=0, singles=0, departure=None):
+        """
+        Price a party on a travel date, on the given departure or the
+        date's best one. Returns None when the tour isn't priced that day
+        (unknown tour, or no departure that day for a scheduled tour).
+        """
+        tour = self.tours.get(tour_id)
+        if tour is None:
+            return None
+
+        season = self.season(tour_id, date)
+        base, supplement = season if season is not None else (tour.price, None)
+        if supplement is None:
+            supplement = tour.price_single_supplement or ZERO
+
+        departure_id, is_available = None, True
+        if departure is not None:
+            departure_id = departure.pk
+            is_available = departure.status in BOOKABLE_STATUSES
+            if departure.price is not None:
+                base = departure.price
+        elif tour_id in self.scheduled:
+            todays = self.departures.get((tour_id, date))
+            if not todays:
+                return None
+            departure_id, price, status = min(todays, key=lambda d: (
+                d[2] not in BOOKABLE_STATUSES, d[1] if d[1] is not None else base
+            ))
+            is_available = status in BOOKABLE_STATUSES
+            if price is not None:
+                base = price
+
+        own_discount = tour_discount(tour, self.now)
+        early_booking = self.early_booking_discount(tour_id, date)
+        child_base = tour.child_price if tour.child_price is not None else base
+        return Quote(
+            tour_id, date, departure_id, is_available, base, child_base, supplement,
+            max(own_discount, early_booking), early_booking > own_discount,
+            adults, children, singles,
+        )
+
+
+def quote_tours(tour_ids, date, adults=1, children=0, singles=0, now=None):
+    """{tour_id: Quote} for a party on a date across many tours (unpriced tours left out)."""
+    rules = PriceRules.load(tour_ids, now, start=date, end=date)
+    quotes = {}
+    for tour_id in rules.tours:
+        quote = rules.quote(tour_id, date, adults, children, singles)
+        if quote is not None:
+            quotes[tour_id] = quote
+    return quotes
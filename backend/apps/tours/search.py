@@ -0,0 +1,228 @@
+"""
+Full-text search for tours.
+
+On PostgreSQL every published tour has a row in `tours_search_document`
+(created by migration 0011) holding one weighted tsvector per language,
+each with a GIN index:
+
+    A  name
+    B  destination names, highlight titles
+    C  short description, itinerary day titles
+    D  description
+
+Translated fields fall back to the English text when empty, like the
+serializers do. Documents are refreshed once per transaction commit from the
+signals in apps.tours.signals, and can be rebuilt with
+`manage.py rebuild_search_index`.
+
+Other databases use the in-process text index of apps.core.text_index when
+TEXT_INDEX_PATH is set (the MySQL shared hosting setup), and `icontains`
+lookups otherwise.
+"""
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from apps.core import text_index
+from apps.core.batching import OnCommitBatch
+from apps.core.serializers import get_request_language
+from apps.core.text_index import IndexSource, localized, register_source
+from .models import Tour
+
+SEARCH_TABLE = 'tours_search_document'
+
+# Text search configuration per language
+SEARCH_CONFIGS = {
+    'en': 'english',
+    'es': 'spanish',
+    'pt': 'portuguese',
+}
+
+SNIPPET_OPTIONS = 'MaxWords=35, MinWords=15, MaxFragments=2, StartSel=<mark>, StopSel=</mark>'
+
+WEIGHTED_VECTOR_SQL = ' || '.join(
+    f"setweight(to_tsvector(%s::regconfig, %s), '{weight}')" for weight in 'ABCD'
+)
+
+
+def search_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def _places_and_highlights(tour, language):
+    return ' '.join(
+        [localized(d, 'name', language) for d in tour.destinations.all()] +
+        [localized(h, 'title', language) for h in tour.highlights.all()]
+    )
+
+
+def _summary(tour, language):
+    return ' '.join(
+        [localized(tour, 'short_description', language)] +
+        [localized(day, 'title', language) for day in tour.itinerary.all()]
+    )
+
+
+def _weighted_texts(tour, language):
+    """The A-D weighted texts of a tour in one language."""
+    return [
+        localized(tour, 'name', language),
+        _places_and_highlights(tour, language),
+        _summary(tour, language),
+        localized(tour, 'description', language),
+    ]
+
+
+# Same texts and relative weights in the text index
+register_source(IndexSource(
+    'tour', Tour, {'is_published': True},
+    fields=[('name', 10), (_places_and_highlights, 4), (_summary, 2), ('description', 1)],
+    prefetch=['destinations', 'highlights', 'itinerary'],
+))
+
+
+def update_search_documents(tour_ids=None):
+    """
+    Refresh the search documents of the given tours (all tours when None).
+
+    Unpublished or deleted tours lose their document.
+    """
+    if not search_enabled():
+        return 0
+
+    tours = Tour.objects.filter(is_published=True).prefetch_related(
+        'destinations', 'highlights', 'itinerary'
+    )
+    if tour_ids is not None:
+        tour_ids = list(tour_ids)
+        tours = tours.filter(pk__in=tour_ids)
+
+    columns = ', '.join(f'vector_{language}' for language in SEARCH_CONFIGS)
+    vectors = ', '.join(f'({WEIGHTED_VECTOR_SQL})' for language in SEARCH_CONFIGS)
+    updates = ', '.join(f'vector_{language} = EXCLUDED.vector_{language}' for language in SEARCH_CONFIGS)
+    upsert = (
+        f'INSERT INTO {SEARCH_TABLE} (tour_id, {columns}, updated_at) '
+        f'VALUES (%s, {vectors}, now()) '
+        f'ON CONFLICT (tour_id) DO UPDATE SET {updates}, updated_at = now()'
+    )
+
+    rows = []
+    for tour in tours:
+        params = [tour.pk]
+        for language, config in SEARCH_CONFIGS.items():
+            for text in _weighted_texts(tour, language):
+                params += [config, text or '']
+        rows.append(params)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if tour_ids is None:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        else:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE tour_id = ANY(%s)', [tour_ids])
+        cursor.executemany(upsert, rows)
+    return len(rows)
+
+
+_update_batch = OnCommitBatch(update_search_documents)
+
+
+def indexing_enabled():
+    """Whether tour changes need to reach a search index."""
+    return search_enabled() or text_index.text_index_enabled()
+
+
+def schedule_search_update(tour_ids):
+    """Refresh the search documents of the given tours once the current transaction commits."""
+    if search_enabled():
+        _update_batch.add(tour_ids)
+    else:
+        text_index.schedule_index_update('tour', tour_ids)
+
+
+def search_tours(query, language='en', limit=20):
+    """
+    Rank published tours against a web-style query ("cairo -cruise", "\"red sea\"").
+
+    Returns a list of (tour_id, rank, snippet), best match first. The snippet
+    is an HTML excerpt of the description with the matched words wrapped in
+    <mark>. The text index ranks matches but has no snippets; the icontains
+    fallback does neither.
+    """
+    if language not in SEARCH_CONFIGS:
+        language = 'en'
+
+    if not search_enabled():
+        if text_index.text_index_enabled():
+            hits = text_index.search(query, language, kinds={'tour'}, limit=limit)
+            return [(pk, score, None) for kind, pk, score in hits]
+        tour_ids = fallback_search(
+            Tour.objects.filter(is_published=True), query, language
+        ).values_list('pk', flat=True)[:limit]
+        return [(tour_id, None, None) for tour_id in tour_ids]
+
+    vector = f'vector_{language}'
+    description = (
+        'tour.description' if language == 'en'
+        else f"COALESCE(NULLIF(tour.description_{language}, ''), tour.description)"
+    )
+    # Headlines are expensive, so they are only built for the returned page
+    sql = f"""
+        SELECT hit.tour_id, hit.rank,
+               ts_headline(%(config)s::regconfig, {description}, hit.query, %(options)s)
+        FROM (
+            SELECT doc.tour_id, ts_rank_cd(doc.{vector}, query) AS rank, query
+            FROM {SEARCH_TABLE} doc,
+                 websearch_to_tsquery(%(config)s::regconfig, %(query)s) query
+            WHERE doc.{vector} @@ query
+            ORDER BY rank DESC, doc.tour_id
+            LIMIT %(limit)s
+        ) hit
+        JOIN {Tour._meta.db_table} tour ON tour.id = hit.tour_id
+        ORDER BY hit.rank DESC, hit.tour_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'config': SEARCH_CONFIGS[language],
+            'query': query,
+            'options': SNIPPET_OPTIONS,
+            'limit': limit,
+        })
+        return [(tour_id, rank, snippet) for tour_id, rank, snippet in cursor.fetchall()]
+
+
+def fallback_search(queryset, query, language='en'):
+    """Match tours with icontains on the name, descriptions and destination names."""
+    lookups = Q()
+    for field in ['name', 'short_description', 'description', 'destinations__name']:
+        lookups |= Q(**{f'{field}__icontains': query})
+        if language != 'en':
+            lookups |= Q(**{f'{field}_{language}__icontains': query})
+    return queryset.filter(pk__in=Tour.objects.filter(lookups).values('pk'))
+
+
+class TourSearchFilter(filters.SearchFilter):
+    """
+    `?search=` for tour querysets backed by the full-text search documents.
+
+    Keeps the queryset ordering; ranking is left to the search endpoint.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        language = get_request_language(request)
+        if not search_enabled():
+            if text_index.text_index_enabled():
+                hits = text_index.search(query, language, kinds={'tour'})
+                return queryset.filter(pk__in=[pk for kind, pk, score in hits])
+            return fallback_search(queryset, query, language)
+
+        matches = RawSQL(
+            f'SELECT tour_id FROM {SEARCH_TABLE} '
+            f'WHERE vector_{language} @@ websearch_to_tsquery(%s::regconfig, %s)',
+            [SEARCH_CONFIGS[language], query]
+        )
+        return queryset.filter(pk__in=matches)
@@ -2,17 +2,20 @@
 Tour serializers for API.
 """
 from rest_framework import serializers
-from apps.core.serializers import MultiLanguageSerializerMixin
+from apps.core.serializers import MultiLanguageSerializerMixin, SparseFieldsetMixin
 from .models import (
     TourCategory, TourType, Tour, TourImage, TourHighlight, TourItinerary,
     TourInclusion, TourPricing, TourDeparture, TourFAQ, EarlyBookingOffer
 )
 from apps.destinations.serializers import DestinationListSerializer
+from apps.reviews.serializers import ReviewSerializer
+from .offers import get_best_offer
+from .pricing import early_booking_price
 
 
 class TourCategorySerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['name', 'description']
-    tour_count = serializers.SerializerMethodField()
+    tour_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = TourCategory
@@ -22,13 +25,10 @@ class TourCategorySerializer(MultiLanguageSerializerMixin, serializers.ModelSeri
             'icon', 'image', 'tour_count'
         ]
 
-    def get_tour_count(self, obj):
-        return obj.tours.filter(is_published=True).count()
-
 
 class TourTypeSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['name', 'description']
-    tour_count = serializers.SerializerMethodField()
+    tour_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = TourType
@@ -38,9 +38,6 @@ class TourTypeSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializ
             'icon', 'tour_count'
         ]
 
-    def get_tour_count(self, obj):
-        return obj.tours.filter(is_published=True).count()
-
 
 class TourImageSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
     TRANSLATABLE_FIELDS = ['caption', 'alt_text']
@@ -107,7 +104,38 @@ class TourFAQSerializer(MultiLanguageSerializerMixin, serializers.ModelSerialize
         fields = ['id', 'question', 'question_es', 'question_pt', 'answer', 'answer_es', 'answer_pt']
 
 
-class TourListSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
+class EarlyBookingFieldsMixin:
+    """
+    Early booking fields shared by the tour list and detail serializers.
+
+    The offer is resolved through apps.tours.offers, which reads the offers
+    prefetched by the views instead of querying once per field.
+    """
+
+    def get_is_early_booking(self, obj):
+        """Check if tour is part of any active early booking offer."""
+        return get_best_offer(obj) is not None
+
+    def get_early_booking_discount(self, obj):
+        """Get the early booking discount percentage."""
+        offer = get_best_offer(obj)
+        return offer.discount_percentage if offer else None
+
+    def get_early_booking_price(self, obj):
+        """Calculate the early booking price."""
+        offer = get_best_offer(obj)
+        if offer:
+            return float(early_booking_price(obj.price, offer))
+        return None
+
+    def get_early_booking_badge(self, obj):
+        """Get the badge text for early booking."""
+        offer = get_best_offer(obj)
+        return offer.badge_text if offer else None
+
+
+class TourListSerializer(EarlyBookingFieldsMixin, SparseFieldsetMixin,
+                         MultiLanguageSerializerMixin, serializers.ModelSerializer):
     """Serializer for tour listing (minimal data)."""
     TRANSLATABLE_FIELDS = ['name', 'short_description']
     category = TourCategorySerializer(read_only=True)
@@ -144,41 +172,16 @@ class TourListSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializ
     def get_highlights(self, obj):
         return list(obj.highlights.values_list('title', flat=True)[:3])
 
-    def _get_active_early_booking(self, obj):
-        """Get the active early booking offer for this tour."""
-        from django.utils import timezone
-        now = timezone.now()
-        return obj.early_booking_offers.filter(
-            is_active=True,
-            offer_start_date__lte=now,
-            offer_end_date__gte=now
-        ).order_by('-discount_percentage').first()
-
-    def get_is_early_booking(self, obj):
-        """Check if tour is part of any active early booking offer."""
-        return self._get_active_early_booking(obj) is not None
-
-    def get_early_booking_discount(self, obj):
-        """Get the early booking discount percentage."""
-        offer = self._get_active_early_booking(obj)
-        return offer.discount_percentage if offer else None
-
-    def get_early_booking_price(self, obj):
-        """Calculate the early booking price."""
-        offer = self._get_active_early_booking(obj)
-        if offer:
-            return round(float(obj.price) * (100 - offer.discount_percentage) / 100, 2)
-        return None
-
-    def get_early_booking_badge(self, obj):
-        """Get the badge text for early booking."""
-        offer = self._get_active_early_booking(obj)
-        return offer.badge_text if offer else None
 
+class TourDetailSerializer(EarlyBookingFieldsMixin, SparseFieldsetMixin,
+                           MultiLanguageSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer for full tour details.
 
-class TourDetailSerializer(MultiLanguageSerializerMixin, serializers.ModelSerializer):
-    """Serializer for full tour details."""
+    Supports ?fields= (e.g. only the header fields) and ?include=reviews.
+    """
     TRANSLATABLE_FIELDS = ['name', 'short_description', 'description']
+    OPTIONAL_FIELDS = ['reviews']
     category = TourCategorySerializer(read_only=True)
     tour_type = TourTypeSerializer(read_only=True)
     destinations = DestinationListSerializer(many=True, read_only=True)
@@ -189,6 +192,7 @@ class TourDetailSerializer(MultiLanguageSerializerMixin, serializers.ModelSerial
     seasonal_pricing = TourPricingSerializer(many=True, read_only=True)
     departures = TourDepartureSerializer(many=True, read_only=True)
     faqs = TourFAQSerializer(many=True, read_only=True)
+    reviews = serializers.SerializerMethodField()
     duration_display = serializers.CharField(read_only=True)
     discounted_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     destination_names = serializers.SerializerMethodField()
@@ -221,46 +225,24 @@ class TourDetailSerializer(MultiLanguageSerializerMixin, serializers.ModelSerial
             'created_at', 'updated_at',
             # Early Booking fields
             'is_early_booking', 'early_booking_discount', 'early_booking_price',
-            'early_booking_badge', 'early_booking_end_date'
+            'early_booking_badge', 'early_booking_end_date',
+            # Only with ?include=reviews
+            'reviews'
         ]
 
     def get_destination_names(self, obj):
-        return list(obj.destinations.values_list('name', flat=True))
+        return [destination.name for destination in obj.destinations.all()]
 
-    def _get_active_early_booking(self, obj):
-        """Get the active early booking offer for this tour."""
-        from django.utils import timezone
-        now = timezone.now()
-        return obj.early_booking_offers.filter(
-            is_active=True,
-            offer_start_date__lte=now,
-            offer_end_date__gte=now
-        ).order_by('-discount_percentage').first()
-
-    def get_is_early_booking(self, obj):
-        """Check if tour is part of any active early booking offer."""
-        return self._get_active_early_booking(obj) is not None
-
-    def get_early_booking_discount(self, obj):
-        """Get the early booking discount percentage."""
-        offer = self._get_active_early_booking(obj)
-        return offer.discount_percentage if offer else None
-
-    def get_early_booking_price(self, obj):
-        """Calculate the early booking price."""
-        offer = self._get_active_early_booking(obj)
-        if offer:
-            return round(float(obj.price) * (100 - offer.discount_percentage) / 100, 2)
-        return None
-
-    def get_early_booking_badge(self, obj):
-        """Get the badge text for early booking."""
-        offer = self._get_active_early_booking(obj)
-        return offer.badge_text if offer else None
+    def get_reviews(self, obj):
+        """Approved reviews, newest first (prefetched by TourDetailView)."""
+        reviews = getattr(obj, 'approved_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.filter(is_approved=True).prefetch_related('images')
+        return ReviewSerializer(reviews, many=True, context=self.context).data
 
     def get_early_booking_end_date(self, obj):
         """Get the end date of the early booking offer."""
-        offer = self._get_active_early_booking(obj)
+        offer = get_best_offer(obj)
         return offer.offer_end_date.isoformat() if offer else None
 
 
@@ -330,7 +312,6 @@ class EarlyBookingOfferSerializer(serializers.ModelSerializer):
         """Get tours with calculated early booking prices."""
         tours_data = []
         for tour in obj.tours.filter(is_published=True):
-            early_price = float(tour.price) * (100 - obj.discount_percentage) / 100
             tours_data.append({
                 'id': tour.id,
                 'name': tour.name,
@@ -340,7 +321,7 @@ class EarlyBookingOfferSerializer(serializers.ModelSerializer):
                 'nights': tour.nights,
                 'duration_display': tour.duration_display,
                 'original_price': float(tour.price),
-                'early_booking_price': round(early_price, 2),
+                'early_booking_price': float(early_booking_price(tour.price, obj)),
                 'discount_percentage': obj.discount_percentage,
                 'currency': tour.currency,
                 'average_rating': float(tour.average_rating),
@@ -0,0 +1,226 @@
+"""
+Signal wiring for the tours app.
+"""
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.core.conditional import track_versions
+from apps.core.transitions import Transitions, register_transitions
+from apps.core.counters import CounterCache, register_counter
+from apps.destinations.models import Destination
+from .cards import rebuild_tour_cards, schedule_card_rebuild
+from .effective_prices import schedule_effective_price_refresh
+from .neighbors import schedule_neighbor_rebuild
+from .price_calendar import schedule_calendar_rebuild
+from .models import (
+    EarlyBookingOffer, Tour, TourCard, TourCategory, TourDeparture, TourFAQ, TourHighlight,
+    TourImage, TourInclusion, TourItinerary, TourPricing, TourType,
+)
+from .search import (
+    SEARCH_TABLE, indexing_enabled, schedule_search_update, search_enabled, update_search_documents
+)
+
+# Published tour counts per category, type and destination
+register_counter(CounterCache(Tour, 'category', 'tour_count', {'is_published': True}))
+register_counter(CounterCache(Tour, 'tour_type', 'tour_count', {'is_published': True}))
+register_counter(CounterCache(Tour, 'destinations', 'tour_count', {'is_published': True}))
+
+# ETag / response cache versions (TourCard is bumped by rebuild_tour_cards)
+track_versions(Tour, TourCategory, TourType, EarlyBookingOffer)
+track_versions(
+    TourImage, TourHighlight, TourItinerary, TourInclusion, TourPricing, TourDeparture, TourFAQ,
+    parent='tour',
+)
+
+# Instants responses change at (apps.core.transitions)
+register_transitions(Transitions(
+    'tours.offers', EarlyBookingOffer, ['offer_start_date', 'offer_end_date'], filter={'is_active': True}
+))
+# days_remaining of the offer lists
+register_transitions(Transitions(
+    'tours.offer_days', EarlyBookingOffer, ['offer_end_date'], filter={'is_active': True},
+    period=timedelta(days=1),
+))
+register_transitions(Transitions(
+    'tours.discounts', Tour, ['discount_start_date', 'discount_end_date'], filter={'has_discount': True}
+))
+
+
+# ============================================================================
+# Tour card read model
+# ============================================================================
+
+@receiver(post_save, sender=Tour)
+def tour_saved(sender, instance, **kwargs):
+    schedule_card_rebuild([instance.pk])
+
+
+@receiver(post_save, sender=TourHighlight)
+@receiver(post_delete, sender=TourHighlight)
+def highlight_changed(sender, instance, **kwargs):
+    schedule_card_rebuild([instance.tour_id])
+
+
+def _linked_tour_pks(instance, action, reverse, pk_set):
+    """Tours whose destinations change in an m2m_changed call on Tour.destinations."""
+    if not reverse:
+        return [instance.pk] if action.startswith('post_') else []
+    if action in ('post_add', 'post_remove'):
+        return pk_set or []
+    if action == 'pre_clear':
+        return list(instance.tours.values_list('pk', flat=True))
+    return []
+
+
+@receiver(m2m_changed, sender=Tour.destinations.through)
+def tour_destinations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    tour_pks = _linked_tour_pks(instance, action, reverse, pk_set)
+    schedule_card_rebuild(tour_pks)
+    schedule_search_update(tour_pks)
+
+
+@receiver(post_save, sender=TourCategory)
+@receiver(pre_delete, sender=TourCategory)
+@receiver(post_save, sender=TourType)
+@receiver(pre_delete, sender=TourType)
+@receiver(post_save, sender=Destination)
+@receiver(pre_delete, sender=Destination)
+def card_relation_changed(sender, instance, **kwargs):
+    schedule_card_rebuild(instance.tours.values_list('pk', flat=True))
+
+
+# ============================================================================
+# Search documents
+# ============================================================================
+
+@receiver(post_save, sender=Tour)
+def tour_saved_search(sender, instance, **kwargs):
+    schedule_search_update([instance.pk])
+
+
+@receiver(post_save, sender=TourHighlight)
+@receiver(post_delete, sender=TourHighlight)
+@receiver(post_save, sender=TourItinerary)
+@receiver(post_delete, sender=TourItinerary)
+def tour_child_changed_search(sender, instance, **kwargs):
+    schedule_search_update([instance.tour_id])
+
+
+@receiver(post_save, sender=Destination)
+@receiver(pre_delete, sender=Destination)
+def destination_changed_search(sender, instance, **kwargs):
+    if indexing_enabled():
+        schedule_search_update(instance.tours.values_list('pk', flat=True))
+
+
+# ============================================================================
+# Price calendar
+# ============================================================================
+
+@receiver(post_save, sender=Tour)
+def tour_saved_calendar(sender, instance, **kwargs):
+    schedule_calendar_rebuild([instance.pk])
+
+
+@receiver(post_save, sender=TourPricing)
+@receiver(post_delete, sender=TourPricing)
+@receiver(post_save, sender=TourDeparture)
+@receiver(post_delete, sender=TourDeparture)
+def tour_price_input_changed(sender, instance, **kwargs):
+    schedule_calendar_rebuild([instance.tour_id])
+
+
+@receiver(post_save, sender=EarlyBookingOffer)
+@receiver(pre_delete, sender=EarlyBookingOffer)
+def offer_changed_calendar(sender, instance, **kwargs):
+    schedule_calendar_rebuild(instance.tours.values_list('pk', flat=True))
+
+
+def _offer_tour_pks(instance, action, reverse, pk_set):
+    """Tours whose offers change in an m2m_changed call on EarlyBookingOffer.tours."""
+    if reverse:
+        # instance is a tour
+        return [instance.pk] if action.startswith('post_') else []
+    if action in ('post_add', 'post_remove'):
+        return pk_set or []
+    if action == 'pre_clear':
+        return list(instance.tours.values_list('pk', flat=True))
+    return []
+
+
+@receiver(m2m_changed, sender=EarlyBookingOffer.tours.through)
+def offer_tours_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    schedule_calendar_rebuild(_offer_tour_pks(instance, action, reverse, pk_set))
+
+
+# ============================================================================
+# Effective prices
+# ============================================================================
+
+@receiver(post_save, sender=Tour)
+def tour_saved_effective_price(sender, instance, **kwargs):
+    schedule_effective_price_refresh([instance.pk])
+
+
+@receiver(post_save, sender=EarlyBookingOffer)
+@receiver(pre_delete, sender=EarlyBookingOffer)
+def offer_changed_effective_price(sender, instance, **kwargs):
+    schedule_effective_price_refresh(instance.tours.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=EarlyBookingOffer.tours.through)
+def offer_tours_changed_effective_price(sender, instance, action, reverse, pk_set, **kwargs):
+    schedule_effective_price_refresh(_offer_tour_pks(instance, action, reverse, pk_set))
+
+
+# ============================================================================
+# Related tours
+# ============================================================================
+
+@receiver(post_save, sender=Tour)
+@receiver(post_delete, sender=Tour)
+def tour_saved_neighbors(sender, instance, **kwargs):
+    schedule_neighbor_rebuild([instance.pk])
+
+
+@receiver(m2m_changed, sender=Tour.destinations.through)
+def tour_destinations_changed_neighbors(sender, instance, action, reverse, pk_set, **kwargs):
+    schedule_neighbor_rebuild(_linked_tour_pks(instance, action, reverse, pk_set))
+
+
+def _fully_migrated(using):
+    """Whether every tours migration is applied, so the current models match the tables."""
+    executor = MigrationExecutor(connections[using])
+    leaves = [node for node in executor.loader.graph.leaf_nodes() if node[0] == 'tours']
+    return not executor.migration_plan(leaves)
+
+
+@receiver(post_migrate)
+def build_missing_cards(sender, app_config=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Build the cards once after the TourCard table is first created.
+
+    Cards are the current serializer's output, which the migration's
+    historical models can't render: the build waits for a migrate that
+    leaves the tours app fully migrated (not a partial one or a rollback).
+    """
+    if app_config is None or app_config.label != 'tours' or not _fully_migrated(using):
+        return
+    if not TourCard.objects.exists() and Tour.objects.filter(is_published=True).exists():
+        rebuild_tour_cards()
+
+
+@receiver(post_migrate)
+def build_missing_search_documents(sender, app_config=None, **kwargs):
+    """Index every tour once after the search table is first created."""
+    if app_config is None or app_config.label != 'tours' or not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {SEARCH_TABLE})')
+        indexed = cursor.fetchone()[0]
+    if not indexed:
+        update_search_documents()
@@ -0,0 +1,38 @@
+"""
+Celery tasks for tours.
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_effective_prices_task():
+    """
+    Refresh the effective prices whose discount or offer window opened or closed.
+
+    Returns:
+        dict: Number of tours whose effective price changed
+    """
+    from .effective_prices import refresh_due_effective_prices
+
+    changed = refresh_due_effective_prices()
+    if changed:
+        logger.info(f"Refreshed the effective prices of {changed} tours")
+    return {'changed': changed}
+
+
+@shared_task
+def rebuild_tour_neighbors_task():
+    """
+    Recompute the related tours of every published tour.
+
+    Returns:
+        dict: Number of tours
+    """
+    from .neighbors import rebuild_tour_neighbors
+
+    count = rebuild_tour_neighbors()
+    logger.info(f"Rebuilt the related tours of {count} tours")
+    return {'tours': count}
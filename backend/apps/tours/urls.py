@@ -13,6 +13,7 @@ urlpatterns = [
     path('popular/', views.PopularToursView.as_view(), name='popular'),
     path('multi-destination/', views.MultiDestinationToursView.as_view(), name='multi-destination'),
     path('search/', views.TourSearchView.as_view(), name='search'),
+    path('facets/', views.TourFacetView.as_view(), name='facets'),
 
     # Categories
     path('categories/', views.TourCategoryListView.as_view(), name='categories'),
@@ -32,4 +33,5 @@ urlpatterns = [
     path('<slug:slug>/', views.TourDetailView.as_view(), name='detail'),
     path('<slug:slug>/related/', views.RelatedToursView.as_view(), name='related'),
     path('<slug:slug>/departures/', views.TourDeparturesView.as_view(), name='departures'),
+    path('<slug:slug>/calendar/', views.TourPriceCalendarView.as_view(), name='calendar'),
 ]
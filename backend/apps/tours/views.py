@@ -1,146 +1,317 @@
 """
 Tour views for API.
 """
-from rest_framework import generics, filters, status
+from datetime import date, datetime, timedelta
+
+from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Prefetch
 from django.utils import timezone
-from .models import Tour, TourCategory, TourDeparture, EarlyBookingOffer
+from .models import (
+    Tour, TourCard, TourCategory, TourType, TourImage, TourHighlight, TourItinerary,
+    TourInclusion, TourPricing, TourDeparture, TourFAQ, TourPriceDay, TourNeighbor, EarlyBookingOffer
+)
 from .serializers import (
     TourListSerializer, TourDetailSerializer, TourCategorySerializer,
     TourDepartureSerializer, EarlyBookingOfferSerializer, EarlyBookingOfferListSerializer
 )
-from .filters import TourFilter
-
-
-class TourListView(generics.ListAPIView):
+from apps.core.conditional import ConditionalGetMixin, child_tag
+from apps.core.fragments import FragmentCacheMixin
+from apps.core.response_cache import ResponseCacheMixin
+from apps.core.serializers import get_request_language, get_requested_fields
+from apps.core.view_counters import ViewCountMixin
+from apps.core.views import SparseFieldsetViewMixin
+from apps.destinations.models import Destination
+from apps.reviews.models import Review, ReviewImage
+from .effective_prices import ensure_effective_prices
+from .filters import DEPARTURE_FILTERS, TourFilter, TourOrderingFilter
+from .offers import prefetch_active_offers
+from .cards import TourCardListMixin, get_cards, render_cards
+from .price_calendar import get_price_calendar
+from .search import TourSearchFilter, search_tours
+from .facets import compute_facets, strip_facet_params
+
+# Models behind each kind of response, for the ETag versions
+CARD_VERSIONS = [Tour, TourCard, EarlyBookingOffer, TourCategory, TourType]
+TOUR_VERSIONS = [
+    Tour, TourCategory, TourType, TourImage, TourHighlight, TourItinerary, TourInclusion,
+    TourPricing, TourDeparture, TourFAQ, EarlyBookingOffer, Destination, Review, ReviewImage,
+]
+# Changes that reach a tour's own version tag (see track_versions(parent=...))
+TOUR_OBJECT_VERSIONS = [
+    Tour, TourImage, TourHighlight, TourItinerary, TourInclusion, TourPricing, TourDeparture,
+    TourFAQ, Review,
+]
+OFFER_VERSIONS = [EarlyBookingOffer, Tour]
+
+# Instants the content changes at (apps.core.transitions sources, registered in signals)
+OFFER_TRANSITIONS = ['tours.offers']
+CARD_TRANSITIONS = ['tours.offers', 'tours.discounts']
+
+# Offer countdowns (hours, minutes, seconds remaining) tick continuously: revalidate every minute
+OFFER_INTERVAL = 60
+
+
+class TourListView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List all published tours with filtering."""
     serializer_class = TourListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
+    filter_backends = [DjangoFilterBackend, TourSearchFilter, TourOrderingFilter]
     filterset_class = TourFilter
     search_fields = ['name', 'short_description', 'description', 'destinations__name']
     ordering_fields = ['price', 'days', 'average_rating', 'created_at', 'name']
     ordering = ['-is_featured', '-is_best_seller', '-created_at']
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Availability searches also depend on the departures, from today on
+        if set(DEPARTURE_FILTERS) & set(request.query_params):
+            self.version_models = self.version_models + [TourDeparture]
+            self.transition_sources = self.transition_sources + ['midnight']
+
     def get_queryset(self):
-        return Tour.objects.filter(is_published=True).select_related(
-            'category', 'tour_type'
-        ).prefetch_related('destinations')
+        return Tour.objects.filter(is_published=True)
+
+    def add_card_fields(self, data, tours):
+        """With departure filters, add each tour's earliest matching departure."""
+        departure_ids = [getattr(tour, 'matching_departure_id', None) for tour in tours]
+        requested, include = get_requested_fields(self.request)
+        if not any(departure_ids) or (requested is not None and 'matching_departure' not in requested):
+            return
+        departures = TourDeparture.objects.in_bulk([pk for pk in departure_ids if pk])
+        for card, pk in zip(data, departure_ids):
+            departure = departures.get(pk)
+            card['matching_departure'] = TourDepartureSerializer(departure).data if departure else None
+
+
+class TourFacetView(TourListView):
+    """
+    Tour listing plus facet counts for the filter sidebar.
+
+    Accepts the same parameters as TourListView and returns its page with a
+    `facets` object: counts per category, tour type, destination,
+    difficulty, duration bucket and price bucket.
+    """
+    version_models = CARD_VERSIONS + [Destination]
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+
+        # Everything but the facet selection narrows the counted tours
+        queryset = TourFilter(
+            strip_facet_params(request.query_params), queryset=self.get_queryset(), request=request
+        ).qs
+        queryset = TourSearchFilter().filter_queryset(request, queryset, self)
 
+        facets = compute_facets(queryset, request.query_params, get_request_language(request))
+        if isinstance(response.data, dict):
+            response.data['facets'] = facets
+        else:
+            response.data = {'results': response.data, 'facets': facets}
+        return response
 
-class TourDetailView(generics.RetrieveAPIView):
-    """Get full tour details by slug."""
+
+def _available_departures():
+    return Prefetch(
+        'departures',
+        queryset=TourDeparture.objects.filter(status__in=['available', 'limited'])
+    )
+
+
+def _approved_reviews():
+    return Prefetch(
+        'reviews',
+        queryset=Review.objects.filter(is_approved=True).prefetch_related('images'),
+        to_attr='approved_reviews'
+    )
+
+
+class TourDetailView(ViewCountMixin, ConditionalGetMixin, ResponseCacheMixin, FragmentCacheMixin,
+                     SparseFieldsetViewMixin, generics.RetrieveAPIView):
+    """
+    Get full tour details by slug (supports ?fields= and ?include=reviews).
+
+    The child lists are cached as fragments per tour and language, so a
+    departure change only renders the departures again. Views are counted
+    in Tour.view_count, cached responses included.
+    """
     serializer_class = TourDetailSerializer
+    version_models = TOUR_VERSIONS
+    transition_sources = CARD_TRANSITIONS
+    cache_object_models = TOUR_OBJECT_VERSIONS
+    fragment_models = {
+        'images': TourImage,
+        'highlights': TourHighlight,
+        'itinerary': TourItinerary,
+        'inclusions': TourInclusion,
+        'seasonal_pricing': TourPricing,
+        'departures': TourDeparture,
+        'faqs': TourFAQ,
+    }
     lookup_field = 'slug'
 
+    field_select_related = {
+        'category': ['category'],
+        'tour_type': ['tour_type'],
+    }
+    field_prefetch_related = {
+        'destinations': ['destinations'],
+        'destination_names': ['destinations'],
+        'images': ['images'],
+        'highlights': ['highlights'],
+        'itinerary': ['itinerary'],
+        'inclusions': ['inclusions'],
+        'seasonal_pricing': ['seasonal_pricing'],
+        'departures': [_available_departures],
+        'faqs': ['faqs'],
+        'reviews': [_approved_reviews],
+        **{field: [prefetch_active_offers] for field in [
+            'is_early_booking', 'early_booking_discount', 'early_booking_price',
+            'early_booking_badge', 'early_booking_end_date',
+        ]},
+    }
+
     def get_queryset(self):
-        return Tour.objects.filter(is_published=True).select_related(
-            'category'
-        ).prefetch_related(
-            'destinations',
-            'images',
-            'highlights',
-            'itinerary',
-            'inclusions',
-            'seasonal_pricing',
-            Prefetch(
-                'departures',
-                queryset=TourDeparture.objects.filter(status__in=['available', 'limited'])
-            ),
-            'faqs'
-        )
+        return self.apply_field_relations(Tour.objects.filter(is_published=True))
+
 
+class TourPriceCalendarView(ConditionalGetMixin, ResponseCacheMixin, generics.RetrieveAPIView):
+    """
+    Cheapest price per travel date and per month for a tour.
 
-class FeaturedToursView(generics.ListAPIView):
+    ?month=2026-11 or ?start=2026-11-01&end=2026-12-31 limit the listed
+    days; the monthly summary and the cheapest date cover the whole
+    calendar. Served from the precomputed TourPriceDay table.
+    """
+    version_models = [TourPriceDay]
+    transition_sources = ['midnight'] + CARD_TRANSITIONS
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        return Tour.objects.filter(is_published=True).only('id', 'slug', 'currency')
+
+    def get_cache_tags(self, data):
+        return [child_tag(TourPriceDay, Tour, data['id'])]
+
+    def get_date_range(self):
+        """(start, end) from ?month= or ?start= / ?end=; raises ValueError."""
+        params = self.request.query_params
+        if params.get('month'):
+            start = datetime.strptime(params['month'], '%Y-%m').date()
+            end = (start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            return start, end
+        start = date.fromisoformat(params['start']) if params.get('start') else None
+        end = date.fromisoformat(params['end']) if params.get('end') else None
+        return start, end
+
+    def retrieve(self, request, *args, **kwargs):
+        tour = self.get_object()
+        try:
+            start, end = self.get_date_range()
+        except ValueError:
+            return Response(
+                {'error': 'Use month=YYYY-MM or start=YYYY-MM-DD and end=YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_price_calendar(tour, start, end))
+
+
+class FeaturedToursView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List featured tours for homepage."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
-        return Tour.objects.filter(
-            is_published=True,
+        return TourCard.objects.filter(
+            language=self.get_card_language(),
             is_featured=True
-        ).select_related('category', 'tour_type').prefetch_related('destinations')[:8]
+        )[:8]
 
 
-class PopularToursView(generics.ListAPIView):
+class PopularToursView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List popular/best-selling tours."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
-        return Tour.objects.filter(
-            is_published=True,
+        return TourCard.objects.filter(
+            language=self.get_card_language(),
             is_best_seller=True
-        ).select_related('category', 'tour_type').prefetch_related('destinations')[:8]
+        )[:8]
 
 
-class MultiDestinationToursView(generics.ListAPIView):
+class MultiDestinationToursView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List multi-destination tours (e.g., Egypt & Jordan, Egypt & Dubai)."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
-        return Tour.objects.filter(
-            is_published=True,
+        return TourCard.objects.filter(
+            language=self.get_card_language(),
             is_multi_destination=True
-        ).select_related('category', 'tour_type').prefetch_related('destinations')[:6]
+        )[:6]
 
 
-class TourCategoryListView(generics.ListAPIView):
+class TourCategoryListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """List all active tour categories."""
     serializer_class = TourCategorySerializer
+    version_models = [TourCategory]
 
     def get_queryset(self):
         return TourCategory.objects.filter(is_active=True)
 
 
-class ToursByDestinationView(generics.ListAPIView):
+class ToursByDestinationView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List tours for a specific destination."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
         destination_slug = self.kwargs.get('destination_slug')
         return Tour.objects.filter(
             is_published=True,
             destinations__slug=destination_slug
-        ).select_related('category').prefetch_related('destinations')
+        )
 
 
-class ToursByCategoryView(generics.ListAPIView):
+class ToursByCategoryView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
     """List tours for a specific category."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
         category_slug = self.kwargs.get('category_slug')
         return Tour.objects.filter(
             is_published=True,
             category__slug=category_slug
-        ).select_related('category').prefetch_related('destinations')
+        )
 
 
-class RelatedToursView(generics.ListAPIView):
-    """Get related tours based on current tour."""
+class RelatedToursView(ConditionalGetMixin, ResponseCacheMixin, TourCardListMixin, generics.ListAPIView):
+    """Get related tours: the most similar published tours (apps.tours.neighbors)."""
     serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS + [TourNeighbor]
+    transition_sources = CARD_TRANSITIONS
 
     def get_queryset(self):
-        tour_slug = self.kwargs.get('slug')
-        try:
-            tour = Tour.objects.get(slug=tour_slug)
-            destination_ids = tour.destinations.values_list('id', flat=True)
-
-            return Tour.objects.filter(
-                is_published=True,
-                destinations__in=destination_ids
-            ).exclude(slug=tour_slug).distinct().select_related(
-                'category'
-            ).prefetch_related('destinations')[:4]
-        except Tour.DoesNotExist:
-            return Tour.objects.none()
+        return Tour.objects.filter(
+            is_published=True,
+            neighbor_of__tour__slug=self.kwargs.get('slug')
+        ).order_by('neighbor_of__rank')[:4]
 
 
-class TourDeparturesView(generics.ListAPIView):
+class TourDeparturesView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """Get available departures for a tour."""
     serializer_class = TourDepartureSerializer
+    version_models = [Tour, TourDeparture]
 
     def get_queryset(self):
         tour_slug = self.kwargs.get('slug')
@@ -150,36 +321,48 @@ class TourDeparturesView(generics.ListAPIView):
         ).order_by('departure_date')
 
 
-class TourSearchView(APIView):
-    """Advanced tour search endpoint."""
+class TourSearchView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
+    """
+    Full-text tour search, best match first.
+
+    GET /api/tours/search/?q=nile cruise
+    Each result is a tour card with its `rank` and a highlighted `snippet`.
+    """
+    serializer_class = TourListSerializer
+    version_models = CARD_VERSIONS
+    transition_sources = CARD_TRANSITIONS
 
-    def get(self, request):
-        queryset = Tour.objects.filter(is_published=True)
+    def list(self, request, *args, **kwargs):
+        ensure_effective_prices()
+        language = get_request_language(request)
+        search = request.query_params.get('q', '').strip()
 
-        # Apply filters
-        search = request.query_params.get('q')
-        if search:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search) |
-                models.Q(short_description__icontains=search) |
-                models.Q(destinations__name__icontains=search)
-            ).distinct()
+        if not search:
+            tour_ids = list(Tour.objects.filter(is_published=True).values_list('id', flat=True)[:20])
+            cards = get_cards(tour_ids, language)
+            return Response(render_cards(cards, request))
 
-        # Serialize and return
-        serializer = TourListSerializer(queryset[:20], many=True)
-        return Response(serializer.data)
+        hits = search_tours(search, language, limit=20)
+        cards = get_cards([tour_id for tour_id, rank, snippet in hits], language)
+        results = render_cards(cards, request)
+        matches = {tour_id: (rank, snippet) for tour_id, rank, snippet in hits}
+        for data in results:
+            data['rank'], data['snippet'] = matches[data['id']]
+        return Response(results)
 
 
 # ============================================================================
 # Early Booking Offers (الحجز المبكر)
 # ============================================================================
 
-class EarlyBookingOfferListView(generics.ListAPIView):
+class EarlyBookingOfferListView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """
     List all active early booking offers.
     عرض كل عروض الحجز المبكر النشطة
     """
     serializer_class = EarlyBookingOfferListSerializer
+    version_models = OFFER_VERSIONS
+    transition_sources = OFFER_TRANSITIONS + ['tours.offer_days']
 
     def get_queryset(self):
         now = timezone.now()
@@ -190,12 +373,16 @@ class EarlyBookingOfferListView(generics.ListAPIView):
         ).prefetch_related('tours')
 
 
-class EarlyBookingOfferDetailView(generics.RetrieveAPIView):
+class EarlyBookingOfferDetailView(ConditionalGetMixin, ResponseCacheMixin, generics.RetrieveAPIView):
     """
     Get single early booking offer with full details.
     تفاصيل عرض الحجز المبكر
     """
     serializer_class = EarlyBookingOfferSerializer
+    version_models = OFFER_VERSIONS
+    version_interval = OFFER_INTERVAL
+    transition_sources = OFFER_TRANSITIONS
+    cache_object_models = [EarlyBookingOffer]
     lookup_field = 'pk'
 
     def get_queryset(self):
@@ -204,12 +391,15 @@ class EarlyBookingOfferDetailView(generics.RetrieveAPIView):
         ).prefetch_related('tours')
 
 
-class FeaturedEarlyBookingView(generics.ListAPIView):
+class FeaturedEarlyBookingView(ConditionalGetMixin, ResponseCacheMixin, generics.ListAPIView):
     """
     Get featured early booking offers for homepage.
     عروض الحجز المبكر المميزة للصفحة الرئيسية
     """
     serializer_class = EarlyBookingOfferSerializer
+    version_models = OFFER_VERSIONS
+    version_interval = OFFER_INTERVAL
+    transition_sources = OFFER_TRANSITIONS
 
     def get_queryset(self):
         now = timezone.now()
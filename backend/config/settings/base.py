@@ -56,6 +56,8 @@ LOCAL_APPS = [
     'apps.blog',
     'apps.reviews',
     'apps.contact',
+    'apps.bookings',
+    'apps.home',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -243,6 +245,28 @@ CACHES = {
     }
 }
 
+# Seconds a cached API response is kept (apps.core.response_cache); entries
+# are also invalidated as soon as the content they depend on changes
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Seconds a process buffers page views before spilling them to the cache,
+# and seconds between the flushes that write them to the database
+# (apps.core.view_counters)
+VIEW_COUNT_BUFFER_SECONDS = config('VIEW_COUNT_BUFFER_SECONDS', default=10, cast=int)
+VIEW_COUNT_FLUSH_SECONDS = config('VIEW_COUNT_FLUSH_SECONDS', default=60, cast=int)
+
+# Days ahead covered by the tour price calendars (apps.tours.price_calendar)
+PRICE_CALENDAR_DAYS = config('PRICE_CALENDAR_DAYS', default=365, cast=int)
+
+# Related tours stored per tour (apps.tours.neighbors)
+TOUR_NEIGHBORS = config('TOUR_NEIGHBORS', default=8, cast=int)
+
+# Minutes a pending booking holds its departure seats (apps.bookings.reservations)
+BOOKING_HOLD_MINUTES = config('BOOKING_HOLD_MINUTES', default=30, cast=int)
+
+# Departures with this many spots left or fewer are shown as limited
+DEPARTURE_LIMITED_SPOTS = config('DEPARTURE_LIMITED_SPOTS', default=5, cast=int)
+
 # Jazzmin Admin Theme Configuration - Professional Navy & Gold Theme
 JAZZMIN_SETTINGS = {
     # Title & Branding
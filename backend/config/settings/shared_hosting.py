@@ -35,13 +35,30 @@ DATABASES = {
     }
 }
 
-# Cache - Local memory (no Redis needed)
+# Cache - SQLite file shared by all workers (no Redis needed), see apps/core/sqlite_cache.py
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'apps.core.sqlite_cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache' / 'cache.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
     }
 }
 
+# Throttles counted with atomic increments in the shared cache, so the
+# rates hold across workers
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.core.throttling.AnonWindowRateThrottle',
+        'apps.core.throttling.UserWindowRateThrottle',
+    ],
+}
+
+# Search - in-process text index (MySQL has no tsvector), see apps/core/text_index.py
+TEXT_INDEX_PATH = BASE_DIR / 'search_index' / 'text_index.bin'
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -31,6 +31,8 @@ urlpatterns = [
     path('api/blog/', include('apps.blog.urls')),
     path('api/reviews/', include('apps.reviews.urls')),
     path('api/contact/', include('apps.contact.urls')),
+    path('api/bookings/', include('apps.bookings.urls')),
+    path('api/home/', include('apps.home.urls')),
 ]
 
 # Serve media files in development
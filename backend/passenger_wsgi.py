@@ -22,3 +22,7 @@ django.setup()
 # Import the WSGI application
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Build the search text index on first start (no-op when it exists)
+from apps.core.text_index import ensure_text_index
+ensure_text_index()
@@ -0,0 +1,247 @@
+"""
+Load test for apps.bookings.reservations.
+
+Threads play the part of concurrent workers booking the same departure.
+Each round creates a departure of CAPACITY seats on a published tour, lets
+BOOKERS threads book 1-4 seats each at the same moment and checks that the
+held seats add up (no oversell, no lost seats) and that the departure ends
+sold out. Later scenarios cover hold expiry, cancellation, idempotent
+confirmation and promo code usage caps. The departures, bookings and promo
+codes are deleted at the end.
+
+Runs against the configured database; SQLite serializes the writers, so
+run it on PostgreSQL or MySQL for production-like throughput.
+"""
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import timedelta
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from django.utils import timezone
+
+from apps.bookings.models import Booking, BookingStatus, PromoCode
+from apps.bookings.reservations import (
+    BookingError, cancel_booking, confirm_booking, create_booking, release_expired_holds
+)
+from apps.tours.models import Tour, TourDeparture
+
+BOOKERS = 40
+CAPACITY = 60
+ROUNDS = 5
+
+
+def run_concurrently(target, workers=BOOKERS):
+    """Start `workers` threads at once; return their results."""
+    barrier = threading.Barrier(workers)
+    results = [None] * workers
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target(index)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(name, ok, detail):
+    print(f"  {'OK' if ok else 'FAIL':5} {name}: {detail}")
+    return ok
+
+
+def make_departure(tour, capacity=CAPACITY):
+    date = timezone.localdate() + timedelta(days=random.randint(30, 300))
+    return TourDeparture.objects.create(
+        tour=tour, departure_date=date, return_date=date + timedelta(days=tour.days),
+        available_spots=capacity, status='available',
+    )
+
+
+def book(tour, departure, adults, now=None):
+    return create_booking(
+        tour, departure.departure_date, adults, departure=departure, now=now,
+        lead_traveler_name='Load Test', lead_traveler_email='load-test@example.com',
+    )
+
+
+def booking_round(tour, seed):
+    departure = make_departure(tour)
+    rng = random.Random(seed)
+    parties = [rng.randint(1, 4) for _ in range(BOOKERS)]
+
+    def target(index):
+        try:
+            started = time.perf_counter()
+            booking = book(tour, TourDeparture.objects.get(pk=departure.pk), parties[index])
+            return booking.seats, time.perf_counter() - started
+        except BookingError:
+            return 0, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = run_concurrently(target)
+    elapsed = time.perf_counter() - started
+
+    departure.refresh_from_db()
+    held = sum(Booking.objects.filter(departure=departure).values_list('seats', flat=True))
+    booked = sum(seats for seats, seconds in results)
+    accepted = sum(1 for seats, seconds in results if seats)
+    # Every refused party must have been too big for what was left
+    smallest_refused = min((parties[i] for i, (seats, s) in enumerate(results) if not seats), default=None)
+    ok = (
+        held == booked == CAPACITY - departure.available_spots
+        and departure.available_spots >= 0
+        and (smallest_refused is None or smallest_refused > departure.available_spots)
+        and (departure.status == 'sold_out') == (departure.available_spots == 0)
+    )
+    latency = sorted(seconds for seats, seconds in results)
+    report(
+        f'round {seed}', ok,
+        f'{accepted}/{BOOKERS} bookings, {booked}/{CAPACITY} seats, {departure.available_spots} left '
+        f'({departure.status}), {accepted / elapsed:.0f} bookings/s, '
+        f'p95 {latency[int(len(latency) * 0.95) - 1] * 1000:.0f} ms'
+    )
+    return ok, accepted / elapsed
+
+
+def test_hold_expiry(tour):
+    departure = make_departure(tour, capacity=4)
+    earlier = timezone.now() - timedelta(hours=2)
+    abandoned = book(tour, departure, 4, now=earlier)
+    departure.refresh_from_db()
+    full = departure.available_spots == 0 and departure.status == 'sold_out'
+
+    # A new booker finds the departure full of expired holds: they are released first
+    booking = book(tour, departure, 3)
+    abandoned.refresh_from_db()
+    departure.refresh_from_db()
+    released_on_demand = abandoned.status == BookingStatus.CANCELLED and departure.available_spots == 1
+
+    # The sweeper releases the rest, once
+    Booking.objects.filter(pk=booking.pk).update(hold_expires_at=earlier)
+    swept = release_expired_holds(), release_expired_holds()
+    departure.refresh_from_db()
+    return report(
+        'hold expiry',
+        full and released_on_demand and swept == (1, 0) and departure.available_spots == 4
+        and departure.status == 'limited',
+        f'sold out by a hold: {full}, released on demand: {released_on_demand}, '
+        f'sweeps {swept}, {departure.available_spots} spots ({departure.status})'
+    )
+
+
+def test_concurrent_cancel(tour, workers=10):
+    departure = make_departure(tour, capacity=10)
+    booking = book(tour, departure, 2)
+    results = run_concurrently(
+        lambda index: cancel_booking(Booking.objects.get(pk=booking.pk)).status, workers=workers
+    )
+    departure.refresh_from_db()
+    return report(
+        'concurrent cancel', departure.available_spots == 10 and set(results) == {'cancelled'},
+        f'{workers} cancels, {departure.available_spots}/10 spots after'
+    )
+
+
+def test_idempotent_confirm(tour, workers=10):
+    departure = make_departure(tour, capacity=10)
+    booking = book(tour, departure, 2)
+    results = run_concurrently(
+        lambda index: confirm_booking(Booking.objects.get(pk=booking.pk)).confirmed_at, workers=workers
+    )
+    booking.refresh_from_db()
+    expired = book(tour, departure, 1, now=timezone.now() - timedelta(hours=2))
+    try:
+        confirm_booking(expired)
+        refused = False
+    except BookingError:
+        refused = True
+    return report(
+        'idempotent confirm',
+        booking.status == BookingStatus.CONFIRMED and len(set(results)) == 1 and refused,
+        f'{workers} confirms, {len(set(results))} confirmation time(s), expired hold refused: {refused}'
+    )
+
+
+def test_promo_usage_cap(tour, workers=20, cap=5):
+    departure = make_departure(tour, capacity=workers)
+    promo = PromoCode.objects.create(
+        code='LOADTEST', discount_value=10, combinable=True, max_uses=cap, max_uses_per_customer=1
+    )
+
+    def target(index):
+        try:
+            return create_booking(
+                tour, departure.departure_date, 1, departure=TourDeparture.objects.get(pk=departure.pk),
+                promo_code='loadtest', lead_traveler_name='Load Test',
+                lead_traveler_email=f'load-test-{index % (workers // 2)}@example.com',
+            ).pk
+        except BookingError:
+            return None
+
+    results = run_concurrently(target, workers=workers)
+    promo.refresh_from_db()
+    departure.refresh_from_db()
+    booked = sum(1 for pk in results if pk)
+    ok = booked == cap == promo.uses_count and departure.available_spots == workers - cap
+    promo.delete()
+    return report(
+        'promo usage cap', ok,
+        f'{workers} bookers on {workers // 2} emails, {booked} redeemed (cap {cap}), '
+        f'{departure.available_spots}/{workers} spots left'
+    )
+
+
+def main():
+    print("\n" + "="*60)
+    print("BOOKING CONCURRENCY")
+    print("="*60)
+
+    tour = Tour.objects.filter(is_published=True).order_by('pk').first()
+    if tour is None:
+        print("No published tour to book")
+        return 1
+
+    existing = set(TourDeparture.objects.filter(tour=tour).values_list('pk', flat=True))
+    failures = 0
+    try:
+        throughputs = []
+        for seed in range(ROUNDS):
+            ok, throughput = booking_round(tour, seed)
+            failures += not ok
+            throughputs.append(throughput)
+        spread = statistics.pstdev(throughputs) / statistics.mean(throughputs)
+        print(f"  throughput {statistics.mean(throughputs):.0f} bookings/s, spread {spread:.0%} across rounds")
+
+        failures += not test_hold_expiry(tour)
+        failures += not test_concurrent_cancel(tour)
+        failures += not test_idempotent_confirm(tour)
+        failures += not test_promo_usage_cap(tour)
+    finally:
+        created = TourDeparture.objects.filter(tour=tour).exclude(pk__in=existing)
+        Booking.objects.filter(departure__in=created).delete()
+        created.delete()
+        PromoCode.objects.filter(code='LOADTEST').delete()
+
+    print("\n" + "="*60)
+    print(f"Done: {failures} failure(s)")
+    print("="*60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
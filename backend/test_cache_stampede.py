@@ -0,0 +1,213 @@
+"""
+Simulate cache stampedes against apps.core.caching.
+
+Threads play the part of concurrent workers missing the same key. The
+cache is a private LocMemCache standing in for the shared backend, so the
+script runs whatever CACHES the settings configure. The last scenario
+uses processes sharing a temporary apps.core.sqlite_cache file.
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from apps.core.caching import CacheLock, CoalescingCache, increment
+from apps.core.sqlite_cache import SQLiteCache
+
+WORKERS = 20
+
+
+class LocalCoalescingCache(CoalescingCache):
+    cache = LocMemCache('stampede-test', {})
+
+
+class SlowComputation:
+    """A compute() callable that counts its calls."""
+
+    def __init__(self, seconds=0.2, value='fresh'):
+        self.seconds = seconds
+        self.value = value
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.seconds)
+        return self.value
+
+
+def run_concurrently(target, workers=WORKERS):
+    """Start `workers` threads at once; return their (result, seconds) pairs."""
+    barrier = threading.Barrier(workers)
+    results = [None] * workers
+
+    def worker(index):
+        barrier.wait()
+        started = time.monotonic()
+        value = target()
+        results[index] = (value, time.monotonic() - started)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(name, ok, detail):
+    print(f"  {'OK' if ok else 'FAIL':5} {name}: {detail}")
+    return ok
+
+
+def test_cold_miss():
+    shared = LocalCoalescingCache()
+    shared.cache.clear()
+    compute = SlowComputation()
+    results = run_concurrently(lambda: shared.get_or_set('cold', compute, 60))
+    values = {value for value, seconds in results}
+    return report(
+        'cold miss', compute.calls == 1 and values == {'fresh'},
+        f'{WORKERS} workers, {compute.calls} computation(s), values {sorted(values)}'
+    )
+
+
+def test_stale_while_revalidate():
+    shared = LocalCoalescingCache()
+    shared.cache.clear()
+    # An entry that expired a second ago, still inside its stale period
+    shared.cache.set('swr', ('stale', 0.2, time.time() - 1), 300)
+    compute = SlowComputation()
+    results = run_concurrently(lambda: shared.get_or_set('swr', compute, 60))
+    stale = [seconds for value, seconds in results if value == 'stale']
+    slowest_stale = max(stale, default=0)
+    return report(
+        'stale-while-revalidate',
+        compute.calls == 1 and len(stale) == WORKERS - 1 and slowest_stale < 0.1
+        and shared.get_or_set('swr', compute, 60) == 'fresh',
+        f'{compute.calls} computation(s), {len(stale)} stale answers, '
+        f'slowest {slowest_stale * 1000:.1f} ms'
+    )
+
+
+def test_early_expiry(samples=2000):
+    shared = LocalCoalescingCache()
+    now = time.time()
+    # Took 1 s to compute: refreshes start a few seconds before expiry
+    near = sum(shared.should_refresh(('v', 1.0, now + 0.5), now) for _ in range(samples))
+    far = sum(shared.should_refresh(('v', 1.0, now + 30), now) for _ in range(samples))
+    expired = sum(shared.should_refresh(('v', 1.0, now - 0.01), now) for _ in range(samples))
+    return report(
+        'early expiry', 0 < near < samples and far == 0 and expired == samples,
+        f'refresh rate 0.5 s before expiry {near / samples:.0%}, '
+        f'30 s before {far / samples:.0%}, after {expired / samples:.0%}'
+    )
+
+
+def test_dead_lock_holder():
+    shared = LocalCoalescingCache(lock_timeout=30, wait_timeout=0.5)
+    shared.cache.clear()
+    # A worker took the lock and died without computing
+    CacheLock('orphan', 30, shared.cache).acquire()
+    compute = SlowComputation(seconds=0.01)
+    results = run_concurrently(lambda: shared.get_or_set('orphan', compute, 60), workers=5)
+    slowest = max(seconds for value, seconds in results)
+    return report(
+        'dead lock holder', all(value == 'fresh' for value, seconds in results) and slowest < 2,
+        f'waiters gave up after {slowest:.2f} s, {compute.calls} computation(s)'
+    )
+
+
+def test_failed_computation():
+    shared = LocalCoalescingCache(wait_timeout=5)
+    shared.cache.clear()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.1)
+            raise RuntimeError('backend down')
+        return 'fresh'
+
+    def target():
+        try:
+            return shared.get_or_set('failing', compute, 60)
+        except RuntimeError:
+            return 'error'
+
+    results = run_concurrently(target, workers=5)
+    slowest = max(seconds for value, seconds in results)
+    values = sorted(value for value, seconds in results)
+    return report(
+        'failed computation', values.count('error') == 1 and slowest < 2,
+        f'waiters retried after {slowest:.2f} s, answers {values}'
+    )
+
+
+def _process_worker(path, start, results):
+    class SharedCoalescingCache(CoalescingCache):
+        cache = SQLiteCache(path, {})
+
+    shared = SharedCoalescingCache()
+
+    def compute():
+        increment('computations', cache=shared.cache)
+        time.sleep(0.2)
+        return 'fresh'
+
+    start.wait()
+    results.put(shared.get_or_set('cross-process', compute, 60))
+
+
+def test_cross_process_cold_miss(workers=8):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite3')
+        context = multiprocessing.get_context('fork')
+        start, results = context.Event(), context.Queue()
+        processes = [
+            context.Process(target=_process_worker, args=(path, start, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        start.set()
+        values = sorted({results.get(timeout=30) for _ in processes})
+        for process in processes:
+            process.join()
+        calls = SQLiteCache(path, {}).get('computations')
+    return report(
+        'cross-process cold miss (SQLiteCache)', calls == 1 and values == ['fresh'],
+        f'{workers} processes, {calls} computation(s), values {values}'
+    )
+
+
+def main():
+    print("\n" + "="*60)
+    print("CACHE STAMPEDE SIMULATION")
+    print("="*60)
+
+    tests = [
+        test_cold_miss, test_stale_while_revalidate, test_early_expiry,
+        test_dead_lock_holder, test_failed_computation, test_cross_process_cold_miss,
+    ]
+    failures = sum(1 for test in tests if not test())
+
+    print("\n" + "="*60)
+    print(f"Done: {failures} failure(s)")
+    print("="*60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Check that the compiled serializers (apps.core.compiled) render exactly the
+same JSON as the DRF serializers they replace, in every language.
+"""
+import os
+import sys
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.core.compiled import compile_serializer
+from apps.core.serializers import SUPPORTED_LANGUAGES
+from apps.destinations.serializers import DestinationListSerializer
+from apps.blog.serializers import PostListSerializer
+
+from apps.destinations.models import Destination
+from apps.blog.models import Post
+
+CASES = [
+    ('Destinations', DestinationListSerializer, Destination.objects.order_by('sort_order', 'pk')),
+    ('Posts', PostListSerializer, Post.objects.order_by('-published_at', 'pk')),
+]
+
+QUERIES = ['', '?fields=id,name,title,slug', '?fields=category,author_display']
+
+
+def create_request(language, query=''):
+    factory = RequestFactory()
+    request = factory.get(f'/{query}')
+    request.META['HTTP_ACCEPT_LANGUAGE'] = language
+    return Request(request)
+
+
+def check(label, serializer_class, queryset, language, query):
+    request = create_request(language, query)
+    renderer = JSONRenderer()
+
+    expected = renderer.render(
+        serializer_class(queryset, many=True, context={'request': request}).data
+    )
+    plan = compile_serializer(serializer_class, request)
+    actual = renderer.render(plan.serialize(queryset.values(*plan.columns), request))
+
+    status = 'OK' if expected == actual else 'MISMATCH'
+    print(f"  {status:8} {label} [{language}] {query or '(all fields)'} - {len(expected)} bytes")
+    if expected != actual:
+        print(f"    drf:      {expected[:300]}")
+        print(f"    compiled: {actual[:300]}")
+    return expected == actual
+
+
+def main():
+    print("\n" + "="*60)
+    print("COMPILED SERIALIZER EQUIVALENCE")
+    print("="*60)
+
+    failures = 0
+    for label, serializer_class, queryset in CASES:
+        for language in SUPPORTED_LANGUAGES:
+            for query in QUERIES:
+                if not check(label, serializer_class, queryset, language, query):
+                    failures += 1
+
+    print("\n" + "="*60)
+    print(f"Done: {failures} mismatch(es)")
+    print("="*60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Check the vectorized price calendar (apps.tours.price_calendar) and the
+pricing engine (apps.tours.pricing) against a plain per-day evaluation of
+the same pricing rules, on the current data and on random seasons,
+departure prices, discounts and offers (created inside a transaction that
+is rolled back).
+"""
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.tours.models import EarlyBookingOffer, Tour, TourDeparture, TourPricing
+from apps.tours.price_calendar import AVAILABLE_STATUSES, CALENDAR_STATUSES, compute_price_days
+from apps.tours.pricing import PriceRules
+
+
+def reference_price_days(tour, now):
+    """{date: (price, original, discount, is_early_booking, departure_id, is_available)}."""
+    today = timezone.localdate(now)
+    dates = [today + timedelta(days=i) for i in range(settings.PRICE_CALENDAR_DAYS)]
+    seasons = list(tour.seasonal_pricing.all())
+    departures = [d for d in tour.departures.all() if d.status in CALENDAR_STATUSES]
+    offers = [
+        offer for offer in tour.early_booking_offers.all()
+        if offer.is_active and offer.offer_start_date <= now <= offer.offer_end_date
+    ]
+    tour_discount = tour.discount_percentage if tour.has_discount and (
+        (tour.discount_start_date is None or tour.discount_start_date <= now)
+        and (tour.discount_end_date is None or now <= tour.discount_end_date)
+    ) else 0
+
+    result = {}
+    for day in dates:
+        covering = [s.price_per_person for s in seasons if s.start_date <= day <= s.end_date]
+        base = min(covering) if covering else tour.price
+        departure, available = None, True
+        if departures:
+            todays = [d for d in departures if d.departure_date == day]
+            if not todays:
+                continue
+            departure = min(todays, key=lambda d: (
+                d.status not in AVAILABLE_STATUSES, d.price if d.price is not None else base
+            ))
+            available = departure.status in AVAILABLE_STATUSES
+            if departure.price is not None:
+                base = departure.price
+
+        early_booking = max([
+            offer.discount_percentage for offer in offers
+            if offer.travel_start_date <= day <= offer.travel_end_date
+            and (day - today).days >= offer.min_days_advance
+        ], default=0)
+        discount = max(tour_discount, early_booking)
+        price = (base * (100 - discount) / 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        result[day] = (
+            price, base, discount, early_booking > tour_discount,
+            departure.pk if departure else None, available,
+        )
+    return result
+
+
+def calendar_price_days(tour_ids, now):
+    """The same days from compute_price_days."""
+    rows, valid_until = compute_price_days(tour_ids, now)
+    computed = {}
+    for tour_id, day, *values in rows:
+        computed.setdefault(tour_id, {})[day] = tuple(values)
+    return computed
+
+
+def engine_price_days(tour_ids, now):
+    """The same days quoted one by one from the pricing engine."""
+    today = timezone.localdate(now)
+    dates = [today + timedelta(days=i) for i in range(settings.PRICE_CALENDAR_DAYS)]
+    rules = PriceRules.load(tour_ids, now, dates[0], dates[-1])
+    computed = {}
+    for tour_id in tour_ids:
+        for day in dates:
+            quote = rules.quote(tour_id, day)
+            if quote is not None:
+                computed.setdefault(tour_id, {})[day] = (
+                    quote.price, quote.original_price, quote.discount_percentage,
+                    quote.is_early_booking, quote.departure_id, quote.is_available,
+                )
+    return computed
+
+
+def compare(label, now, evaluate):
+    tours = list(Tour.objects.filter(is_published=True).prefetch_related(
+        'seasonal_pricing', 'departures', 'early_booking_offers'
+    ))
+    started = time.perf_counter()
+    computed = evaluate([tour.pk for tour in tours], now)
+    elapsed = time.perf_counter() - started
+
+    mismatches = 0
+    for tour in tours:
+        expected = reference_price_days(tour, now)
+        actual = computed.get(tour.pk, {})
+        if expected != actual:
+            mismatches += 1
+            day = next(d for d in sorted(set(expected) | set(actual)) if expected.get(d) != actual.get(d))
+            print(f"    tour {tour.pk} {day}: expected {expected.get(day)}, got {actual.get(day)}")
+
+    status = 'OK' if not mismatches else 'MISMATCH'
+    days = sum(len(tour_days) for tour_days in computed.values())
+    print(f"  {status:8} {label}: {len(tours)} tours, {days} days in {elapsed * 1000:.0f} ms")
+    return mismatches
+
+
+def randomize(now, seed=7):
+    """Random seasons, departures, tour discounts and offers."""
+    rng = random.Random(seed)
+    today = timezone.localdate(now)
+    tours = list(Tour.objects.filter(is_published=True))
+    for tour in tours:
+        for _ in range(rng.randint(0, 3)):
+            start = today + timedelta(days=rng.randint(-30, 300))
+            TourPricing.objects.create(
+                tour=tour, season_name='Season', start_date=start,
+                end_date=start + timedelta(days=rng.randint(0, 90)),
+                price_per_person=Decimal(rng.randint(30000, 300000)) / 100,
+            )
+        if rng.random() < 0.5:
+            tour.has_discount = True
+            tour.discount_percentage = rng.randint(5, 40)
+            tour.discount_start_date = now - timedelta(days=rng.randint(-5, 5))
+            tour.discount_end_date = now + timedelta(days=rng.randint(-5, 30))
+            tour.save()
+    for departure in TourDeparture.objects.filter(tour__in=tours):
+        departure.price = Decimal(rng.randint(30000, 300000)) / 100 if rng.random() < 0.5 else None
+        departure.status = rng.choice(['available', 'limited', 'sold_out', 'cancelled'])
+        departure.departure_date = today + timedelta(days=rng.randint(0, 20))
+        departure.save()
+    # Tours without scheduled departures are priced every day
+    TourDeparture.objects.filter(tour__in=tours[::3]).update(status='cancelled')
+    for _ in range(3):
+        offer = EarlyBookingOffer.objects.create(
+            title='Random offer', discount_percentage=rng.randint(5, 50),
+            offer_start_date=now - timedelta(days=1), offer_end_date=now + timedelta(days=10),
+            travel_start_date=today + timedelta(days=rng.randint(0, 60)),
+            travel_end_date=today + timedelta(days=rng.randint(60, 400)),
+            min_days_advance=rng.randint(0, 60),
+        )
+        offer.tours.set(rng.sample(tours, k=min(len(tours), 10)))
+
+
+def main():
+    print("\n" + "="*60)
+    print("PRICE CALENDAR AND ENGINE EQUIVALENCE")
+    print("="*60)
+
+    now = timezone.now()
+    failures = compare('calendar, current data', now, calendar_price_days)
+    failures += compare('engine, current data', now, engine_price_days)
+
+    with transaction.atomic():
+        randomize(now)
+        failures += compare('calendar, random inputs', now, calendar_price_days)
+        failures += compare('engine, random inputs', now, engine_price_days)
+        transaction.set_rollback(True)
+
+    print("\n" + "="*60)
+    print(f"Done: {failures} mismatch(es)")
+    print("="*60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
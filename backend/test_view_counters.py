@@ -0,0 +1,183 @@
+"""
+Load test for apps.core.view_counters.
+
+Threads play the part of concurrent workers viewing the same pages. Checks
+that every view reaches view_count (no lost updates), that detail requests
+(fresh, cached and revalidated) write nothing to the database between
+flushes, that a flush leaves the batches spilled since the previous flush
+for the next one and that views reach the database without a scheduled
+flush, once the response is sent. The view counts of the pages used are
+restored at the end.
+
+The counters live in the configured cache: with LocMemCache this only
+covers the threads of this process.
+"""
+import os
+import sys
+import threading
+import time
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Post
+from apps.core.view_counters import flush_view_counts, record_view, spill_views
+from apps.tours.models import Tour
+
+VIEWERS = 20
+VIEWS_PER_VIEWER = 500
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def report(name, ok, detail):
+    print(f"  {'OK' if ok else 'FAIL':5} {name}: {detail}")
+    return ok
+
+
+def run_concurrently(target, workers=VIEWERS):
+    """Start `workers` threads at once."""
+    barrier = threading.Barrier(workers)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def view_count(model, slug):
+    return model.objects.filter(slug=slug).values_list('view_count', flat=True).get()
+
+
+def test_no_lost_views(post, tour):
+    before = view_count(Post, post.slug), view_count(Tour, tour.slug)
+
+    def viewer(index):
+        for i in range(VIEWS_PER_VIEWER):
+            record_view(Post, 'slug', post.slug)
+            if i % 2:
+                record_view(Tour, 'slug', tour.slug)
+            if i % 100 == 0:
+                spill_views()
+                if index == 0:
+                    # Flushes racing the viewers
+                    flush_view_counts()
+
+    started = time.perf_counter()
+    run_concurrently(viewer)
+    elapsed = time.perf_counter() - started
+    flush_view_counts(settle=False)
+
+    expected = VIEWERS * VIEWS_PER_VIEWER, VIEWERS * VIEWS_PER_VIEWER // 2
+    added = view_count(Post, post.slug) - before[0], view_count(Tour, tour.slug) - before[1]
+    views = sum(expected)
+    return report(
+        'no lost views', added == expected,
+        f'{added} of {expected} views counted ({views / elapsed:.0f} views/s with flushes)'
+    )
+
+
+def test_reads_do_not_write(post, tour):
+    client = Client()
+    flush_view_counts(settle=False)
+    before = view_count(Post, post.slug), view_count(Tour, tour.slug)
+
+    urls = [f'/api/blog/posts/{post.slug}/', f'/api/tours/{tour.slug}/']
+    writes, statuses = [], []
+    with override_settings(VIEW_COUNT_FLUSH_SECONDS=3600), CaptureQueriesContext(connection) as captured:
+        for url in urls:
+            first = client.get(url)
+            cached = client.get(url)
+            revalidated = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            statuses.append((first.status_code, cached.status_code, revalidated.status_code))
+    writes = [query['sql'] for query in captured if query['sql'].lstrip().upper().startswith(WRITES)]
+
+    flush_view_counts(settle=False)
+    added = view_count(Post, post.slug) - before[0], view_count(Tour, tour.slug) - before[1]
+    return report(
+        'reads do not write',
+        not writes and added == (3, 3) and all(status[0] == 200 and status[2] == 304 for status in statuses),
+        f'{len(writes)} writes in {len(captured)} queries, statuses {statuses}, views added {added}'
+    )
+
+
+def test_settled_flush(post):
+    flush_view_counts(settle=False)
+    before = view_count(Post, post.slug)
+
+    record_view(Post, 'slug', post.slug)
+    spill_views()
+    first = flush_view_counts()     # batch spilled after the previous flush: kept
+    second = flush_view_counts()    # drained one flush later
+    return report(
+        'settled flush',
+        (first, second) == (0, 1) and view_count(Post, post.slug) == before + 1,
+        f'flushed {first} then {second}, view_count +{view_count(Post, post.slug) - before}'
+    )
+
+
+def test_flush_without_scheduler(post):
+    flush_view_counts(settle=False)
+    before = view_count(Post, post.slug)
+
+    # Each view spills; the flush runs once the response is sent and drains
+    # the batches before the previous flush
+    client = Client()
+    added, writes = [], []
+    with override_settings(VIEW_COUNT_BUFFER_SECONDS=0, VIEW_COUNT_FLUSH_SECONDS=0):
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as captured:
+                record_view(Post, 'slug', post.slug)
+            writes += [query['sql'] for query in captured if query['sql'].lstrip().upper().startswith(WRITES)]
+            client.get(f'/api/blog/posts/{post.slug}/')
+            added.append(view_count(Post, post.slug) - before)
+    return report(
+        'flush without a scheduler', not writes and added == [0, 2, 4],
+        f'view_count +{added} after each request, {len(writes)} writes before a response'
+    )
+
+
+def main():
+    print("\n" + "="*60)
+    print("VIEW COUNTERS")
+    print("="*60)
+
+    post = Post.objects.filter(is_published=True).order_by('pk').first()
+    tour = Tour.objects.filter(is_published=True).order_by('pk').first()
+    if post is None or tour is None:
+        print("No published post and tour to view")
+        return 1
+
+    failures = 0
+    try:
+        failures += not test_no_lost_views(post, tour)
+        failures += not test_reads_do_not_write(post, tour)
+        failures += not test_settled_flush(post)
+        failures += not test_flush_without_scheduler(post)
+    finally:
+        flush_view_counts(settle=False)
+        Post.objects.filter(pk=post.pk).update(view_count=post.view_count)
+        Tour.objects.filter(pk=tour.pk).update(view_count=tour.view_count)
+
+    print("\n" + "="*60)
+    print(f"Done: {failures} failure(s)")
+    print("="*60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())